@@ -0,0 +1,203 @@
+import os
+import time
+import ctypes
+import threading
+
+# Limite de banda dos downloads (token bucket), compartilhado por todas as conexões.
+# Configuração em config.json -> "updater":
+#   max_download_kbps   -> limite normal em KB/s (0 = sem limite)
+#   game_running_kbps   -> limite enquanto o l2.exe aberto pelo launcher estiver rodando
+#                          (0 = usa o limite normal)
+# O limite normal pode ser trocado em tempo de execução pela barra de baixo do launcher.
+
+# quanto tempo de banda pode ser acumulado parado (rajada máxima)
+BURST_SECONDS = 0.5
+MIN_BURST_BYTES = 64 * 1024
+
+# espera máxima por fatia: mantém o cancelamento e a troca de limite responsivos
+_SLEEP_SLICE = 0.1
+# intervalo entre verificações do processo do jogo
+_GAME_CHECK_INTERVAL = 2.0
+
+
+class TokenBucket:
+    """
+    Token bucket com "dívida": consume() desconta os bytes na hora e espera até
+    o saldo voltar a zero. Assim pedaços maiores que a rajada também funcionam.
+    rate em bytes/s; 0 = sem limite.
+    """
+
+    def __init__(self, rate=0, clock=time.monotonic, sleep=time.sleep):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+        self._rate = 0
+        self._tokens = 0.0
+        self._last = clock()
+        self.set_rate(rate)
+
+    @property
+    def rate(self):
+        return self._rate
+
+    def set_rate(self, rate):
+        with self._lock:
+            rate = max(0, int(rate or 0))
+            if rate == self._rate:
+                return
+            self._refill(self._clock())
+            self._rate = rate
+            # saldo de um limite antigo não vale para o novo
+            self._tokens = max(-self._burst(), min(self._tokens, self._burst()))
+
+    def consume(self, nbytes, should_stop=None):
+        """Espera a banda para nbytes; retorna False se should_stop() pedir para parar."""
+        with self._lock:
+            if not self._rate:
+                return True
+            self._refill(self._clock())
+            self._tokens -= nbytes
+
+        while True:
+            with self._lock:
+                if not self._rate:
+                    return True
+                self._refill(self._clock())
+                if self._tokens >= 0:
+                    return True
+                wait = -self._tokens / self._rate
+
+            if should_stop is not None and should_stop():
+                return False
+            self._sleep(min(wait, _SLEEP_SLICE))
+
+    def _burst(self):
+        return max(self._rate * BURST_SECONDS, MIN_BURST_BYTES)
+
+    def _refill(self, now):
+        elapsed = now - self._last
+        self._last = now
+        if self._rate and elapsed > 0:
+            self._tokens = min(self._tokens + elapsed * self._rate, self._burst())
+
+
+def _process_alive(pid):
+    if not pid:
+        return False
+
+    if os.name == "nt":
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, int(pid))
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return False
+            return code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class BandwidthPolicy:
+    """
+    Decide o limite em vigor (normal ou "jogo aberto") e aplica no token bucket.
+    Thread-safe: a UI troca limites enquanto os downloads consomem.
+    """
+
+    def __init__(self, limit_kbps=0, game_running_kbps=0, clock=time.monotonic):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._limit_kbps = max(0, int(limit_kbps or 0))
+        self._game_kbps = max(0, int(game_running_kbps or 0))
+        self._game_pid = None
+        self._game_running = False
+        self._next_game_check = 0.0
+        self.bucket = TokenBucket(clock=clock)
+        self._apply()
+
+    @property
+    def limit_kbps(self):
+        return self._limit_kbps
+
+    def set_limit_kbps(self, kbps):
+        with self._lock:
+            self._limit_kbps = max(0, int(kbps or 0))
+            self._apply()
+
+    def set_game_process(self, pid):
+        """Processo do jogo aberto pelo launcher (None quando não há)."""
+        with self._lock:
+            self._game_pid = pid
+            self._game_running = _process_alive(pid)
+            self._next_game_check = self._clock() + _GAME_CHECK_INTERVAL
+            self._apply()
+
+    def effective_kbps(self):
+        with self._lock:
+            self._check_game()
+            return self._current_kbps()
+
+    def consume(self, nbytes, should_stop=None):
+        with self._lock:
+            self._check_game()
+        return self.bucket.consume(nbytes, should_stop)
+
+    def _check_game(self):
+        if self._game_pid is None or self._clock() < self._next_game_check:
+            return
+        self._next_game_check = self._clock() + _GAME_CHECK_INTERVAL
+        running = _process_alive(self._game_pid)
+        if running != self._game_running:
+            self._game_running = running
+            if not running:
+                self._game_pid = None
+            self._apply()
+
+    def _current_kbps(self):
+        if self._game_running and self._game_kbps:
+            return self._game_kbps
+        return self._limit_kbps
+
+    def _apply(self):
+        self.bucket.set_rate(self._current_kbps() * 1024)
+
+
+_shared_policy = None
+_shared_lock = threading.Lock()
+
+
+def get_bandwidth_policy(config=None):
+    """
+    Política de banda compartilhada entre os workers e a UI.
+    Na primeira chamada é configurada pela seção "updater" do config.json.
+    """
+    global _shared_policy
+
+    with _shared_lock:
+        if _shared_policy is None:
+            updater_cfg = (config or {}).get("updater", {})
+            _shared_policy = BandwidthPolicy(
+                limit_kbps=_to_int(updater_cfg.get("max_download_kbps", 0)),
+                game_running_kbps=_to_int(updater_cfg.get("game_running_kbps", 0)),
+            )
+        return _shared_policy
+
+
+def _to_int(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
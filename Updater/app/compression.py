@@ -0,0 +1,45 @@
+import lzma
+import zlib
+
+# Variantes pré-comprimidas publicadas pelo generate_manifests.php.
+# No manifesto:  "compressed": {"encoding": "gzip", "url": "...", "size": <bytes comprimidos>}
+SUPPORTED_ENCODINGS = ("gzip", "zlib", "xz")
+
+
+class StreamDecoder:
+    """Descomprime um stream em pedaços, na mesma ordem em que chegam da rede."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "zlib":
+            self._obj = zlib.decompressobj()
+        elif encoding == "xz":
+            self._obj = lzma.LZMADecompressor(format=lzma.FORMAT_XZ)
+        else:
+            raise ValueError(f"Compressão não suportada: {encoding}")
+
+    def decompress(self, chunk):
+        try:
+            return self._obj.decompress(chunk)
+        except (zlib.error, lzma.LZMAError, EOFError) as e:
+            # EOFError: xz com dados depois do fim do stream
+            raise ValueError(f"stream {self.encoding} inválido: {e}")
+
+    def finish(self):
+        """Dados restantes no fim do stream; ValueError se o stream veio truncado."""
+        tail = self._obj.flush() if self.encoding != "xz" else b""
+        if not self._obj.eof:
+            raise ValueError(f"stream {self.encoding} truncado")
+        return tail
+
+
+def pick_compressed(info):
+    """Retorna a variante comprimida do manifesto, se existir e for suportada."""
+    variant = info.get("compressed")
+    if not isinstance(variant, dict):
+        return None
+    if variant.get("encoding") not in SUPPORTED_ENCODINGS or not variant.get("url"):
+        return None
+    return variant
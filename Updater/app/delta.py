@@ -0,0 +1,91 @@
+import hashlib
+
+# Delta por blocos (estilo rsync/zsync simplificado):
+#   - o servidor publica, por arquivo grande, o SHA1 de cada bloco de block_size bytes;
+#   - o cliente calcula os mesmos hashes do arquivo antigo que já tem no disco
+#     (blocos alinhados) e reaproveita todo bloco que encontrar, em qualquer posição;
+#   - só os blocos que faltam são baixados, com Range, e o arquivo é remontado em ordem.
+#
+# Não usamos checksum rolante byte a byte: em Python puro seria lento demais para
+# pacotes de centenas de MB, e os pacotes do L2 costumam mudar "no lugar".
+
+# se for preciso baixar mais que isso do arquivo, o download inteiro sai mais barato
+MAX_FETCH_RATIO = 0.8
+
+
+class DeltaUnavailable(Exception):
+    """O delta não pode ser usado para este arquivo; baixar o arquivo inteiro."""
+
+
+def parse_signature(data, expected_size, expected_sha1):
+    """Valida o JSON de assinatura publicado pelo generate_manifests.php."""
+    try:
+        block_size = int(data["block_size"])
+        size = int(data["size"])
+        sha1 = str(data.get("sha1", "")).lower()
+        blocks = [str(b).lower() for b in data["blocks"]]
+    except (KeyError, TypeError, ValueError) as e:
+        raise DeltaUnavailable(f"assinatura inválida: {e}")
+
+    if block_size <= 0:
+        raise DeltaUnavailable("assinatura inválida: block_size")
+    if expected_size and size != expected_size:
+        raise DeltaUnavailable("assinatura de outra versão do arquivo (tamanho)")
+    if expected_sha1 and sha1 and sha1 != expected_sha1:
+        raise DeltaUnavailable("assinatura de outra versão do arquivo (SHA1)")
+    if len(blocks) != (size + block_size - 1) // block_size:
+        raise DeltaUnavailable("assinatura inválida: quantidade de blocos")
+
+    return block_size, size, blocks
+
+
+def local_block_hashes(file_path, block_size, should_stop=None):
+    """
+    SHA1 de cada bloco alinhado do arquivo local: hash -> offset (primeira ocorrência).
+    Retorna None se should_stop() pedir para parar.
+    """
+    found = {}
+    offset = 0
+    with open(file_path, "rb") as f:
+        while True:
+            if should_stop is not None and should_stop():
+                return None
+            block = f.read(block_size)
+            if not block:
+                break
+            found.setdefault(hashlib.sha1(block).hexdigest(), offset)
+            offset += len(block)
+    return found
+
+
+def plan_delta(block_size, size, blocks, local_hashes):
+    """
+    Monta a lista de operações para remontar o arquivo novo, em ordem:
+        ("copy", offset_local, tamanho)  -> copiar do arquivo antigo
+        ("fetch", inicio, fim)           -> baixar bytes [inicio, fim] (inclusive) via Range
+    Blocos vizinhos do mesmo tipo são agrupados para reduzir leituras e requisições.
+    Retorna (operações, bytes a baixar).
+    """
+    ops = []
+    fetch_bytes = 0
+
+    for i, block_hash in enumerate(blocks):
+        start = i * block_size
+        length = min(block_size, size - start)
+        src = local_hashes.get(block_hash)
+
+        if src is not None:
+            last = ops[-1] if ops else None
+            if last and last[0] == "copy" and last[1] + last[2] == src:
+                ops[-1] = ("copy", last[1], last[2] + length)
+            else:
+                ops.append(("copy", src, length))
+        else:
+            fetch_bytes += length
+            last = ops[-1] if ops else None
+            if last and last[0] == "fetch" and last[2] + 1 == start:
+                ops[-1] = ("fetch", last[1], start + length - 1)
+            else:
+                ops.append(("fetch", start, start + length - 1))
+
+    return ops, fetch_bytes
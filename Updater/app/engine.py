@@ -0,0 +1,1685 @@
+import os
+import stat
+import json
+import errno
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+from app.bandwidth import get_bandwidth_policy
+from app.compression import StreamDecoder, pick_compressed
+from app.delta import (
+    MAX_FETCH_RATIO,
+    DeltaUnavailable,
+    local_block_hashes,
+    parse_signature,
+    plan_delta,
+)
+from app.hash_index import HashIndex
+from app.http_client import HttpError, get_http_client
+from app.manifest import BINARY_MANIFEST_EXT, derive_url, load_manifest, priority_rank
+from app.manifest_cache import ManifestCache
+from app.mirrors import MirrorSet, StreamWatch
+from app.segments import (
+    SegmentedUnavailable,
+    parse_segments,
+    plan_segments,
+    remaining_bytes,
+)
+from app.progress import ProgressTracker, format_bytes, format_eta, format_rate
+from app.timings import RunTimings, write_report
+from app.versions import MAX_DELTA_CHAIN, InstalledVersion, merge_deltas, parse_version_info
+
+# Motor de atualização (update / fullcheck), sem dependência de Qt.
+#
+# O fluxo é orquestrado por um event loop asyncio, em etapas:
+#   versão/deltas -> manifesto -> stat (índice) -> hash -> download + commit
+# As etapas aguardam o trabalho bloqueante (rede via HttpClient, disco, SHA1) em
+# pools de threads; hash e download mantêm vários arquivos em andamento ao mesmo
+# tempo e o loop recolhe os resultados (índice de hashes, progresso) numa só thread.
+# Quem usa o motor recebe os eventos por um UpdateEvents: a janela liga nos sinais
+# Qt (UpdateWorker, em updater_window.py); outros usos podem rodar sem interface.
+
+DEFAULT_HASH_INDEX = "cache/hash_index.bin"
+DEFAULT_MANIFEST_CACHE = "cache/manifests"
+DEFAULT_INSTALLED_VERSION = "cache/installed_version.json"
+DEFAULT_TIMING_REPORT = "logs/update_report.json"
+DEFAULT_MAX_CONCURRENT_DOWNLOADS = 4
+DEFAULT_MAX_HASH_WORKERS = 8
+PART_SUFFIX = ".part"
+DEFAULT_DOWNLOAD_RETRIES = 2
+DEFAULT_MIRROR_PROBE_TIMEOUT = 3
+DEFAULT_MIRROR_MIN_SPEED_KBPS = 16
+# janela (s) da vigia de velocidade mínima por espelho
+MIRROR_SPEED_WINDOW = 15.0
+DEFAULT_SEGMENTED_MIN_SIZE = 32 * 1024 * 1024
+DEFAULT_DOWNLOAD_SEGMENTS = 4
+# linhas por arquivo conferido ("Verificando arquivo", "OK (hash confere)"):
+# "all" = todas, "sample" = 1 a cada logging.file_lines_sample, "summary" = só a contagem
+DEFAULT_FILE_LINES = "summary"
+DEFAULT_FILE_LINES_SAMPLE = 1000
+# a cada quantos bytes por faixa o progresso do download segmentado é salvo
+SEGMENT_SAVE_INTERVAL = 4 * 1024 * 1024
+
+MANIFEST_FRESH = "fresh"
+MANIFEST_NOT_MODIFIED = "not_modified"
+MANIFEST_OFFLINE = "offline"
+
+
+class FileInUse(Exception):
+    """
+    O arquivo baixado e conferido não pôde substituir o do jogo (aberto pelo
+    cliente no Windows, por exemplo). O .part fica no disco e é aplicado na
+    próxima execução, sem baixar de novo.
+    """
+
+
+# ERROR_SHARING_VIOLATION / ERROR_LOCK_VIOLATION: arquivo aberto ou travado por outro processo
+_IN_USE_WINERRORS = (32, 33)
+
+
+def _is_file_in_use(error):
+    """
+    Só erros de arquivo preso viram FileInUse; disco cheio, pasta no lugar do
+    arquivo etc. continuam sendo erro de verdade.
+    """
+    if getattr(error, "winerror", None) in _IN_USE_WINERRORS:
+        return True
+    # no Windows, trocar um .exe/.dll em execução dá "acesso negado"
+    return os.name == "nt" and error.errno == errno.EACCES
+
+
+class UpdateEvents:
+    """
+    Eventos do motor. Implementações sobrescrevem só o que usam; os métodos
+    podem ser chamados de qualquer thread do motor.
+    """
+
+    def progress(self, percent):
+        """Progresso da etapa atual, 0–100."""
+
+    def status(self, text):
+        """Texto curto para a linha de status."""
+
+    def log(self, text):
+        """Linha de log detalhado."""
+
+    def bytes_progress(self, done, total):
+        """Bytes processados / total da etapa atual."""
+
+    def throughput(self, rate, eta):
+        """Vazão em bytes/s (média móvel) e ETA em segundos (-1 = desconhecido)."""
+
+    def ready(self):
+        """Arquivos críticos conferidos: o jogo já pode abrir (o resto segue baixando)."""
+
+    def finished(self, ok):
+        """Fim da execução: True se terminou sem erro nem cancelamento."""
+
+
+class _PriorityView:
+    """Entradas não críticas do manifesto, filtradas durante a iteração."""
+
+    def __init__(self, files, count):
+        self._files = files
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return (info for info in self._files if priority_rank(info) > 0)
+
+
+class UpdateEngine:
+    def __init__(self, mode, config, base_dir=None, events=None, verify_only=False):
+        self.mode = mode  # "update" ou "fullcheck"
+        self.config = config
+        # só confere a pasta do jogo com o manifesto: não baixa nem apaga nada
+        self.verify_only = verify_only
+        # arquivos que precisariam ser baixados (preenchido no verify_only)
+        self.outdated_files = []
+        self.events = events or UpdateEvents()
+        self._cancelled = False
+        self._abort_event = threading.Event()
+        self.base_dir = base_dir or os.getcwd()
+        self.http = get_http_client(config)
+        # limite de banda compartilhado por todas as conexões (ajustável pela UI)
+        self.bandwidth = get_bandwidth_policy(config)
+        # vigia de velocidade do stream atual, por thread de download
+        self._stream_watch = threading.local()
+        # tempos por etapa / arquivo da execução (relatório no fim)
+        self.timings = RunTimings()
+        # arquivos que conferiram com o manifesto (resumo no log)
+        self._ok_files = 0
+        # segundos até o jogo poder abrir (ready), para o relatório de tempos
+        self.time_to_play = None
+        # arquivos já baixados que ficaram no .part por estarem em uso
+        self.deferred_files = []
+        # grupo de prioridade em andamento, no texto de progresso (" [essenciais 1/2]")
+        self._group_label = ""
+
+    def _get_game_root(self):
+        """
+        Pasta raiz onde os arquivos do jogo/patch devem ir.
+        - Se game_folder for absoluto, usa direto
+        - Se for relativo (incluindo "."), é relativo à pasta do launcher (base_dir)
+        """
+        paths = self.config.get("paths", {})
+        game_folder = paths.get("game_folder", ".").strip()
+
+        if os.path.isabs(game_folder):
+            return os.path.normpath(game_folder)
+
+        # relativo -> dentro da pasta do launcher
+        return os.path.normpath(os.path.join(self.base_dir, game_folder))
+
+    def _get_hash_index_path(self):
+        """
+        Caminho do índice local de hashes (updater.hash_index no config.json).
+        Relativo à pasta do launcher, igual aos logs.
+        """
+        return self._get_launcher_path("hash_index", DEFAULT_HASH_INDEX)
+
+    def _get_launcher_path(self, name, default):
+        updater_cfg = self.config.get("updater", {})
+        path = str(updater_cfg.get(name, default)).strip()
+
+        if os.path.isabs(path):
+            return os.path.normpath(path)
+
+        return os.path.normpath(os.path.join(self.base_dir, path))
+
+    def run(self):
+        """Executa em um event loop próprio (bloqueia a thread atual). Retorna o resultado."""
+        return asyncio.run(self.run_async())
+
+    async def run_async(self):
+        self.timings = RunTimings()
+        self.time_to_play = None
+        self.deferred_files = []
+        error = None
+        try:
+            await self._run_internal()
+            # cancelado também precisa avisar o fim, senão quem espera nunca encerra
+            ok = not self._cancelled
+        except Exception as e:
+            self.events.log(f"Erro: {e}")
+            error = str(e)
+            ok = False
+        self._finish_timings(ok, error)
+        self.events.finished(ok)
+        return ok
+
+    def _finish_timings(self, ok, error):
+        """Linha de resumo no log e relatório JSON (updater.timing_report; "" desliga)."""
+        self.events.log(self.timings.summary_line())
+
+        path = str(self.config.get("updater", {}).get("timing_report", DEFAULT_TIMING_REPORT))
+        if not path.strip():
+            return
+        time_to_play = self.time_to_play
+        if time_to_play is None and ok and not self.verify_only:
+            time_to_play = self.timings.elapsed()  # sem prioridade: JOGAR só no fim
+        report = self.timings.report(
+            mode=self.mode, verify_only=self.verify_only, ok=ok,
+            cancelled=self._cancelled, error=error,
+            time_to_play=round(time_to_play, 3) if time_to_play is not None else None,
+        )
+        try:
+            write_report(self._get_launcher_path("timing_report", DEFAULT_TIMING_REPORT), report)
+        except OSError as e:
+            self.events.log(f"Aviso: não foi possível gravar o relatório de tempos: {e}")
+
+    def cancel(self):
+        self._cancelled = True
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    # -------------------- Etapas --------------------
+
+    async def _run_internal(self):
+        paths = self.config.get("paths", {})
+
+        if self.mode == "update":
+            url = paths.get("update_json")
+        else:
+            url = paths.get("fullcheck_json")
+
+        if not url:
+            raise RuntimeError("URL de JSON de atualização não configurada.")
+
+        game_root = self._get_game_root()  # <- usa base_dir + game_folder
+
+        # índice de hashes: evita reler arquivos cujo stat não mudou.
+        # no fullcheck ele é ignorado na leitura, mas é reconstruído com os hashes novos.
+        hash_index = HashIndex(self._get_hash_index_path(), game_root)
+        with self.timings.stage("index"):
+            await self._blocking(hash_index.load)
+
+        installed = InstalledVersion(
+            self._get_launcher_path("installed_version", DEFAULT_INSTALLED_VERSION), game_root
+        )
+
+        try:
+            if self.verify_only:
+                # a versão instalada não muda: dispensa version.json e deltas
+                await self._run_full(url, game_root, hash_index)
+                return
+
+            # versão publicada é lida ANTES do manifesto: se o servidor publicar outra
+            # no meio, gravamos a mais antiga e a próxima execução aplica o delta que falta
+            with self.timings.stage("version"):
+                version_info = await self._blocking(self._fetch_version_info, url)
+
+            if self.mode == "update" and version_info is not None:
+                if await self._apply_deltas(version_info, installed, game_root, hash_index):
+                    # arquivo em uso ainda não foi aplicado: a versão fica para a próxima
+                    if not self._cancelled and not self.deferred_files:
+                        installed.save(version_info[0])
+                    return
+
+            if await self._run_full(url, game_root, hash_index) and version_info is not None:
+                if not self.deferred_files:
+                    installed.save(version_info[0])
+        finally:
+            try:
+                with self.timings.stage("index"):
+                    await self._blocking(hash_index.save)
+            except OSError as e:
+                self.events.log(f"Aviso: não foi possível gravar o índice de hashes: {e}")
+
+    async def _run_full(self, url, game_root, hash_index):
+        """
+        Reconcilia o cliente com o manifesto completo.
+        Retorna True se o cliente ficou igual ao manifesto atual do servidor.
+        """
+        self.events.status(f"Baixando lista de arquivos ({self.mode})...")
+        self.events.log(f"Baixando JSON: {url}")
+
+        with self.timings.stage("manifest"):
+            files, manifest_state = await self._blocking(self._fetch_manifest, url)
+        base_url = files.base_url
+        offline = manifest_state == MANIFEST_OFFLINE
+
+        if not files:
+            self.events.log("Nenhum arquivo para processar.")
+            self.events.progress(100)
+            return not offline
+
+        # manifesto não mudou e o índice diz que tudo confere: nada a fazer
+        clean = False
+        if manifest_state == MANIFEST_NOT_MODIFIED and self.mode != "fullcheck":
+            with self.timings.stage("stat"):
+                clean = await self._blocking(self._is_clean, files, game_root, hash_index)
+        if clean:
+            self.events.log(
+                f"Manifesto sem alterações (304) e {len(files)} arquivo(s) conferem com o índice."
+            )
+            self.events.status("Cliente já está atualizado.")
+            self.events.progress(100)
+            return True
+
+        await self._process_files(
+            files, base_url, game_root, hash_index, offline=offline, mirrors=files.mirrors
+        )
+        # offline o manifesto pode estar velho: não dá pra afirmar a versão
+        return not self._cancelled and not offline
+
+    async def _blocking(self, func, *args):
+        """Roda uma chamada bloqueante (rede/disco) fora do event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(func, *args))
+
+    async def _map_in_threads(self, func, items, workers, on_result):
+        """
+        Executa func(item) em até `workers` threads: `workers` corrotinas puxam os
+        itens do mesmo iterador, então só há `workers` itens em andamento (nada de
+        uma Task por item em listas de 100 mil arquivos). on_result(item, resultado)
+        roda no loop, na ordem em que terminam (resultado None = cancelado, ignorado).
+        O primeiro erro interrompe os demais.
+        """
+        loop = asyncio.get_running_loop()
+        self._abort_event.clear()
+        pending = iter(items)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            async def worker():
+                # next() só roda na thread do loop: o iterador é compartilhado sem trava
+                for item in pending:
+                    result = await loop.run_in_executor(executor, func, item)
+                    if result is not None:
+                        on_result(item, result)
+
+            runners = [asyncio.ensure_future(worker()) for _ in range(max(1, workers))]
+            try:
+                await asyncio.gather(*runners)
+            except BaseException:
+                self._abort_event.set()
+                for runner in runners:
+                    runner.cancel()
+                await asyncio.gather(*runners, return_exceptions=True)
+                raise
+
+    # -------------------- Versões e deltas --------------------
+
+    def _get_version_url(self, manifest_url):
+        """paths.version_json; se ausente, version.json ao lado do manifesto."""
+        paths = self.config.get("paths", {})
+        url = str(paths.get("version_json", "")).strip()
+        if url:
+            return url
+        return manifest_url.rsplit("/", 1)[0] + "/version.json"
+
+    def _fetch_version_info(self, manifest_url):
+        """
+        Lê o version.json do servidor: (versão, oldest_delta, base_url, deltas_url, espelhos).
+        Retorna None se o servidor não publica versões ou estiver indisponível;
+        nesse caso o fluxo segue só com o manifesto completo.
+        """
+        if not self.config.get("updater", {}).get("incremental_updates", True):
+            return None
+
+        version_url = self._get_version_url(manifest_url)
+        try:
+            data = json.loads(self.http.get_bytes(version_url).decode("utf-8"))
+            version, oldest, base_url, deltas_url, mirrors = parse_version_info(data)
+        except HttpError as e:
+            if e.status != 404:
+                self.events.log(f"Não foi possível ler {version_url} ({e}).")
+            return None
+        except (OSError, ValueError) as e:
+            self.events.log(f"Não foi possível ler {version_url} ({e}).")
+            return None
+
+        if not deltas_url:
+            deltas_url = version_url.rsplit("/", 1)[0] + "/deltas"
+        return version, oldest, base_url, deltas_url.rstrip("/"), mirrors
+
+    async def _apply_deltas(self, version_info, installed, game_root, hash_index):
+        """
+        Aplica a cadeia de deltas da versão instalada até a publicada, processando só
+        os arquivos que mudaram. Retorna False quando não há cadeia utilizável
+        (versão desconhecida, antiga demais ou delta ausente) ou quando o cliente
+        já está na versão publicada: o chamador usa o manifesto completo.
+        """
+        latest, oldest, base_url, deltas_url, mirrors = version_info
+        current = installed.load()
+
+        if current is None:
+            self.events.log("Versão instalada desconhecida, usando manifesto completo.")
+            return False
+        if current > latest:
+            self.events.log(
+                f"Versão instalada ({current}) é mais nova que a publicada ({latest}), "
+                "usando manifesto completo."
+            )
+            return False
+        if current < oldest or latest - current > MAX_DELTA_CHAIN:
+            self.events.log(
+                f"Sem cadeia de deltas da versão {current} para {latest}, usando manifesto completo."
+            )
+            return False
+
+        if current == latest:
+            # mesma versão não garante os arquivos (apagados, trocados, .part pendente),
+            # e o manifesto em cache pode ser de antes dos últimos deltas: o caminho do
+            # manifesto completo faz o GET condicional e, com 304, só confere stat + índice
+            self.events.log(f"Cliente já está na versão {latest}; conferindo os arquivos.")
+            return False
+
+        self.events.status(f"Baixando alterações da versão {current} para {latest}...")
+        # os deltas da cadeia são baixados todos ao mesmo tempo
+        with self.timings.stage("deltas"):
+            results = await asyncio.gather(
+                *(
+                    self._blocking(self._fetch_delta, deltas_url, version)
+                    for version in range(current, latest)
+                ),
+                return_exceptions=True,
+            )
+        if self._cancelled:
+            return True
+
+        deltas = []
+        for version, result in zip(range(current, latest), results):
+            if isinstance(result, (HttpError, OSError, ValueError, AttributeError)):
+                self.events.log(
+                    f"Delta {version}-{version + 1} indisponível ({result}), "
+                    "usando manifesto completo."
+                )
+                return False
+            if isinstance(result, BaseException):
+                raise result
+            deltas.append(result)
+
+        changed, removed = merge_deltas(deltas)
+        base_url = deltas[-1].get("base_url") or base_url
+        self.events.log(
+            f"Atualização incremental {current} -> {latest}: "
+            f"{len(changed)} arquivo(s) alterado(s), {len(removed)} removido(s)."
+        )
+
+        await self._blocking(self._handle_removed, removed, game_root, hash_index)
+
+        if changed:
+            await self._process_files(changed, base_url, game_root, hash_index, mirrors=mirrors)
+        else:
+            self.events.status("Cliente já está atualizado.")
+            self.events.progress(100)
+        return True
+
+    def _fetch_delta(self, deltas_url, version):
+        delta_url = f"{deltas_url}/{version}-{version + 1}.json"
+        delta = json.loads(self.http.get_bytes(delta_url).decode("utf-8"))
+        if delta.get("from") != version or delta.get("to") != version + 1:
+            raise ValueError("versões não conferem")
+        return delta
+
+    def _handle_removed(self, removed, game_root, hash_index):
+        """
+        Arquivos que saíram do cliente. Por padrão só registra no log;
+        com updater.delete_removed_files apaga da pasta do jogo.
+        """
+        delete = self.config.get("updater", {}).get("delete_removed_files", False)
+
+        for path in removed:
+            rel_path = path.replace("/", os.sep).lstrip("\\/")
+            local_path = os.path.normpath(os.path.join(game_root, rel_path))
+            hash_index.discard(path.replace("\\", "/").lstrip("/"))
+
+            if not os.path.isfile(local_path):
+                continue
+            if not delete:
+                self.events.log(f" - Arquivo removido do cliente (mantido): {rel_path}")
+                continue
+            try:
+                os.remove(local_path)
+                self.events.log(f" - Arquivo removido do cliente: {rel_path}")
+            except OSError as e:
+                self.events.log(f" - Não foi possível remover {rel_path}: {e}")
+
+    def _fetch_manifest(self, url):
+        """
+        Baixa o manifesto com GET condicional (ETag / Last-Modified) e guarda uma
+        cópia local. Com updater.binary_manifest ligado, tenta antes o .l2m ao lado
+        do .json (formato binário compacto); sem ele, usa o JSON.
+        Retorna (manifesto, estado):
+          - MANIFEST_FRESH: veio novo do servidor
+          - MANIFEST_NOT_MODIFIED: 304, usa a cópia local
+          - MANIFEST_OFFLINE: servidor indisponível, usa a cópia local (só verificação)
+        """
+        cache = self._manifest_cache()
+        candidates = self._manifest_candidates(url)
+
+        error = None
+        for candidate in candidates:
+            try:
+                return self._fetch_manifest_from(cache, candidate)
+            except (HttpError, OSError) as e:
+                error = e
+                # qualquer falha no .l2m (404, 403, 5xx, timeout) ainda tenta o JSON
+                if candidate != url and not (isinstance(e, HttpError) and e.status == 404):
+                    self.events.log(f"Manifesto binário indisponível ({e}), usando JSON.")
+            except ValueError as e:
+                if candidate == url:
+                    raise
+                self.events.log(f"Manifesto binário inválido ({e}), usando JSON.")
+
+        # servidor indisponível (também para o JSON): usa a cópia local que existir
+        manifest = self._load_cached_manifest(cache, candidates)
+        if manifest is None:
+            raise error
+        self.events.log(
+            f"Servidor indisponível ({error}). Usando manifesto em cache para verificação offline."
+        )
+        return manifest, MANIFEST_OFFLINE
+
+    def _manifest_cache(self):
+        return ManifestCache(self._get_launcher_path("manifest_cache", DEFAULT_MANIFEST_CACHE))
+
+    def _manifest_candidates(self, url):
+        """URLs do manifesto na ordem de tentativa: .l2m (se ligado) e o JSON."""
+        candidates = []
+        use_binary = self.config.get("updater", {}).get("binary_manifest", True)
+        if use_binary and url.lower().endswith(".json"):
+            candidates.append(url[:-len(".json")] + BINARY_MANIFEST_EXT)
+        candidates.append(url)
+        return candidates
+
+    def _load_cached_manifest(self, cache, candidates):
+        """Primeira cópia local válida entre os candidatos, ou None (sem rede)."""
+        for candidate in candidates:
+            body = cache.load(candidate)
+            if body is None:
+                continue
+            try:
+                return load_manifest(body)
+            except ValueError:
+                continue
+        return None
+
+    def _fetch_manifest_from(self, cache, url):
+        with self.timings.measure("manifest_download"):
+            with self.http.get(url, headers=cache.conditional_headers(url)) as resp:
+                body = resp.read()
+                status = resp.status
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+
+        if status == 304:
+            body = cache.load(url)
+            if body is None:
+                # cache sumiu entre o pedido e a resposta: baixa de novo sem condicional
+                with self.timings.measure("manifest_download"):
+                    body = self.http.get_bytes(url)
+                with self.timings.measure("manifest_parse"):
+                    manifest = load_manifest(body)
+                cache.store(url, body)
+                return manifest, MANIFEST_FRESH
+            self.events.log("Manifesto não mudou desde a última verificação (304).")
+            with self.timings.measure("manifest_parse"):
+                try:
+                    return load_manifest(body), MANIFEST_NOT_MODIFIED
+                except ValueError:
+                    # cópia local quebrada: sem ela o 304 não se repete
+                    cache.discard(url)
+                    raise
+
+        # valida antes de gravar, para nunca guardar um manifesto quebrado
+        with self.timings.measure("manifest_parse"):
+            manifest = load_manifest(body)
+        cache.store(url, body, etag, last_modified)
+        self.events.log(f"Manifesto carregado: {url} ({len(body)} bytes)")
+        return manifest, MANIFEST_FRESH
+
+    def _is_clean(self, files, game_root, hash_index):
+        """
+        Confere só com stat + índice (sem ler conteúdo) se todos os arquivos do
+        manifesto estão no disco com o SHA1 esperado.
+        """
+        for info in files:
+            if self._cancelled:
+                return False
+
+            expected_sha1 = info.get("sha1", "").lower().strip()
+            rel_path = info["path"].replace("/", os.sep).lstrip("\\/")
+            local_path = os.path.normpath(os.path.join(game_root, rel_path))
+
+            try:
+                st = os.stat(local_path)
+            except OSError:
+                return False
+            if not stat.S_ISREG(st.st_mode):
+                return False
+
+            if expected_sha1:
+                index_key = info["path"].replace("\\", "/").lstrip("/")
+                if hash_index.lookup(index_key, st) != expected_sha1:
+                    return False
+
+        return True
+
+    async def _process_files(self, files, base_url, game_root, hash_index, offline=False, mirrors=()):
+        """
+        Confere e baixa os arquivos, na ordem de prioridade do manifesto.
+        Com arquivos "critical" (e outros além deles), os críticos passam
+        primeiro: conferidos/baixados, o motor avisa ready() e o JOGAR é liberado
+        enquanto o restante (required, depois optional) continua.
+        """
+        total = len(files)
+        groups = [files]
+        group_names = [""]
+        if not self.verify_only:
+            # só os críticos viram lista (poucos); o resto segue lido sob demanda
+            critical = [info for info in files if priority_rank(info) == 0]
+            if critical and len(critical) < total:
+                rest = _PriorityView(files, total - len(critical))
+                self.events.log(
+                    f"Prioridade: {len(critical)} arquivo(s) essenciais primeiro, "
+                    f"{len(rest)} depois."
+                )
+                groups = [critical, rest]
+                group_names = ["essenciais", "restante"]
+
+        # um só conjunto de espelhos na execução: notas e afastamentos valem para todos os grupos
+        mirror_set = self._build_mirrors(base_url, mirrors)
+        for number, (group, name) in enumerate(zip(groups, group_names), start=1):
+            # cada fase (hash, download) de cada grupo recomeça a barra: o texto diz qual é
+            self._group_label = f" [{name} {number}/{len(groups)}]" if name else ""
+            try:
+                if not await self._process_group(
+                    group, base_url, game_root, hash_index, offline, mirror_set
+                ):
+                    return
+            finally:
+                self._group_label = ""
+            if number < len(groups):
+                self._notify_ready()
+
+        if self.verify_only:
+            return
+        if self.deferred_files:
+            self.events.log(
+                f"{len(self.deferred_files)} arquivo(s) em uso serão aplicados "
+                "na próxima abertura do launcher."
+            )
+        self.events.status(f"Verificação concluída ({total}/{total}).")
+        self.events.log("Processo concluído com sucesso.")
+        self.events.progress(100)
+
+    def _notify_ready(self):
+        self.time_to_play = self.timings.elapsed()
+        self.events.log(
+            f"Arquivos essenciais prontos em {self.time_to_play:.2f}s: o jogo já pode ser "
+            "iniciado, o restante continua em segundo plano."
+        )
+        self.events.ready()
+
+    async def _process_group(self, files, base_url, game_root, hash_index, offline, mirrors):
+        """Verificação (stat + hash) e downloads de um grupo. Retorna False se cancelado."""
+        total = len(files)
+        self._ok_files = 0
+
+        # ---- etapa 1: verificação (stat + índice) ----
+        with self.timings.stage("stat"):
+            checked = await self._blocking(
+                self._stat_files, files, base_url, game_root, hash_index
+            )
+        if checked is None:
+            self.events.log("Atualização cancelada.")
+            return False
+        pending, to_hash = checked
+
+        # ---- etapa 1b: hashes em paralelo ----
+        if to_hash:
+            with self.timings.stage("hash"):
+                await self._hash_all(to_hash, hash_index, pending)
+            if self._cancelled:
+                self.events.log("Atualização cancelada.")
+                return False
+
+        if self._ok_files and self._file_lines() != "all":
+            self.events.log(f"{self._ok_files} de {total} arquivo(s) OK (hash confere).")
+
+        if self.verify_only:
+            # caminhos do manifesto (sempre com "/")
+            self.outdated_files = sorted(task["index_key"] for task in pending)
+            for task in pending:
+                self.events.log(f" - Precisa ser baixado: {task['rel_path']}")
+            if pending:
+                self.events.status(
+                    f"Verificação concluída: {len(pending)} de {total} arquivo(s) desatualizado(s)."
+                )
+            else:
+                self.events.status(f"Verificação concluída ({total}/{total}).")
+            self.events.progress(100)
+            return True
+
+        if pending and offline:
+            for task in pending:
+                self.events.log(f" - Precisa ser baixado: {task['rel_path']}")
+            raise RuntimeError(
+                f"{len(pending)} arquivo(s) precisam ser baixados, "
+                "mas o servidor de atualização está indisponível."
+            )
+
+        # ---- etapa 2: downloads em paralelo ----
+        if pending:
+            # a verificação em paralelo embaralha a ordem: required antes de optional
+            pending.sort(key=lambda task: task["rank"])
+            with self.timings.stage("download"):
+                await self._download_all(pending, hash_index, mirrors)
+            if self._cancelled:
+                self.events.log("Atualização cancelada.")
+                return False
+
+        return True
+
+    def _stat_files(self, files, base_url, game_root, hash_index):
+        """
+        Monta as tarefas do manifesto e separa, só com stat + índice, o que precisa
+        ser baixado e o que precisa de hash. Retorna (pendentes, (tarefa, stat) para
+        hash), ou None se cancelado.
+        """
+        total = len(files)
+        use_index = self.mode != "fullcheck"
+        use_compressed = self.config.get("updater", {}).get("compressed_downloads", True)
+        pending = []  # arquivos que precisam ser baixados
+        to_hash = []  # (task, stat) dos arquivos sem hash válido no índice
+
+        for idx, info in enumerate(files, start=1):
+            if self._cancelled:
+                return None
+            # caminho relativo vindo do JSON
+            rel_path = info["path"].replace("/", os.sep)
+            # remove barras iniciais pra não “escapar” da pasta do launcher
+            rel_path = rel_path.lstrip("\\/")
+
+            expected_sha1 = info.get("sha1", "").lower().strip()
+            file_url = info.get("url")
+
+            if not file_url:
+                # monta URL com base_url
+                file_url = derive_url(base_url, info["path"])
+
+            task = {
+                "rel_path": rel_path,
+                # SEMPRE dentro de game_root
+                "local_path": os.path.normpath(os.path.join(game_root, rel_path)),
+                "url": file_url,
+                "size": info.get("size", 0) or 0,
+                "sha1": expected_sha1,
+                # chave do índice: caminho do manifesto, sempre com "/"
+                "index_key": info["path"].replace("\\", "/").lstrip("/"),
+                # assinatura de blocos (delta), só para arquivos grandes
+                "sig_url": info.get("sig_url", ""),
+                # variante pré-comprimida (gzip/zlib/xz), quando compensa
+                "compressed": pick_compressed(info) if use_compressed else None,
+                "has_local": False,
+                # ordem de download (0 = critical); ver app/manifest.py
+                "rank": priority_rank(info),
+            }
+
+            msg_prefix = f"[{idx}/{total}] {rel_path}"
+            self.events.status(f"Verificando {msg_prefix}...")
+            if self._file_lines() == "all":
+                self.events.log(f"Verificando arquivo: {rel_path}")
+
+            try:
+                st = os.stat(task["local_path"])
+            except OSError:
+                st = None
+
+            if st is None or not stat.S_ISREG(st.st_mode):
+                self.events.log(f" - {rel_path}: arquivo não existe, será baixado.")
+                hash_index.discard(task["index_key"])
+                pending.append(task)
+            elif expected_sha1:
+                local_sha1 = hash_index.lookup(task["index_key"], st) if use_index else None
+                if local_sha1 is None:
+                    # hash calculado depois, em paralelo
+                    to_hash.append((task, st))
+                    continue
+                self._check_hash(task, local_sha1, hash_index, pending)
+
+            progress = int(idx * 100 / total)
+            self.events.progress(progress)
+
+        return pending, to_hash
+
+    def _check_hash(self, task, local_sha1, hash_index, pending):
+        if local_sha1.lower() != task["sha1"]:
+            self.events.log(f" - {task['rel_path']}: hash diferente, será baixado novamente.")
+            hash_index.discard(task["index_key"])
+            # versão antiga no disco: pode servir de base para o delta
+            task["has_local"] = True
+            pending.append(task)
+        else:
+            self._ok_files += 1
+            mode = self._file_lines()
+            if mode == "all" or (
+                mode == "sample" and self._ok_files % self._file_lines_sample() == 1
+            ):
+                self.events.log(f" - {task['rel_path']}: OK (hash confere).")
+
+    def _file_lines(self):
+        mode = str(self.config.get("logging", {}).get("file_lines", DEFAULT_FILE_LINES))
+        return mode if mode in ("all", "sample", "summary") else DEFAULT_FILE_LINES
+
+    def _file_lines_sample(self):
+        try:
+            every = int(self.config.get("logging", {}).get("file_lines_sample", DEFAULT_FILE_LINES_SAMPLE))
+        except (TypeError, ValueError):
+            every = DEFAULT_FILE_LINES_SAMPLE
+        return max(1, every)
+
+    async def _hash_all(self, to_hash, hash_index, pending):
+        """
+        Calcula os SHA1 pendentes em um pool de threads (hashlib libera o GIL
+        em buffers grandes). hash_workers define o número de threads e
+        hash_io_concurrency limita quantos arquivos são lidos ao mesmo tempo
+        (use 1 para HD mecânico). O índice só é alterado na thread do loop.
+        """
+        workers = self._get_int_setting("hash_workers", 0)
+        if workers <= 0:
+            workers = min(DEFAULT_MAX_HASH_WORKERS, os.cpu_count() or 2)
+        workers = max(1, min(workers, len(to_hash)))
+
+        io_limit = self._get_int_setting("hash_io_concurrency", 0)
+        io_sem = threading.BoundedSemaphore(io_limit) if io_limit > 0 else None
+
+        hash_total = len(to_hash)
+        tracker = ProgressTracker(sum(st.st_size for _, st in to_hash), hash_total)
+
+        def report(nbytes):
+            self._emit_progress(tracker.add(nbytes), "Verificando hashes")
+
+        def job(item):
+            task, st = item
+            if self._should_stop():
+                return None
+            if io_sem is None:
+                return self._timed_sha1(task, st, report)
+            with io_sem:
+                return self._timed_sha1(task, st, report)
+
+        def on_result(item, local_sha1):
+            task, st = item
+            hash_index.record(task["index_key"], st, local_sha1)
+            self._check_hash(task, local_sha1, hash_index, pending)
+            self._emit_progress(tracker.add(file_done=True), "Verificando hashes")
+
+        self.events.log(
+            f"Calculando hash de {hash_total} arquivo(s) "
+            f"({format_bytes(tracker.total_bytes)}) com {workers} thread(s)."
+        )
+        self.events.progress(0)
+
+        await self._map_in_threads(job, to_hash, workers, on_result)
+
+        if not self._cancelled:
+            self._log_phase_summary("Hash", tracker)
+
+    def _timed_sha1(self, task, st, report):
+        start = time.perf_counter()
+        sha1 = self._calc_sha1(task["local_path"], on_progress=report)
+        if sha1 is not None:
+            self.timings.file_done(
+                "hash", task["index_key"], st.st_size, time.perf_counter() - start
+            )
+        return sha1
+
+    async def _download_all(self, pending, hash_index, mirrors):
+        """
+        Baixa os arquivos pendentes usando até max_concurrent_downloads conexões.
+        O progresso é agregado (bytes de todos os downloads) e reportado pelos
+        mesmos eventos progress / status. O SHA1 calculado durante
+        o download já vai para o índice, sem reler o arquivo.
+        Com espelhos configurados, cada arquivo vai para o espelho mais rápido e
+        menos ocupado; se ele falhar ou ficar lento, o arquivo continua (do .part)
+        em outro espelho.
+        """
+        workers = self._get_int_setting(
+            "max_concurrent_downloads", DEFAULT_MAX_CONCURRENT_DOWNLOADS
+        )
+        workers = max(1, min(workers, len(pending)))
+
+        total_files = len(pending)
+        tracker = ProgressTracker(sum(task["size"] for task in pending), total_files)
+
+        def report(nbytes=0, file_done=False, resumed=False):
+            # bytes retomados de um .part contam no progresso, mas não na vazão
+            snap = tracker.add(nbytes, file_done, transferred=not resumed)
+            self._emit_progress(snap, "Baixando arquivos")
+
+        if len(mirrors) > 1 and not mirrors.probed:
+            await self._blocking(self._probe_mirrors, mirrors, pending)
+
+        def download(task):
+            if self._should_stop():
+                return None
+            self._ensure_dir(task["local_path"])
+            file_start = time.perf_counter()
+
+            tried = []
+            while True:
+                mirror = mirrors.acquire(exclude=tried)
+                attempt = {"bytes": 0}
+
+                def attempt_report(nbytes=0, file_done=False, resumed=False):
+                    attempt["bytes"] += nbytes
+                    report(nbytes, file_done, resumed)
+
+                started = time.monotonic()
+                self._stream_watch.watch = self._new_stream_watch(mirrors, tried + [mirror])
+                try:
+                    sha1 = self._download_task(mirrors.task_for(task, mirror), attempt_report)
+                except FileInUse:
+                    # o download deu certo: não é falha do espelho nem da execução
+                    mirrors.release(
+                        mirror, ok=True, nbytes=attempt["bytes"],
+                        seconds=time.monotonic() - started,
+                    )
+                    self.deferred_files.append(task["index_key"])
+                    self.events.log(
+                        f"   -> {task['rel_path']} está em uso (jogo aberto?): a versão "
+                        "conferida fica no .part e será aplicada na próxima abertura do launcher."
+                    )
+                    return None
+                except (HttpError, OSError, RuntimeError) as e:
+                    mirrors.release(mirror, ok=False)
+                    tried.append(mirror)
+                    if self._should_stop() or not mirrors.has_alternative(tried):
+                        raise
+                    # o .part fica no disco e é retomado no próximo espelho:
+                    # desconta o progresso desta tentativa para não contar duas vezes
+                    report(-attempt["bytes"], resumed=True)
+                    self.events.log(
+                        f"   -> Espelho {mirror.root} falhou para {task['rel_path']} ({e}), "
+                        "tentando outro espelho."
+                    )
+                    continue
+                finally:
+                    self._stream_watch.watch = None
+
+                if sha1 is None:
+                    mirrors.release(mirror, ok=True)  # cancelado: não é culpa do espelho
+                else:
+                    mirrors.release(
+                        mirror, ok=True, nbytes=attempt["bytes"],
+                        seconds=time.monotonic() - started,
+                    )
+                    self.timings.file_done(
+                        "download", task["index_key"], task["size"],
+                        time.perf_counter() - file_start,
+                    )
+                return sha1
+
+        def on_result(task, sha1):
+            try:
+                st = os.stat(task["local_path"])
+            except OSError:
+                return
+            # hash veio do próprio stream que gravamos: pode confiar no mtime atual
+            hash_index.record(task["index_key"], st, sha1, check_racy=False)
+
+        self.events.log(
+            f"Baixando {total_files} arquivo(s) ({format_bytes(tracker.total_bytes)}) "
+            f"com {workers} conexão(ões) simultânea(s)."
+        )
+        self.events.progress(0)
+
+        await self._map_in_threads(download, pending, workers, on_result)
+
+        if not self._cancelled:
+            self._log_phase_summary("Download", tracker)
+
+    def _download_task(self, task, report):
+        """Baixa um arquivo (delta, se der, senão inteiro). Retorna o SHA1 ou None se cancelado."""
+        if self._can_use_delta(task):
+            try:
+                sha1 = self._download_delta(task, on_progress=report)
+                if sha1 is not None:
+                    report(file_done=True)
+                return sha1
+            except DeltaUnavailable as e:
+                self.events.log(
+                    f"   -> Delta indisponível para {task['rel_path']} ({e}), "
+                    "baixando o arquivo inteiro."
+                )
+
+        if self._can_segment(task):
+            try:
+                sha1 = self._download_segmented(task, on_progress=report)
+                if sha1 is not None:
+                    report(file_done=True)
+                return sha1
+            except SegmentedUnavailable as e:
+                self.events.log(
+                    f"   -> Download segmentado indisponível para {task['rel_path']} ({e}), "
+                    "usando uma conexão."
+                )
+
+        sha1 = self._download_file(
+            task["url"],
+            task["local_path"],
+            expected_sha1=task["sha1"],
+            expected_size=task["size"],
+            on_progress=report,
+            compressed=task["compressed"],
+        )
+        if sha1 is not None:
+            report(file_done=True)
+        return sha1
+
+    def _build_mirrors(self, base_url, mirror_urls):
+        """Monta o conjunto de espelhos (config + manifesto); a sondagem fica para o primeiro download."""
+        configured = self.config.get("paths", {}).get("mirrors", []) or []
+        return MirrorSet(base_url, list(configured) + list(mirror_urls or []))
+
+    def _probe_mirrors(self, mirrors, pending):
+        """Sonda os espelhos uma vez por execução, com um dos arquivos pendentes."""
+        # amostra: o maior arquivo pendente (garante os bytes da sondagem)
+        sample = max(pending, key=lambda task: task["size"])
+        timeout = self._get_int_setting("mirror_probe_timeout", DEFAULT_MIRROR_PROBE_TIMEOUT)
+        self.events.status(f"Testando {len(mirrors)} servidores de download...")
+        for mirror, error in mirrors.probe(self.http, sample["url"], timeout):
+            if error is not None:
+                self.events.log(f"Espelho indisponível: {mirror.root} ({error})")
+        self.events.log(f"Espelhos: {mirrors.describe()}")
+
+    def _new_stream_watch(self, mirrors, tried):
+        """
+        Vigia de velocidade mínima para o próximo download. Só faz sentido com outro
+        espelho ainda não tentado (tried inclui o atual) para onde ir: no último o
+        download segue, mesmo lento. Fica desligada com limite de banda ativo.
+        """
+        min_kbps = self._get_int_setting("mirror_min_speed_kbps", DEFAULT_MIRROR_MIN_SPEED_KBPS)
+        if (
+            not mirrors.has_alternative(tried)
+            or min_kbps <= 0
+            or self.bandwidth.effective_kbps() > 0
+        ):
+            return None
+        return StreamWatch(min_kbps * 1024, MIRROR_SPEED_WINDOW)
+
+    def _on_chunk(self, nbytes):
+        """A cada pedaço recebido da rede: limite de banda e vigia de espelho lento."""
+        self.bandwidth.consume(nbytes, self._should_stop)
+        watch = getattr(self._stream_watch, "watch", None)
+        if watch is not None:
+            watch.add(nbytes)
+
+    def _emit_progress(self, snap, label):
+        """Repassa um ProgressSnapshot para os eventos (None = nada novo para mostrar)."""
+        if snap is None:
+            return
+        self.events.bytes_progress(snap.done_bytes, snap.total_bytes)
+        self.events.throughput(
+            float(snap.rate), float(snap.eta) if snap.eta is not None else -1.0
+        )
+        self.events.progress(snap.percent)
+        self.events.status(
+            f"{label}{self._group_label} ({snap.done_files}/{snap.total_files}) - "
+            f"{format_bytes(snap.done_bytes)} / {format_bytes(snap.total_bytes)} - "
+            f"{format_rate(snap.rate)} - restante {format_eta(snap.eta)}"
+        )
+
+    def _log_phase_summary(self, phase, tracker):
+        """Linha de log com volume, tempo e vazão média da fase (análise de desempenho)."""
+        snap = tracker.snapshot()
+        average = snap.done_bytes / snap.elapsed if snap.elapsed > 0 else 0.0
+        self.events.log(
+            f"{phase}: {snap.done_files} arquivo(s), {format_bytes(snap.done_bytes)} "
+            f"em {snap.elapsed:.2f}s (média {format_rate(average)})."
+        )
+
+    def _should_stop(self):
+        return self._cancelled or self._abort_event.is_set()
+
+    def _get_int_setting(self, name, default):
+        updater_cfg = self.config.get("updater", {})
+        try:
+            return int(updater_cfg.get(name, default))
+        except (TypeError, ValueError):
+            return default
+
+    # -------------------- Helpers de rede / arquivos --------------------
+
+    def _download_file(
+        self,
+        url,
+        dest_path,
+        expected_sha1="",
+        expected_size=0,
+        chunk_size=1024 * 128,
+        on_progress=None,
+        compressed=None,
+    ):
+        """
+        Baixa para "<destino>.part" calculando o SHA1 durante o stream e só
+        substitui o destino (os.replace) se o hash/tamanho conferirem com o
+        manifesto; assim um download corrompido nunca sobrescreve um arquivo bom.
+        Um arquivo lateral "<destino>.part.json" guarda o SHA1/tamanho esperados:
+        se bater com o manifesto, o download continua de onde parou com Range.
+        Se o manifesto tiver variante comprimida, ela é baixada e descomprimida
+        durante o stream (a retomada de um .part sempre usa o arquivo sem compressão).
+        Retorna o SHA1 (hex) gravado, ou None se cancelado (o .part fica no disco).
+        """
+        part_path = dest_path + PART_SUFFIX
+        meta_path = part_path + ".json"
+        meta = {"sha1": expected_sha1, "size": expected_size}
+        retries = max(0, self._get_int_setting("download_retries", DEFAULT_DOWNLOAD_RETRIES))
+
+        for attempt in range(1, retries + 2):
+            result = self._fetch_part(
+                url, part_path, meta_path, meta, chunk_size, on_progress, compressed
+            )
+            if result is None:
+                return None
+
+            sha1, size = result
+            if expected_size and size < expected_size:
+                # servidor/proxy fechou a conexão antes do fim (chega como EOF normal):
+                # o que veio está certo, então o .part fica e a próxima tentativa usa Range
+                self.events.log(
+                    f"   -> Conexão encerrada em {size} de {expected_size} bytes, "
+                    f"tentativa {attempt}/{retries + 1}: {url}"
+                )
+                if on_progress is not None:
+                    # a retomada conta o trecho de novo (resumed)
+                    on_progress(-size, resumed=True)
+                continue
+
+            if expected_size and size != expected_size:
+                problem = f"tamanho {size} bytes, esperado {expected_size}"
+            elif expected_sha1 and sha1 != expected_sha1:
+                problem = f"SHA1 {sha1}, esperado {expected_sha1}"
+            else:
+                self._commit_part(part_path, meta_path, dest_path)
+                return sha1
+
+            self.events.log(
+                f"   -> Arquivo corrompido ({problem}), tentativa {attempt}/{retries + 1}: {url}"
+            )
+            self._discard_part(part_path, meta_path)
+            if on_progress is not None:
+                # desconta os bytes descartados do progresso agregado
+                on_progress(-size)
+
+        raise RuntimeError(
+            f"Falha ao baixar {url}: arquivo incompleto ou diferente do manifesto "
+            f"após {retries + 1} tentativa(s)."
+        )
+
+    def _fetch_part(
+        self, url, part_path, meta_path, meta, chunk_size, on_progress, compressed=None
+    ):
+        """Completa o .part e retorna (sha1, tamanho), ou None se cancelado."""
+        h = hashlib.sha1()
+
+        offset = self._resume_offset(part_path, meta_path, meta)
+        if offset:
+            # o hash precisa cobrir o trecho que já estava no disco
+            if self._hash_prefix(h, part_path, offset) is None:
+                return None
+
+        if offset and meta["size"] and offset == meta["size"]:
+            # já estava completo, só não tinha sido renomeado
+            self.events.log(f"   -> Arquivo parcial já completo: {part_path}")
+            if on_progress is not None:
+                on_progress(offset, resumed=True)
+            return h.hexdigest(), offset
+
+        if not offset:
+            self._write_part_meta(meta_path, meta)
+
+        if not offset and compressed:
+            try:
+                return self._fetch_compressed(
+                    compressed, part_path, meta["size"], chunk_size, on_progress
+                )
+            except (ValueError, HttpError) as e:
+                self.events.log(
+                    f"   -> Falha na variante comprimida ({e}), baixando sem compressão."
+                )
+
+        headers = {"Range": f"bytes={offset}-"} if offset else None
+        try:
+            resp = self.http.get(url, headers=headers)
+        except HttpError as e:
+            if not offset or e.status != 416:
+                raise
+            # faixa inválida (arquivo mudou no servidor?): recomeça do zero
+            offset, headers = 0, None
+            resp = self.http.get(url)
+
+        with resp:
+            if offset and not self._is_resumed(resp, offset):
+                # servidor ignorou o Range: reescreve o arquivo inteiro
+                self.events.log("   -> Servidor não suporta retomada, baixando do início.")
+                offset = 0
+
+            if offset:
+                self.events.log(
+                    f"   -> Retomando de {offset / (1024 * 1024):.2f} MB: {url}"
+                )
+                if on_progress is not None:
+                    on_progress(offset, resumed=True)
+            else:
+                h = hashlib.sha1()
+                self.events.log(f"   -> Baixando de {url}")
+
+            size = offset
+            read = self.timings.timed(resp.read, "network")
+            with open(part_path, "ab" if offset else "wb") as f:
+                write = self.timings.timed(f.write, "write")
+                while True:
+                    if self._should_stop():
+                        self.events.log("Download cancelado.")
+                        return None
+                    chunk = read(chunk_size)
+                    if not chunk:
+                        break
+                    write(chunk)
+                    h.update(chunk)
+                    size += len(chunk)
+                    if on_progress is not None:
+                        on_progress(len(chunk))
+                    # depois de gravar: se trocar de espelho, o .part já tem este pedaço
+                    self._on_chunk(len(chunk))
+                    if meta["size"] and size > meta["size"]:
+                        break  # maior que o manifesto: já está errado
+
+        return h.hexdigest(), size
+
+    def _fetch_compressed(self, compressed, part_path, expected_size, chunk_size, on_progress):
+        """
+        Baixa a variante comprimida e grava o .part já descomprimido, calculando o
+        SHA1 sobre os dados descomprimidos. ValueError = stream inválido.
+        """
+        decoder = StreamDecoder(compressed["encoding"])
+        h = hashlib.sha1()
+        size = 0
+        received = 0
+
+        def write(data):
+            nonlocal size
+            if not data:
+                return
+            timed_write(data)
+            h.update(data)
+            size += len(data)
+            if on_progress is not None:
+                on_progress(len(data))
+            if expected_size and size > expected_size:
+                raise ValueError("conteúdo descomprimido maior que o esperado")
+
+        self.events.log(
+            f"   -> Baixando ({compressed['encoding']}) de {compressed['url']}"
+        )
+        try:
+            with self.http.get(compressed["url"]) as resp, open(part_path, "wb") as f:
+                read = self.timings.timed(resp.read, "network")
+                decompress = self.timings.timed(decoder.decompress, "decompress")
+                timed_write = self.timings.timed(f.write, "write")
+                while True:
+                    if self._should_stop():
+                        self.events.log("Download cancelado.")
+                        return None
+                    chunk = read(chunk_size)
+                    if not chunk:
+                        break
+                    self._on_chunk(len(chunk))
+                    received += len(chunk)
+                    write(decompress(chunk))
+                write(decoder.finish())
+        except ValueError:
+            if on_progress is not None:
+                on_progress(-size)
+            raise
+
+        if size:
+            self.events.log(
+                f"   -> {received / (1024 * 1024):.2f} MB transferidos para "
+                f"{size / (1024 * 1024):.2f} MB ({compressed['encoding']})"
+            )
+        return h.hexdigest(), size
+
+    def _hash_prefix(self, h, file_path, length, chunk_size=1024 * 1024):
+        with open(file_path, "rb") as f:
+            remaining = length
+            while remaining > 0:
+                if self._should_stop():
+                    return None
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                h.update(chunk)
+                remaining -= len(chunk)
+        return h
+
+    def _can_use_delta(self, task):
+        if not (task["sig_url"] and task["has_local"]):
+            return False
+        if not self.config.get("updater", {}).get("delta_enabled", True):
+            return False
+
+        # se já existe um .part retomável, continuar o download é mais barato
+        part_path = task["local_path"] + PART_SUFFIX
+        meta_path = part_path + ".json"
+        meta = {"sha1": task["sha1"], "size": task["size"]}
+        if self._resume_offset(part_path, meta_path, meta) > 0:
+            return False
+        # .part segmentado (sidecar com "segments"): retomado pelo download segmentado.
+        # Aqui o .part sequencial já foi descartado acima, então _load_segments só lê.
+        count = self._get_int_setting("download_segments", DEFAULT_DOWNLOAD_SEGMENTS)
+        return self._load_segments(part_path, meta_path, meta, count) is None
+
+    def _download_delta(self, task, chunk_size=1024 * 128, on_progress=None):
+        """
+        Remonta o arquivo novo a partir dos blocos que já existem na versão local,
+        baixando só os blocos alterados via Range. O resultado passa pela mesma
+        verificação de SHA1 e commit atômico do download normal.
+        Levanta DeltaUnavailable quando é melhor baixar o arquivo inteiro.
+        """
+        url = task["url"]
+        local_path = task["local_path"]
+        part_path = local_path + PART_SUFFIX
+        meta_path = part_path + ".json"
+
+        try:
+            signature = json.loads(self.http.get_bytes(task["sig_url"]).decode("utf-8"))
+        except (HttpError, OSError, ValueError) as e:
+            raise DeltaUnavailable(f"assinatura não disponível: {e}")
+
+        block_size, size, blocks = parse_signature(signature, task["size"], task["sha1"])
+
+        local_hashes = local_block_hashes(local_path, block_size, self._should_stop)
+        if local_hashes is None:
+            return None
+
+        ops, fetch_bytes = plan_delta(block_size, size, blocks, local_hashes)
+        if fetch_bytes > size * MAX_FETCH_RATIO:
+            raise DeltaUnavailable(f"{fetch_bytes * 100 // max(size, 1)}% do arquivo mudou")
+
+        self.events.log(
+            f"   -> Delta {task['rel_path']}: reaproveitando "
+            f"{(size - fetch_bytes) / (1024 * 1024):.2f} MB, baixando "
+            f"{fetch_bytes / (1024 * 1024):.2f} MB"
+        )
+
+        self._write_part_meta(meta_path, {"sha1": task["sha1"], "size": task["size"]})
+        h = hashlib.sha1()
+        written = 0
+
+        def emit(chunk):
+            nonlocal written
+            out_write(chunk)
+            h.update(chunk)
+            written += len(chunk)
+            if on_progress is not None:
+                on_progress(len(chunk))
+
+        try:
+            with open(local_path, "rb") as src, open(part_path, "wb") as out:
+                out_write = self.timings.timed(out.write, "write")
+                for kind, a, b in ops:
+                    if kind == "copy":
+                        src.seek(a)
+                        remaining = b
+                        while remaining > 0:
+                            if self._should_stop():
+                                return None
+                            chunk = src.read(min(chunk_size, remaining))
+                            if not chunk:
+                                raise DeltaUnavailable("arquivo local mudou durante o delta")
+                            emit(chunk)
+                            remaining -= len(chunk)
+                        continue
+
+                    with self.http.get(url, headers={"Range": f"bytes={a}-{b}"}) as resp:
+                        content_range = resp.headers.get("Content-Range", "")
+                        if resp.status != 206 or not content_range.startswith(f"bytes {a}-{b}/"):
+                            raise DeltaUnavailable("servidor não suporta Range")
+                        read = self.timings.timed(resp.read, "network")
+                        while True:
+                            if self._should_stop():
+                                return None
+                            chunk = read(chunk_size)
+                            if not chunk:
+                                break
+                            self._on_chunk(len(chunk))
+                            emit(chunk)
+        except (DeltaUnavailable, HttpError) as e:
+            self._discard_part(part_path, meta_path)
+            if on_progress is not None:
+                on_progress(-written)
+            if isinstance(e, HttpError):
+                raise DeltaUnavailable(str(e))
+            raise
+
+        sha1 = h.hexdigest()
+        if written != size or (task["sha1"] and sha1 != task["sha1"]):
+            self._discard_part(part_path, meta_path)
+            if on_progress is not None:
+                on_progress(-written)
+            raise DeltaUnavailable("arquivo remontado não confere com o manifesto")
+
+        self._commit_part(part_path, meta_path, local_path)
+        return sha1
+
+    def _can_segment(self, task):
+        """
+        Arquivos a partir de updater.segmented_min_size são baixados em faixas paralelas.
+        Com variante pré-comprimida o stream comprimido tem prioridade (menos bytes).
+        Arquivo que renderia uma faixa só (menor que 2 x MIN_SEGMENT_SIZE) vai num stream.
+        """
+        min_size = self._get_int_setting("segmented_min_size", DEFAULT_SEGMENTED_MIN_SIZE)
+        count = self._get_int_setting("download_segments", DEFAULT_DOWNLOAD_SEGMENTS)
+        return (
+            count > 1
+            and min_size > 0
+            and task["size"] >= min_size
+            and not task["compressed"]
+            and len(plan_segments(0, task["size"] - 1, count)) > 1
+        )
+
+    def _download_segmented(self, task, chunk_size=1024 * 128, on_progress=None):
+        """
+        Baixa o arquivo em várias faixas ao mesmo tempo (Range), gravando cada uma na
+        sua posição do .part pré-alocado. No fim o SHA1 é calculado numa leitura
+        sequencial do .part e o commit é o mesmo do download normal.
+        Levanta SegmentedUnavailable quando é melhor baixar em um único stream.
+        Retorna o SHA1 (hex) ou None se cancelado (o .part fica para retomar).
+        """
+        url = task["url"]
+        size = task["size"]
+        part_path = task["local_path"] + PART_SUFFIX
+        meta_path = part_path + ".json"
+        base_meta = {"sha1": task["sha1"], "size": size}
+        count = self._get_int_setting("download_segments", DEFAULT_DOWNLOAD_SEGMENTS)
+
+        segments = self._load_segments(part_path, meta_path, base_meta, count)
+        if segments is None:
+            segments = plan_segments(0, size - 1, count)
+            # pré-aloca: cada faixa grava direto na sua posição
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+            self._write_part_meta(meta_path, dict(base_meta, segments=segments))
+            self.events.log(
+                f"   -> Baixando em {len(segments)} faixa(s) paralelas: {url}"
+            )
+        else:
+            resumed = sum(done for _, _, done in segments)
+            self.events.log(
+                f"   -> Retomando download segmentado de "
+                f"{resumed / (1024 * 1024):.2f} MB: {url}"
+            )
+            if on_progress is not None and resumed:
+                on_progress(resumed, resumed=True)
+
+        lock = threading.Lock()
+        failed = threading.Event()
+
+        def should_stop():
+            return self._should_stop() or failed.is_set()
+
+        def save():
+            with lock:
+                self._write_part_meta(meta_path, dict(base_meta, segments=segments))
+
+        def fetch(segment):
+            start, end, _ = segment
+            if not remaining_bytes(segment):
+                return
+            offset = start + segment[2]
+
+            with self.http.get(url, headers={"Range": f"bytes={offset}-{end}"}) as resp:
+                content_range = resp.headers.get("Content-Range", "")
+                if resp.status != 206 or not content_range.startswith(f"bytes {offset}-{end}/"):
+                    raise SegmentedUnavailable("servidor não suporta Range")
+
+                unsaved = 0
+                read = self.timings.timed(resp.read, "network")
+                with open(part_path, "r+b") as f:
+                    write = self.timings.timed(f.write, "write")
+                    f.seek(offset)
+                    while remaining_bytes(segment):
+                        if should_stop():
+                            break
+                        chunk = read(min(chunk_size, remaining_bytes(segment)))
+                        if not chunk:
+                            break
+                        write(chunk)
+                        with lock:
+                            segment[2] += len(chunk)
+                        if on_progress is not None:
+                            on_progress(len(chunk))
+                        self._on_chunk(len(chunk))
+
+                        unsaved += len(chunk)
+                        if unsaved >= SEGMENT_SAVE_INTERVAL:
+                            f.flush()
+                            save()
+                            unsaved = 0
+
+            if not should_stop() and remaining_bytes(segment):
+                raise ConnectionError(
+                    f"faixa {start}-{end} terminou com {remaining_bytes(segment)} bytes faltando"
+                )
+
+        pending = [segment for segment in segments if remaining_bytes(segment)]
+        try:
+            if pending:
+                with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                    futures = [executor.submit(fetch, segment) for segment in pending]
+                    try:
+                        for future in as_completed(futures):
+                            future.result()
+                    except BaseException:
+                        # uma faixa falhou: as outras param e o progresso fica salvo
+                        failed.set()
+                        raise
+        except SegmentedUnavailable:
+            # o download normal recomeça do zero: desfaz o .part e o progresso
+            self._discard_part(part_path, meta_path)
+            if on_progress is not None:
+                on_progress(-sum(done for _, _, done in segments))
+            raise
+        finally:
+            if os.path.exists(part_path):
+                save()
+
+        if self._should_stop():
+            self.events.log("Download cancelado.")
+            return None
+
+        with self.timings.measure("verify"):
+            h = self._hash_prefix(hashlib.sha1(), part_path, size)
+        if h is None:
+            return None
+        sha1 = h.hexdigest()
+
+        if task["sha1"] and sha1 != task["sha1"]:
+            self._discard_part(part_path, meta_path)
+            if on_progress is not None:
+                on_progress(-size)
+            raise SegmentedUnavailable(f"SHA1 {sha1}, esperado {task['sha1']}")
+
+        self._commit_part(part_path, meta_path, task["local_path"])
+        return sha1
+
+    def _load_segments(self, part_path, meta_path, base_meta, count):
+        """
+        Faixas para retomar um .part existente, ou None para começar do zero.
+        Um .part sequencial (download normal interrompido) também é aproveitado:
+        o trecho já baixado vira uma faixa completa e o resto é dividido.
+        """
+        if not base_meta["sha1"]:
+            return None
+
+        try:
+            part_size = os.path.getsize(part_path)
+            with open(meta_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(saved, dict):
+            return None
+
+        size = base_meta["size"]
+        if {k: saved.get(k) for k in base_meta} != base_meta:
+            return None
+
+        if "segments" in saved:
+            if part_size != size:
+                return None
+            return parse_segments(saved["segments"], size)
+
+        # .part sequencial: bytes [0, part_size) já estão certos
+        # (part_size == size: download completo que não pôde ser aplicado, arquivo em uso)
+        if not 0 < part_size <= size:
+            return None
+        with open(part_path, "r+b") as f:
+            f.truncate(size)
+        segments = [[0, part_size - 1, part_size]] + plan_segments(part_size, size - 1, count)
+        self._write_part_meta(meta_path, dict(base_meta, segments=segments))
+        return segments
+
+    def _resume_offset(self, part_path, meta_path, meta):
+        """Quantos bytes do .part podem ser reaproveitados (0 = começar do zero)."""
+        if not (meta["sha1"] or meta["size"]):
+            # sem SHA1 nem tamanho não há como saber se o .part é da mesma versão
+            return 0
+
+        try:
+            offset = os.path.getsize(part_path)
+            with open(meta_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        if saved != meta:
+            return 0
+        if meta["size"] and offset > meta["size"]:
+            return 0
+        return offset
+
+    def _is_resumed(self, resp, offset):
+        if resp.status != 206:
+            return False
+        content_range = resp.headers.get("Content-Range", "")
+        # formato: "bytes <início>-<fim>/<total>"
+        return content_range.startswith(f"bytes {offset}-")
+
+    def _write_part_meta(self, meta_path, meta):
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _commit_part(self, part_path, meta_path, dest_path):
+        """Troca o arquivo do jogo pelo .part conferido; FileInUse se o destino estiver preso."""
+        with self.timings.measure("commit"):
+            try:
+                os.replace(part_path, dest_path)
+            except OSError as e:
+                if not _is_file_in_use(e):
+                    raise
+                # .part e .part.json continuam: a próxima execução retoma "já completo"
+                raise FileInUse(str(e)) from e
+            try:
+                os.remove(meta_path)
+            except OSError:
+                pass
+
+    def _discard_part(self, part_path, meta_path):
+        for path in (part_path, meta_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _ensure_dir(self, file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    def _calc_sha1(self, file_path, chunk_size=1024 * 1024, on_progress=None):
+        h = hashlib.sha1()
+        with open(file_path, "rb") as f:
+            while True:
+                if self._should_stop():
+                    return None
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                h.update(chunk)
+                if on_progress is not None:
+                    on_progress(len(chunk))
+        return h.hexdigest()
@@ -0,0 +1,161 @@
+import os
+import struct
+import time
+import zlib
+import logging
+
+# Formato do arquivo (little-endian):
+#   cabeçalho: MAGIC | versão (H) | qtd. entradas (I) | tamanho do blob de caminhos (I)
+#              | tamanho da raiz (H) | crc32 do payload (I)
+#   payload:   raiz (utf-8) | registros fixos (size, mtime_ns, inode, sha1) | caminhos (utf-8, separados por \0)
+#
+# Os registros têm tamanho fixo para poderem ser lidos de uma vez com struct.iter_unpack,
+# o que mantém a carga em poucos milissegundos mesmo com centenas de milhares de entradas.
+
+MAGIC = b"L2HI"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHIIHI")
+_RECORD = struct.Struct("<QqQ20s")
+
+# arquivos modificados há menos que isso podem mudar de novo sem alterar o mtime
+# (resolução do sistema de arquivos), então não são gravados no índice
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+_INODE_MASK = (1 << 64) - 1
+
+
+def _inode(st):
+    """
+    st_ino em 64 bits (campo Q do registro). IDs de arquivo do ReFS têm 128 bits:
+    as duas metades são combinadas; inodes que já cabem em 64 bits não mudam.
+    """
+    ino = st.st_ino
+    while ino > _INODE_MASK:
+        ino = (ino & _INODE_MASK) ^ (ino >> 64)
+    return ino
+
+
+class HashIndex:
+    """
+    Índice local de hashes: caminho relativo -> (size, mtime_ns, inode, sha1).
+    Permite pular o SHA1 de arquivos cujo stat não mudou desde a última verificação.
+    """
+
+    def __init__(self, index_path, game_root):
+        self.index_path = index_path
+        self.game_root = os.path.normcase(os.path.normpath(game_root))
+        self._entries = {}
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -------------------- Consulta / atualização --------------------
+
+    def lookup(self, rel_key, st):
+        """Retorna o SHA1 (hex minúsculo) se o stat bater com o registrado, senão None."""
+        entry = self._entries.get(rel_key)
+        if entry is None:
+            return None
+
+        size, mtime_ns, inode, sha1 = entry
+        if size != st.st_size or mtime_ns != st.st_mtime_ns or inode != _inode(st):
+            return None
+
+        return sha1.hex()
+
+    def record(self, rel_key, st, sha1_hex, check_racy=True):
+        if check_racy and time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            # arquivo "recente demais": não confia no mtime, força re-hash na próxima vez
+            self.discard(rel_key)
+            return
+
+        entry = (st.st_size, st.st_mtime_ns, _inode(st), bytes.fromhex(sha1_hex))
+        if self._entries.get(rel_key) != entry:
+            self._entries[rel_key] = entry
+            self._dirty = True
+
+    def discard(self, rel_key):
+        if self._entries.pop(rel_key, None) is not None:
+            self._dirty = True
+
+    # -------------------- Persistência --------------------
+
+    def load(self):
+        """Carrega o índice do disco. Arquivo ausente, corrompido ou de outra raiz = índice vazio."""
+        self._entries = {}
+        self._dirty = False
+
+        try:
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logging.warning(f"Falha ao ler índice de hashes: {e}")
+            return
+
+        try:
+            self._entries = self._parse(data)
+        except (ValueError, struct.error, UnicodeDecodeError) as e:
+            logging.warning(f"Índice de hashes inválido, será reconstruído: {e}")
+            self._entries = {}
+
+    def save(self):
+        """Grava o índice de forma atômica (arquivo temporário + fsync + os.replace)."""
+        if not self._dirty:
+            return
+
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+
+        with open(tmp_path, "wb") as f:
+            f.write(self._serialize())
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    def _serialize(self):
+        keys = sorted(self._entries)
+        root = self.game_root.encode("utf-8")
+        records = b"".join(_RECORD.pack(*self._entries[k]) for k in keys)
+        names = "\0".join(keys).encode("utf-8")
+
+        payload = root + records + names
+        header = _HEADER.pack(
+            MAGIC, VERSION, len(keys), len(names), len(root), zlib.crc32(payload)
+        )
+        return header + payload
+
+    def _parse(self, data):
+        if len(data) < _HEADER.size:
+            raise ValueError("arquivo truncado")
+
+        magic, version, count, names_len, root_len, crc = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("formato desconhecido")
+
+        payload = memoryview(data)[_HEADER.size:]
+        records_len = count * _RECORD.size
+        if len(payload) != root_len + records_len + names_len:
+            raise ValueError("tamanho inconsistente")
+        if zlib.crc32(payload) != crc:
+            raise ValueError("crc não confere")
+
+        root = bytes(payload[:root_len]).decode("utf-8")
+        if root != self.game_root:
+            # índice de outra pasta do jogo: descarta
+            return {}
+
+        if count == 0:
+            return {}
+
+        records = payload[root_len:root_len + records_len]
+        names = bytes(payload[root_len + records_len:]).decode("utf-8").split("\0")
+        if len(names) != count:
+            raise ValueError("quantidade de caminhos inconsistente")
+
+        return dict(zip(names, _RECORD.iter_unpack(records)))
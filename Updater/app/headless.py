@@ -0,0 +1,153 @@
+import sys
+import json
+import time
+import signal
+import logging
+import threading
+
+from app.engine import UpdateEngine, UpdateEvents
+
+# Modo sem interface (main.py --update / --fullcheck / --verify-only).
+#
+# Roda o mesmo UpdateEngine da janela, sem Qt, e escreve o progresso em stdout
+# como JSON lines (um objeto por linha), por exemplo:
+#   {"event": "status", "t": 0.12, "text": "Verificando [1/20] system/l2.ini..."}
+#   {"event": "progress", "t": 0.40, "percent": 35, "done_bytes": ..., "total_bytes": ...,
+#    "rate": 1048576.0, "eta": 12.5}
+#   {"event": "ready", "t": 2.04}    arquivos críticos prontos, o jogo já pode abrir
+#   {"event": "finished", "t": 9.81, "ok": true, "exit_code": 0, "outdated": [], "deferred": []}
+# "deferred" = arquivos baixados que estavam em uso (jogo aberto) e ficaram no .part.
+# "t" = segundos desde o início. O log detalhado também vai para logs/launcher.log.
+# O status muda a cada arquivo: sai no máximo uma linha "status" a cada
+# STATUS_INTERVAL, sempre com o texto mais recente (o último sai antes do "finished").
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+# 2 fica com o argparse (argumentos inválidos)
+EXIT_OUTDATED = 3   # --verify-only: há arquivos diferentes do manifesto
+EXIT_DEFERRED = 4   # arquivos em uso ficaram para a próxima execução (cliente incompleto)
+EXIT_CANCELLED = 130
+
+STATUS_INTERVAL = 0.25  # segundos
+
+
+class JsonLinesEvents(UpdateEvents):
+    """Eventos do motor como JSON lines; seguro para as várias threads do motor."""
+
+    def __init__(self, stream=None, clock=time.monotonic):
+        self._stream = stream or sys.stdout
+        self._clock = clock
+        self._start = clock()
+        self._lock = threading.RLock()
+        self._last_percent = None
+        # bytes/vazão recebidos desde a última linha "progress"
+        self._pending = {}
+        # status ainda não escrito (chegou antes de STATUS_INTERVAL) e quando saiu o último
+        self._pending_status = None
+        self._last_status = None
+
+    def write(self, event, **fields):
+        if event in ("ready", "finished"):
+            self.flush_status()
+        record = {"event": event, "t": round(self._clock() - self._start, 3)}
+        record.update(fields)
+        line = json.dumps(record)
+        if self._stream is None:
+            return  # executável sem console (--noconsole): só o código de saída
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    # bytes e vazão chegam antes do percentual e saem junto com ele numa linha "progress"
+
+    def bytes_progress(self, done, total):
+        with self._lock:
+            self._pending.update(done_bytes=done, total_bytes=total)
+
+    def throughput(self, rate, eta):
+        with self._lock:
+            self._pending.update(rate=round(rate, 1), eta=round(eta, 1))
+
+    def progress(self, percent):
+        with self._lock:
+            fields, self._pending = self._pending, {}
+            # a etapa de stat avisa a cada arquivo: só repete o percentual com dados novos
+            if percent == self._last_percent and not fields:
+                return
+            self._last_percent = percent
+            # status retido não fica para trás numa etapa longa só de progresso
+            if (
+                self._pending_status is not None
+                and self._clock() - self._last_status >= STATUS_INTERVAL
+            ):
+                self.flush_status()
+            self.write("progress", percent=percent, **fields)
+
+    def status(self, text):
+        with self._lock:
+            now = self._clock()
+            if self._last_status is not None and now - self._last_status < STATUS_INTERVAL:
+                self._pending_status = text
+                return
+            self._last_status = now
+            self._pending_status = None
+            self.write("status", text=text)
+
+    def flush_status(self):
+        """Escreve o status retido pelo intervalo, se houver."""
+        with self._lock:
+            text, self._pending_status = self._pending_status, None
+            if text is not None:
+                self._last_status = self._clock()
+                self.write("status", text=text)
+
+    def log(self, text):
+        logging.info(text)
+        self.write("log", text=text)
+
+    def ready(self):
+        self.write("ready")
+
+
+def run_headless(mode, config, base_dir, verify_only=False, stream=None):
+    """
+    Executa update/fullcheck (ou só a verificação) sem interface.
+    Retorna o código de saída do processo.
+    """
+    events = JsonLinesEvents(stream)
+    engine = UpdateEngine(mode, config, base_dir=base_dir, events=events, verify_only=verify_only)
+
+    # Ctrl+C / kill: cancela como o botão da janela (o .part fica para retomar)
+    def on_signal(signum, frame):
+        events.write("status", text="Cancelamento solicitado...")
+        engine.cancel()
+
+    previous = {}
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        signum = getattr(signal, name, None)
+        if signum is not None:
+            previous[signum] = signal.signal(signum, on_signal)
+
+    events.write("start", mode=mode, verify_only=verify_only)
+    try:
+        ok = engine.run()
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    if engine.cancelled:
+        exit_code = EXIT_CANCELLED
+    elif not ok:
+        exit_code = EXIT_ERROR
+    elif engine.outdated_files:
+        exit_code = EXIT_OUTDATED
+    elif engine.deferred_files:
+        exit_code = EXIT_DEFERRED
+    else:
+        exit_code = EXIT_OK
+
+    events.write(
+        "finished", ok=ok, exit_code=exit_code, outdated=engine.outdated_files,
+        deferred=engine.deferred_files,
+    )
+    return exit_code
@@ -0,0 +1,298 @@
+import time
+import base64
+import threading
+import http.client
+import urllib.parse
+import urllib.request
+from collections import deque
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 30
+
+# conexões paradas há mais tempo que isso provavelmente já foram fechadas pelo servidor
+MAX_IDLE_SECONDS = 30
+MAX_REDIRECTS = 5
+
+USER_AGENT = "L2Updater"
+
+# erros típicos de uma conexão keep-alive que o servidor fechou enquanto estava no pool
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class HttpError(Exception):
+    def __init__(self, url, status, reason):
+        super().__init__(f"HTTP {status} {reason}: {url}")
+        self.url = url
+        self.status = status
+        self.reason = reason
+
+
+class HttpResponse:
+    """
+    Resposta de HttpClient.request. Deve ser usada com "with":
+    ao terminar de ler o corpo a conexão volta para o pool; se for fechada
+    antes do fim (ex.: cancelamento), a conexão é descartada.
+    """
+
+    def __init__(self, client, key, conn, resp, url):
+        self._client = client
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self.url = url
+        self.status = resp.status
+        self.reason = resp.reason
+        self.headers = resp.headers
+
+    def read(self, amt=None):
+        data = self._resp.read(amt)
+        if self._resp.isclosed():
+            self.close()
+        return data
+
+    def close(self):
+        if self._conn is None:
+            return
+
+        conn, self._conn = self._conn, None
+        reusable = self._resp.isclosed() and not self._resp.will_close
+        self._resp.close()
+
+        if reusable:
+            self._client._release(self._key, conn)
+        else:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class HttpClient:
+    """
+    Cliente HTTP thread-safe com conexões persistentes (keep-alive) por host.
+    Mantém até pool_size conexões ociosas por host e aplica timeout de conexão
+    e de leitura em todas as requisições.
+    Usa o proxy do sistema como o urllib (HTTP(S)_PROXY / NO_PROXY, configuração
+    de proxy do Windows): http vai pelo proxy com a URL completa, https por um
+    túnel CONNECT.
+    """
+
+    def __init__(
+        self,
+        pool_size=DEFAULT_POOL_SIZE,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+        proxies=None,
+    ):
+        self.pool_size = max(1, pool_size)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._lock = threading.Lock()
+        self._idle = {}  # (scheme, host, port) -> deque[(conn, ts)]
+        # {"http": "http://proxy:3128", ...}; None = do sistema
+        self._proxies = urllib.request.getproxies() if proxies is None else proxies
+        self._proxy_cache = {}  # (scheme, host) -> proxy ou None
+
+    # -------------------- API --------------------
+
+    def request(self, url, method="GET", headers=None, timeout=None):
+        """Faz a requisição seguindo redirecionamentos. Status >= 400 gera HttpError."""
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request_once(url, method, headers, timeout)
+
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.headers.get("Location")
+                response.read()
+                response.close()
+                if not location:
+                    raise HttpError(url, response.status, "redirect sem Location")
+                url = urllib.parse.urljoin(url, location)
+                if response.status == 303:
+                    method = "GET"
+                continue
+
+            if response.status >= 400:
+                response.read()
+                response.close()
+                raise HttpError(url, response.status, response.reason)
+
+            return response
+
+        raise HttpError(url, 310, "redirecionamentos demais")
+
+    def get(self, url, headers=None, timeout=None):
+        return self.request(url, "GET", headers=headers, timeout=timeout)
+
+    def get_bytes(self, url, headers=None, timeout=None):
+        with self.get(url, headers=headers, timeout=timeout) as resp:
+            return resp.read()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+    # -------------------- Pool --------------------
+
+    def _request_once(self, url, method, headers, timeout):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Esquema de URL não suportado: {url}")
+
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        all_headers = {
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": "identity",
+            "Connection": "keep-alive",
+        }
+        if headers:
+            all_headers.update(headers)
+
+        proxy = self._proxy_for(scheme, parts.hostname)
+        if proxy is not None and scheme == "http":
+            # proxy HTTP recebe a URL completa (sem o fragmento)
+            target = urllib.parse.urlunsplit(parts._replace(fragment=""))
+            if proxy[2]:
+                all_headers["Proxy-Authorization"] = proxy[2]
+
+        while True:
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request(method, target, headers=all_headers)
+                resp = conn.getresponse()
+            except _STALE_ERRORS:
+                conn.close()
+                if reused:
+                    # conexão do pool já estava morta: tenta de novo com outra
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+            return HttpResponse(self, key, conn, resp, url)
+
+    def _acquire(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            conns = self._idle.get(key)
+            while conns:
+                conn, ts = conns.pop()
+                if now - ts <= MAX_IDLE_SECONDS:
+                    break
+                conn.close()
+            else:
+                conn = None
+
+        read_timeout = timeout if timeout is not None else self.read_timeout
+
+        if conn is not None:
+            conn.sock.settimeout(read_timeout)
+            return conn, True
+
+        scheme, host, port = key
+        connect_timeout = min(self.connect_timeout, read_timeout)
+        proxy = self._proxy_for(scheme, host)
+        if proxy is not None:
+            proxy_host, proxy_port, auth = proxy
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(proxy_host, proxy_port, timeout=connect_timeout)
+                conn.set_tunnel(host, port, headers={"Proxy-Authorization": auth} if auth else None)
+            else:
+                conn = http.client.HTTPConnection(proxy_host, proxy_port, timeout=connect_timeout)
+        elif scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=connect_timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=connect_timeout)
+
+        conn.connect()
+        conn.sock.settimeout(read_timeout)
+        return conn, False
+
+    def _proxy_for(self, scheme, host):
+        """(host, porta, Proxy-Authorization ou None) do proxy para o destino, ou None."""
+        cache_key = (scheme, host)
+        if cache_key in self._proxy_cache:
+            return self._proxy_cache[cache_key]
+
+        proxy = None
+        proxy_url = self._proxies.get(scheme)
+        # proxy_bypass consulta NO_PROXY (ou a lista de exceções do Windows)
+        if proxy_url and not urllib.request.proxy_bypass(host):
+            if "://" not in proxy_url:
+                proxy_url = "http://" + proxy_url
+            parts = urllib.parse.urlsplit(proxy_url)
+            auth = None
+            if parts.username:
+                credentials = (
+                    f"{urllib.parse.unquote(parts.username)}:"
+                    f"{urllib.parse.unquote(parts.password or '')}"
+                )
+                auth = "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+            if parts.hostname:
+                proxy = (parts.hostname, parts.port or 80, auth)
+
+        with self._lock:
+            self._proxy_cache[cache_key] = proxy
+        return proxy
+
+    def _release(self, key, conn):
+        if conn.sock is None:
+            return
+
+        with self._lock:
+            conns = self._idle.setdefault(key, deque())
+            if len(conns) < self.pool_size:
+                conns.append((conn, time.monotonic()))
+                return
+
+        conn.close()
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client(config=None):
+    """
+    Retorna o cliente HTTP compartilhado pelo launcher (manifesto, arquivos e notícias).
+    Na primeira chamada é configurado pela seção "http" do config.json.
+    """
+    global _shared_client
+
+    with _shared_lock:
+        if _shared_client is None:
+            http_cfg = (config or {}).get("http", {})
+            _shared_client = HttpClient(
+                pool_size=int(http_cfg.get("pool_size", DEFAULT_POOL_SIZE)),
+                connect_timeout=float(http_cfg.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT)),
+                read_timeout=float(http_cfg.get("read_timeout", DEFAULT_READ_TIMEOUT)),
+            )
+        return _shared_client
+
+
+def close_http_client():
+    """Fecha as conexões ociosas do cliente compartilhado (saída do launcher)."""
+    with _shared_lock:
+        client = _shared_client
+    if client is not None:
+        client.close()
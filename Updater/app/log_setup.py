@@ -0,0 +1,121 @@
+import os
+import sys
+import glob
+import time
+import queue
+import atexit
+import logging
+import datetime
+import logging.handlers
+
+# Logging do launcher em segundo plano: quem chama logging.info (janela, threads
+# do motor) só coloca o registro numa fila; uma thread (QueueListener) grava no
+# logs/launcher.log e no console.
+#
+# O arquivo é rotacionado por tamanho (max_bytes) e por dia (rotate_daily), como
+# launcher.log.1, .2, ...; ficam no máximo backup_count cópias, e as com mais de
+# retention_days dias são apagadas (0 = sem limite de idade).
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+DEFAULT_LOG_SETTINGS = {
+    "level": "INFO",
+    "max_bytes": 5 * 1024 * 1024,
+    "backup_count": 5,
+    "rotate_daily": True,
+    "retention_days": 14,
+}
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler que também troca de arquivo na virada do dia e apaga cópias velhas."""
+
+    def __init__(self, filename, max_bytes=0, backup_count=1, rotate_daily=True, retention_days=0):
+        # sem cópia o RotatingFileHandler não rotaciona: o arquivo cresceria para sempre
+        super().__init__(
+            filename, maxBytes=max_bytes, backupCount=max(1, backup_count),
+            encoding="utf-8", delay=True,
+        )
+        self.rotate_daily = rotate_daily
+        self.retention_days = retention_days
+        self._file_date = self._current_file_date()
+
+    def _current_file_date(self):
+        try:
+            st = os.stat(self.baseFilename)
+        except OSError:
+            return datetime.date.today()
+        if st.st_size == 0:
+            return datetime.date.today()
+        return datetime.date.fromtimestamp(st.st_mtime)
+
+    def shouldRollover(self, record):
+        if self.rotate_daily and datetime.date.today() != self._file_date:
+            # arquivo ainda não criado (delay): nada a rotacionar
+            if os.path.exists(self.baseFilename):
+                return True
+            self._file_date = datetime.date.today()
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._file_date = datetime.date.today()
+        self._remove_expired()
+
+    def _remove_expired(self):
+        if self.retention_days <= 0:
+            return
+        limit = time.time() - self.retention_days * 86400
+        for path in glob.glob(glob.escape(self.baseFilename) + ".*"):
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+            except OSError:
+                pass  # aberto por outro programa: tenta na próxima rotação
+
+
+def _setting(settings, name, cast):
+    try:
+        return cast(settings.get(name, DEFAULT_LOG_SETTINGS[name]))
+    except (TypeError, ValueError):
+        return DEFAULT_LOG_SETTINGS[name]
+
+
+def start_logging(log_file_path, settings=None, console=True):
+    """
+    Configura o logger raiz com QueueHandler e inicia a thread de gravação.
+    settings = seção "logging" do config.json. Retorna o QueueListener
+    (parado automaticamente na saída do processo, gravando o que estiver na fila).
+    """
+    settings = settings or {}
+    os.makedirs(os.path.dirname(log_file_path) or ".", exist_ok=True)
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = RotatingLogHandler(
+        log_file_path,
+        max_bytes=max(0, _setting(settings, "max_bytes", int)),
+        backup_count=_setting(settings, "backup_count", int),
+        rotate_daily=_setting(settings, "rotate_daily", bool),
+        retention_days=_setting(settings, "retention_days", int),
+    )
+    handlers = [file_handler]
+    if console:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    level = logging.getLevelName(str(settings.get("level", DEFAULT_LOG_SETTINGS["level"])).upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
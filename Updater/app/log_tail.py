@@ -0,0 +1,125 @@
+import os
+
+# Leitura incremental do logs/launcher.log para a janela de log.
+#
+# O arquivo chega a centenas de MB depois de semanas de uso, então nunca é
+# lido inteiro: ao abrir vem só o final (TAIL_BYTES), depois só os bytes novos
+# a cada poll, e páginas anteriores (PAGE_BYTES) sob demanda.
+# Tudo em bytes e alinhado em "\n": os offsets batem com o arquivo mesmo com
+# UTF-8 de vários bytes, e linha pela metade (ainda sendo gravada) fica para o
+# próximo poll.
+
+TAIL_BYTES = 256 * 1024
+PAGE_BYTES = 256 * 1024
+# crescimento maior que isso entre dois polls: pula para o final em vez de ler tudo
+MAX_POLL_BYTES = 4 * 1024 * 1024
+
+
+def _split_lines(data, offset):
+    """bytes com linhas completas -> [(offset da linha, texto)]."""
+    lines = []
+    for raw in data.split(b"\n")[:-1]:
+        lines.append((offset, raw.rstrip(b"\r").decode("utf-8", errors="replace")))
+        offset += len(raw) + 1
+    return lines
+
+
+class LogTail:
+    """
+    Janela [start, end) do arquivo já entregue ao leitor.
+    Os métodos devolvem listas de (offset, linha); OSError sobe para quem chama.
+    """
+
+    def __init__(self, path, tail_bytes=TAIL_BYTES, page_bytes=PAGE_BYTES):
+        self.path = path
+        self.tail_bytes = tail_bytes
+        self.page_bytes = page_bytes
+        self.start = 0
+        self.end = 0
+        self._identity = None
+
+    @property
+    def has_earlier(self):
+        return self.start > 0
+
+    def open_tail(self):
+        """(Re)abre no final do arquivo. Retorna as últimas linhas completas."""
+        st = os.stat(self.path)
+        self._identity = (st.st_dev, st.st_ino)
+        begin = max(0, st.st_size - self.tail_bytes)
+        with open(self.path, "rb") as f:
+            f.seek(begin)
+            data = f.read(st.st_size - begin)
+
+        # começou no meio de uma linha: descarta o pedaço
+        skip = 0
+        if begin > 0:
+            skip = data.find(b"\n") + 1
+            if skip == 0:
+                skip = len(data)
+        data = data[skip:]
+        data = data[:data.rfind(b"\n") + 1]
+
+        self.start = begin + skip
+        self.end = self.start + len(data)
+        return _split_lines(data, self.start)
+
+    def poll(self):
+        """
+        Linhas novas desde o último poll -> (reaberto, linhas).
+        reaberto=True quando o arquivo foi truncado/rotacionado ou cresceu demais:
+        as linhas são o novo final e quem exibe deve limpar o que tinha.
+        """
+        st = os.stat(self.path)
+        if (
+            (st.st_dev, st.st_ino) != self._identity
+            or st.st_size < self.end
+            or st.st_size - self.end > MAX_POLL_BYTES
+        ):
+            return True, self.open_tail()
+        if st.st_size == self.end:
+            return False, []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.end)
+            data = f.read(st.st_size - self.end)
+        data = data[:data.rfind(b"\n") + 1]
+        lines = _split_lines(data, self.end)
+        self.end += len(data)
+        return False, lines
+
+    def read_earlier(self):
+        """Página anterior a start (linhas completas). Lista vazia no início do arquivo."""
+        if self.start <= 0:
+            return []
+        begin = max(0, self.start - self.page_bytes)
+        with open(self.path, "rb") as f:
+            f.seek(begin)
+            data = f.read(self.start - begin)
+
+        if begin > 0:
+            cut = data.find(b"\n") + 1
+            if cut == 0:
+                # linha maior que a página: lê até achar o começo dela
+                return self._read_long_line(begin)
+            begin += cut
+            data = data[cut:]
+
+        self.start = begin
+        return _split_lines(data, begin)
+
+    def _read_long_line(self, begin):
+        with open(self.path, "rb") as f:
+            while begin > 0:
+                step = min(self.page_bytes, begin)
+                f.seek(begin - step)
+                chunk = f.read(step)
+                nl = chunk.rfind(b"\n")
+                if nl >= 0:
+                    begin = begin - step + nl + 1
+                    break
+                begin -= step
+            f.seek(begin)
+            data = f.read(self.start - begin)
+        self.start = begin
+        return _split_lines(data, begin)
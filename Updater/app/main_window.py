@@ -2,13 +2,29 @@ import os
 import json
 import logging
 import sys
-import urllib.request
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QMessageBox
 
+from app.bandwidth import get_bandwidth_policy
+from app.log_tail import LogTail
+from app.news import DEFAULT_NEWS_CACHE, NewsLoader
+from app.startup import get_startup_trace
+from app.progress import format_bytes, format_eta, format_rate
 from app.updater_window import UpdaterWindow, UpdateWorker
 
+# opções do limite de download na barra de baixo (KB/s; 0 = sem limite)
+SPEED_LIMIT_OPTIONS = [0, 256, 512, 1024, 2048, 5120, 10240]
+
+# background: espera do redimensionamento parar antes do scale suave (ms)
+# e quantos tamanhos já escalados ficam em memória
+BG_RESIZE_DEBOUNCE_MS = 150
+BG_CACHE_SIZES = 4
+
+# janela de log: máximo de linhas exibidas e intervalo de leitura das novas (ms)
+LOG_VIEW_MAX_LINES = 20000
+LOG_POLL_MS = 500
+
 class MainWindow(QtWidgets.QMainWindow):
     def __init__(self, config_path, base_dir):
         super().__init__()
@@ -34,6 +50,17 @@ class MainWindow(QtWidgets.QMainWindow):
         self._auto_worker = None
         self._manual_thread = None
         self._manual_worker = None
+        self._news_loader = None
+        # bytes feitos / total da fase de atualização em andamento (hash ou download)
+        self._phase_bytes = (None, None)
+
+        # background: imagem decodificada uma vez e versões escaladas por tamanho
+        self._bg_source = None
+        self._bg_scaled = {}  # (largura, altura) -> QPixmap
+        self._bg_timer = QtCore.QTimer(self)
+        self._bg_timer.setSingleShot(True)
+        self._bg_timer.setInterval(BG_RESIZE_DEBOUNCE_MS)
+        self._bg_timer.timeout.connect(self._load_background)
 
         self._setup_window()
         self._init_ui()
@@ -95,7 +122,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self._manual_thread.started.connect(self._manual_worker.run)
         self._manual_worker.progress_changed.connect(self.progress_bar.setValue)
         self._manual_worker.status_changed.connect(self.lbl_status.setText)
-        self._manual_worker.log_message.connect(logging.info)
+        self._manual_worker.bytes_progress.connect(self._on_worker_bytes)
+        self._manual_worker.throughput_changed.connect(self._on_worker_throughput)
+        self._manual_worker.play_ready.connect(self._on_play_ready)
         self._manual_worker.finished.connect(
             lambda ok, m=mode: self._on_manual_update_finished(m, ok)
         )
@@ -238,7 +267,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.main_layout.addWidget(self.news_frame, stretch=0)
 
-        # Carrega notícias
+        # Notícias: cópia em disco na hora, versão nova em segundo plano
         self._load_news()
 
         # ---- PAINEL INFERIOR ----
@@ -258,10 +287,20 @@ class MainWindow(QtWidgets.QMainWindow):
         bottom_layout.setContentsMargins(20, 15, 20, 15)
         bottom_layout.setSpacing(10)
 
+        status_layout = QtWidgets.QHBoxLayout()
+
         self.lbl_status = QtWidgets.QLabel("Todos os arquivos estão atualizados.")
         self.lbl_status.setStyleSheet("color: #dddddd;")
         self.lbl_status.setAlignment(QtCore.Qt.AlignLeft)
-        bottom_layout.addWidget(self.lbl_status)
+        status_layout.addWidget(self.lbl_status, 1)
+
+        # velocidade e tempo restante da fase atual (hash/download)
+        self.lbl_speed = QtWidgets.QLabel("")
+        self.lbl_speed.setStyleSheet("color: #aaaaaa;")
+        self.lbl_speed.setAlignment(QtCore.Qt.AlignRight)
+        status_layout.addWidget(self.lbl_speed)
+
+        bottom_layout.addLayout(status_layout)
 
         self.progress_bar = QtWidgets.QProgressBar()
         self.progress_bar.setRange(0, 100)
@@ -301,8 +340,32 @@ class MainWindow(QtWidgets.QMainWindow):
         self._style_primary_button(self.btn_play)
         self._style_secondary_button(self.btn_exit)
 
+        # limite de banda, aplicado na hora inclusive em downloads em andamento
+        self.cmb_speed = QtWidgets.QComboBox()
+        self.cmb_speed.setMinimumHeight(32)
+        self.cmb_speed.setToolTip("Limite de velocidade dos downloads")
+        self.cmb_speed.setStyleSheet(
+            """
+            QComboBox {
+                background-color: rgba(255, 255, 255, 30);
+                color: #f5f5f5;
+                font-size: 12px;
+                border-radius: 14px;
+                padding: 6px 12px;
+                border: 1px solid rgba(255, 255, 255, 80);
+            }
+            QComboBox QAbstractItemView {
+                background-color: #222222;
+                color: #f5f5f5;
+                selection-background-color: #ff9800;
+            }
+            """
+        )
+        self._fill_speed_options()
+
         buttons_layout.addWidget(self.btn_update)
         buttons_layout.addWidget(self.btn_fullcheck)
+        buttons_layout.addWidget(self.cmb_speed)
         buttons_layout.addStretch(1)
         buttons_layout.addWidget(self.btn_play)
         buttons_layout.addWidget(self.btn_exit)
@@ -416,16 +479,29 @@ class MainWindow(QtWidgets.QMainWindow):
 
     # -------------------- Background / notícias --------------------
 
-    def _load_background(self):
-        if os.path.isfile(self.background_path):
+    def _background_source(self):
+        """launcher_bg.png lido do disco só na primeira vez (None se não existir)."""
+        if self._bg_source is None and os.path.isfile(self.background_path):
             pix = QtGui.QPixmap(self.background_path)
             if not pix.isNull():
-                scaled = pix.scaled(
+                self._bg_source = pix
+        return self._bg_source
+
+    def _load_background(self):
+        source = self._background_source()
+        if source is not None:
+            key = (self.width(), self.height())
+            scaled = self._bg_scaled.get(key)
+            if scaled is None:
+                scaled = source.scaled(
                     self.size(),
                     QtCore.Qt.KeepAspectRatioByExpanding,
                     QtCore.Qt.SmoothTransformation,
                 )
-                self.bg_label.setPixmap(scaled)
+                if len(self._bg_scaled) >= BG_CACHE_SIZES:
+                    self._bg_scaled.pop(next(iter(self._bg_scaled)))
+                self._bg_scaled[key] = scaled
+            self.bg_label.setPixmap(scaled)
         else:
             # fallback degrade
             palette = self.palette()
@@ -443,15 +519,21 @@ class MainWindow(QtWidgets.QMainWindow):
             self.news_view.setPlainText("Nenhuma notícia configurada.")
             return
 
-        try:
-            with urllib.request.urlopen(news_url, timeout=3) as resp:
-                content = resp.read().decode("utf-8", errors="ignore").strip()
-        except Exception as e:
-            logging.warning(f"Falha ao carregar notícias: {e}")
-            self.news_view.setPlainText("Não foi possível carregar as notícias.")
-            # MUITO IMPORTANTE: simplesmente retorna, sem levantar erro
-            return
+        cache_dir = os.path.join(self.base_dir, DEFAULT_NEWS_CACHE)
+        self._news_loader = NewsLoader(self.config, news_url, cache_dir, parent=self)
+        self._news_loader.loaded.connect(self._show_news)
+        self._news_loader.failed.connect(
+            lambda: self.news_view.setPlainText("Não foi possível carregar as notícias.")
+        )
+
+        cached = self._news_loader.cached()
+        if cached is not None:
+            self._show_news(cached)
+        else:
+            self.news_view.setPlainText("Carregando notícias...")
+        self._news_loader.start(have_cached=cached is not None)
 
+    def _show_news(self, content):
         # se parecer JSON, podemos tratar depois; por enquanto, assume HTML/texto
         if content.startswith("{") or content.startswith("["):
             self.news_view.setPlainText(content)
@@ -465,7 +547,17 @@ class MainWindow(QtWidgets.QMainWindow):
         super().resizeEvent(event)
         # background sempre ocupando a janela inteira
         self.bg_label.setGeometry(0, 0, self.width(), self.height())
-        self._load_background()
+        if (self.width(), self.height()) in self._bg_scaled or self.bg_label.pixmap() is None:
+            self._load_background()
+        else:
+            # durante o redimensionamento o label estica o pixmap atual (scale rápido);
+            # o scale suave roda uma vez quando o tamanho parar de mudar
+            self._bg_timer.start()
+
+    def paintEvent(self, event: QtGui.QPaintEvent):
+        super().paintEvent(event)
+        # fim da medição de abertura (só a primeira pintura conta)
+        get_startup_trace().finish()
 
     def showEvent(self, event: QtGui.QShowEvent):
         super().showEvent(event)
@@ -505,6 +597,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btn_play.clicked.connect(self._on_play_clicked)
         self.btn_update.clicked.connect(self._on_update_clicked)
         self.btn_fullcheck.clicked.connect(self._on_fullcheck_clicked)
+        self.cmb_speed.currentIndexChanged.connect(self._on_speed_limit_changed)
 
         self.btn_close_win.clicked.connect(self.close)
         self.btn_min.clicked.connect(self.showMinimized)
@@ -524,6 +617,45 @@ class MainWindow(QtWidgets.QMainWindow):
             )
             raise
 
+    def _save_config(self):
+        """Grava o config.json (tmp + rename, para não corromper se cair no meio)."""
+        tmp_path = self.config_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.config_path)
+        except OSError as e:
+            logging.warning(f"Não foi possível gravar o config.json: {e}")
+
+    # -------------------- Limite de banda --------------------
+
+    def _fill_speed_options(self):
+        current = get_bandwidth_policy(self.config).limit_kbps
+        options = list(SPEED_LIMIT_OPTIONS)
+        if current not in options:
+            options.append(current)
+            options.sort()
+
+        self.cmb_speed.blockSignals(True)
+        for kbps in options:
+            if not kbps:
+                label = "Sem limite"
+            elif kbps >= 1024 and kbps % 1024 == 0:
+                label = f"{kbps // 1024} MB/s"
+            else:
+                label = f"{kbps} KB/s"
+            self.cmb_speed.addItem(label, kbps)
+        self.cmb_speed.setCurrentIndex(options.index(current))
+        self.cmb_speed.blockSignals(False)
+
+    def _on_speed_limit_changed(self, index: int):
+        kbps = int(self.cmb_speed.itemData(index) or 0)
+        get_bandwidth_policy(self.config).set_limit_kbps(kbps)
+        logging.info(f"Limite de download alterado para {self.cmb_speed.itemText(index)}.")
+
+        self.config.setdefault("updater", {})["max_download_kbps"] = kbps
+        self._save_config()
+
     # -------------------- Auto update ao iniciar --------------------
     def _auto_update_on_start(self):
         """Executa atualização automática ao abrir o launcher.
@@ -558,7 +690,9 @@ class MainWindow(QtWidgets.QMainWindow):
             # conecta sinais do worker diretamente ao painel inferior e ao log
             self._auto_worker.progress_changed.connect(self.progress_bar.setValue)
             self._auto_worker.status_changed.connect(self.lbl_status.setText)
-            self._auto_worker.log_message.connect(logging.info)
+            self._auto_worker.bytes_progress.connect(self._on_worker_bytes)
+            self._auto_worker.throughput_changed.connect(self._on_worker_throughput)
+            self._auto_worker.play_ready.connect(self._on_play_ready)
             self._auto_worker.finished.connect(self._on_auto_update_finished)
 
             # limpeza da thread/worker
@@ -585,11 +719,30 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # garante barra cheia no fim
         self.progress_bar.setValue(100)
+        self.lbl_speed.clear()
+        self._phase_bytes = (None, None)
         # libera o botão JOGAR
         self.btn_play.setEnabled(True)
 
 
 
+    def _on_play_ready(self):
+        """Arquivos críticos prontos: libera o JOGAR com o resto ainda baixando."""
+        logging.info("JOGAR liberado; o restante da atualização continua em segundo plano.")
+        self.btn_play.setEnabled(True)
+
+    def _on_worker_bytes(self, done, total):
+        # chega antes da vazão do mesmo lote; o texto é montado em _on_worker_throughput
+        self._phase_bytes = (done, total)
+
+    def _on_worker_throughput(self, rate: float, eta: float):
+        """Bytes da fase, velocidade (média móvel) e tempo restante no canto da barra de baixo."""
+        text = f"{format_rate(rate)} - restante {format_eta(eta if eta >= 0 else None)}"
+        done, total = self._phase_bytes
+        if total:
+            text = f"{format_bytes(done)} / {format_bytes(total)} - {text}"
+        self.lbl_speed.setText(text)
+
     # -------------------- Ações dos botões --------------------
 
     def _on_update_clicked(self):
@@ -626,7 +779,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 raise FileNotFoundError(f"Executável do jogo não encontrado:\n{exe_path}")
 
             # 5) Tenta iniciar o jogo
-            ok = QtCore.QProcess.startDetached(exe_path, [], os.path.dirname(exe_path))
+            ok, pid = QtCore.QProcess.startDetached(exe_path, [], os.path.dirname(exe_path))
             if not ok:
                 # startDetached não lançou exceção, mas o Windows recusou iniciar
                 raise RuntimeError(
@@ -634,6 +787,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 )
 
             logging.info("Processo do jogo iniciado com sucesso.")
+            # enquanto o jogo estiver aberto, downloads usam updater.game_running_kbps
+            get_bandwidth_policy(self.config).set_game_process(pid)
             self.showMinimized()
 
         except Exception as e:
@@ -678,6 +833,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 )
 
         self.progress_bar.setValue(100)
+        self.lbl_speed.clear()
+        self._phase_bytes = (None, None)
         self.btn_play.setEnabled(True)
 
         self._manual_thread = None
@@ -727,33 +884,159 @@ class LogWindow(QtWidgets.QDialog):
 
         self.txt_log = QtWidgets.QPlainTextEdit()
         self.txt_log.setReadOnly(True)
+        self.txt_log.setUndoRedoEnabled(False)
+        # sem quebra de linha: cada linha do arquivo = um bloco = uma linha da rolagem
+        self.txt_log.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
         layout.addWidget(self.txt_log)
 
+        self.lbl_info = QtWidgets.QLabel("")
+        layout.addWidget(self.lbl_info)
+
         button_layout = QtWidgets.QHBoxLayout()
         self.btn_reload = QtWidgets.QPushButton("Atualizar")
+        self.btn_end = QtWidgets.QPushButton("Ir para o fim")
         self.btn_close = QtWidgets.QPushButton("Fechar")
 
         button_layout.addWidget(self.btn_reload)
+        button_layout.addWidget(self.btn_end)
         button_layout.addStretch()
         button_layout.addWidget(self.btn_close)
 
         layout.addLayout(button_layout)
 
         self.btn_reload.clicked.connect(self.reload_log)
+        self.btn_end.clicked.connect(self._scroll_to_end)
         self.btn_close.clicked.connect(self.close)
 
+        self.log_path = os.path.join(self.base_dir, "logs", "launcher.log")
+        self._tail = None
+        self._offsets = []  # offset no arquivo de cada linha exibida (para paginar)
+
+        # segue o arquivo enquanto a janela está aberta
+        self._poll_timer = QtCore.QTimer(self)
+        self._poll_timer.setInterval(LOG_POLL_MS)
+        self._poll_timer.timeout.connect(self._poll_log)
+
+        # rolou até o topo: carrega a página anterior
+        self.txt_log.verticalScrollBar().valueChanged.connect(self._on_scroll)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._poll_timer.start()
+
+    def hideEvent(self, event):
+        self._poll_timer.stop()
+        super().hideEvent(event)
+
     def reload_log(self):
-        log_path = os.path.join(self.base_dir, "logs", "launcher.log")
-        if not os.path.isfile(log_path):
-            self.txt_log.setPlainText("Arquivo de log não encontrado:\n" + log_path)
+        """Reabre no final do arquivo (só os últimos KB, nunca o arquivo inteiro)."""
+        self._tail = None
+        self._offsets = []
+        if not os.path.isfile(self.log_path):
+            self.txt_log.setPlainText("Arquivo de log não encontrado:\n" + self.log_path)
+            self.lbl_info.clear()
             return
 
+        tail = LogTail(self.log_path)
         try:
-            with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-        except Exception as e:
+            lines = tail.open_tail()
+        except OSError as e:
             self.txt_log.setPlainText(f"Erro ao abrir o log:\n{e}")
+            self.lbl_info.clear()
             return
 
-        self.txt_log.setPlainText(content)
+        self._tail = tail
+        self._set_lines(lines)
+
+    def _set_lines(self, lines):
+        lines = lines[-LOG_VIEW_MAX_LINES:]
+        self._offsets = [offset for offset, _ in lines]
+        if lines:
+            self._tail.start = lines[0][0]
+        self.txt_log.setPlainText("\n".join(text for _, text in lines))
+        self._scroll_to_end()
+        self._update_info()
+
+    def _poll_log(self):
+        if self._tail is None:
+            if os.path.isfile(self.log_path):
+                self.reload_log()  # o log foi criado depois de abrir a janela
+            return
+
+        try:
+            reopened, lines = self._tail.poll()
+        except OSError:
+            return  # arquivo trocado no meio da rotação: tenta no próximo poll
+
+        if reopened:
+            self._set_lines(lines)
+        elif lines:
+            self._append_lines(lines)
+
+    def _append_lines(self, lines):
+        bar = self.txt_log.verticalScrollBar()
+        following = bar.value() >= bar.maximum()
+
+        if self._offsets:
+            self.txt_log.appendPlainText("\n".join(text for _, text in lines))
+        else:
+            self.txt_log.setPlainText("\n".join(text for _, text in lines))
+        self._offsets.extend(offset for offset, _ in lines)
+
+        # acima do limite: tira as linhas mais antigas do topo
+        excess = len(self._offsets) - LOG_VIEW_MAX_LINES
+        if excess > 0:
+            cursor = QtGui.QTextCursor(self.txt_log.document())
+            cursor.movePosition(QtGui.QTextCursor.Start)
+            cursor.movePosition(QtGui.QTextCursor.NextBlock, QtGui.QTextCursor.KeepAnchor, excess)
+            cursor.removeSelectedText()
+            del self._offsets[:excess]
+            self._tail.start = self._offsets[0]
+
+        if following:
+            self._scroll_to_end()
+        self._update_info()
+
+    def _on_scroll(self, value):
+        if value != 0 or self._tail is None or not self._tail.has_earlier:
+            return
+        room = LOG_VIEW_MAX_LINES - len(self._offsets)
+        if room <= 0:
+            return
+
+        try:
+            lines = self._tail.read_earlier()
+        except OSError:
+            return
+        if not lines:
+            return
+        if len(lines) > room:
+            # só o que cabe no limite; o restante da página volta a ser "anterior"
+            lines = lines[-room:]
+            self._tail.start = lines[0][0]
+
+        # insere no topo mantendo na tela as mesmas linhas de antes
+        bar = self.txt_log.verticalScrollBar()
+        cursor = QtGui.QTextCursor(self.txt_log.document())
+        cursor.movePosition(QtGui.QTextCursor.Start)
+        cursor.insertText("\n".join(text for _, text in lines) + "\n")
+        self._offsets[:0] = [offset for offset, _ in lines]
+        bar.setValue(len(lines))
+        self._update_info()
+
+    def _scroll_to_end(self):
         self.txt_log.moveCursor(QtGui.QTextCursor.End)
+        bar = self.txt_log.verticalScrollBar()
+        bar.setValue(bar.maximum())
+
+    def _update_info(self):
+        if self._tail is None:
+            self.lbl_info.clear()
+            return
+        text = f"{len(self._offsets)} linhas exibidas"
+        if self._tail.has_earlier:
+            if len(self._offsets) >= LOG_VIEW_MAX_LINES:
+                text += " (limite da janela; linhas mais antigas só no arquivo)"
+            else:
+                text += " (role até o topo para carregar as anteriores)"
+        self.lbl_info.setText(f"{text} - {self.log_path}")
@@ -0,0 +1,386 @@
+import json
+import zlib
+import struct
+import urllib.parse
+
+# Formato binário compacto do manifesto (.l2m), gerado ao lado do JSON pelo
+# generate_manifests.php. Todos os inteiros são varint (LEB128 sem sinal) e
+# "str" é varint com o tamanho seguido dos bytes em utf-8.
+#
+#   MAGIC "L2MF" | versão (1 byte) | flags (1 byte, bit0 = corpo comprimido com zlib)
+#   corpo:
+#     count | str base_url | str sig_prefix | str compressed_prefix
+#     [qtd espelhos | str base_url de cada espelho]     a partir da versão 2
+#     count entradas, ordenadas por caminho:
+#       eflags (ENTRY_*)
+#       prefixo em comum com o caminho anterior | str restante do caminho
+#       [20 bytes de SHA1]             se ENTRY_SHA1
+#       size
+#       [str url]                      se ENTRY_URL (senão: base_url + caminho codificado)
+#       [código compressão | size comprimido]   se ENTRY_COMPRESSED
+#       [código prioridade]            se ENTRY_PRIORITY (só na versão 3)
+#     crc32 do corpo descomprimido (4 bytes, little-endian)
+#
+# sig_url e a url da variante comprimida são derivadas do SHA1:
+#   <sig_prefix>/<SHA1>.json   e   <compressed_prefix>/<SHA1>.<gz|zz|xz>
+
+MAGIC = b"L2MF"
+VERSION = 1
+# versão 2 = versão 1 + lista de espelhos no cabeçalho (só gerada quando há espelhos)
+VERSION_MIRRORS = 2
+# versão 3 = versão 2 + prioridade por entrada (só gerada quando algum arquivo tem prioridade);
+# launchers antigos recusam a versão e usam o JSON
+VERSION_PRIORITY = 3
+FLAG_ZLIB = 0x01
+
+ENTRY_SHA1 = 0x01
+ENTRY_URL = 0x02
+ENTRY_SIG = 0x04
+ENTRY_COMPRESSED = 0x08
+ENTRY_PRIORITY = 0x10
+
+# prioridade do arquivo no manifesto ("priority"), na ordem em que o updater processa:
+#   critical -> precisa estar certo para o jogo abrir (JOGAR libera depois deles)
+#   required -> padrão (sem o campo); baixado em seguida, com o jogo já podendo rodar
+#   optional -> por último
+PRIORITIES = ("critical", "required", "optional")
+DEFAULT_PRIORITY = "required"
+
+# código -> (encoding, extensão)
+COMPRESSION_CODES = {1: ("gzip", ".gz"), 2: ("zlib", ".zz"), 3: ("xz", ".xz")}
+_COMPRESSION_BY_NAME = {enc: code for code, (enc, _) in COMPRESSION_CODES.items()}
+
+BINARY_MANIFEST_EXT = ".l2m"
+
+# erros de decodificação que, no .l2m, só podem vir de um corpo corrompido
+_CORRUPT_ERRORS = (UnicodeDecodeError, struct.error, zlib.error, IndexError)
+
+
+def entry_priority(entry):
+    """Prioridade da entrada; ausente ou desconhecida = DEFAULT_PRIORITY."""
+    priority = entry.get("priority", DEFAULT_PRIORITY)
+    return priority if priority in PRIORITIES else DEFAULT_PRIORITY
+
+
+def priority_rank(entry):
+    """Posição na ordem de processamento (0 = critical)."""
+    return PRIORITIES.index(entry_priority(entry))
+
+
+def derive_url(base_url, path):
+    """Mesma regra do generate_manifests.php: base_url + caminho com rawurlencode por segmento."""
+    return base_url.rstrip("/") + urllib.parse.quote("/" + path.lstrip("/"), safe="/")
+
+
+class JsonManifest:
+    """Manifesto JSON tradicional (fullcheck.json / update_json_url.json)."""
+
+    def __init__(self, data):
+        self.base_url = data.get("base_url", "")
+        self.mirrors = data.get("mirrors", []) or []
+        self._files = data.get("files", [])
+
+    def __len__(self):
+        return len(self._files)
+
+    def __iter__(self):
+        return iter(self._files)
+
+
+class BinaryManifest:
+    """
+    Manifesto .l2m. O cabeçalho é lido na criação; as entradas são decodificadas
+    sob demanda a cada iteração, sem montar a lista inteira na memória.
+    Corpo corrompido (truncado, utf-8 inválido, crc) vira ValueError, inclusive
+    no meio da iteração.
+    """
+
+    def __init__(self, body):
+        self._body = body
+        try:
+            reader = self._open()
+            self._count = reader.varint()
+            self.base_url = reader.string()
+            self.sig_prefix = reader.string()
+            self.compressed_prefix = reader.string()
+            self.mirrors = self._read_mirrors(reader)
+        except _CORRUPT_ERRORS as e:
+            raise ValueError(f"manifesto binário corrompido: {e}") from e
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        try:
+            yield from self._entries()
+        except _CORRUPT_ERRORS as e:
+            raise ValueError(f"manifesto binário corrompido: {e}") from e
+
+    def validate(self):
+        """Decodifica todas as entradas e confere o crc; ValueError se algo não bater."""
+        for _ in self:
+            pass
+
+    def _entries(self):
+        reader = self._open()
+        reader.varint()
+        for _ in range(3):
+            reader.string()
+        self._read_mirrors(reader)
+
+        path = b""
+        for _ in range(self._count):
+            eflags = reader.varint()
+            shared = reader.varint()
+            path = path[:shared] + reader.raw_string()
+            text_path = path.decode("utf-8")
+
+            entry = {"path": text_path}
+            if eflags & ENTRY_SHA1:
+                entry["sha1"] = reader.read(20).hex().upper()
+            entry["size"] = reader.varint()
+
+            if eflags & ENTRY_URL:
+                entry["url"] = reader.string()
+            # sem ENTRY_URL a url é derive_url(base_url, path), montada só se for baixar
+
+            sha1 = entry.get("sha1", "")
+            if eflags & ENTRY_SIG:
+                entry["sig_url"] = f"{self.sig_prefix}/{sha1}.json"
+            if eflags & ENTRY_COMPRESSED:
+                code = reader.varint()
+                csize = reader.varint()
+                if code in COMPRESSION_CODES:
+                    encoding, ext = COMPRESSION_CODES[code]
+                    entry["compressed"] = {
+                        "encoding": encoding,
+                        "url": f"{self.compressed_prefix}/{sha1}{ext}",
+                        "size": csize,
+                    }
+            if eflags & ENTRY_PRIORITY:
+                code = reader.varint()
+                if code < len(PRIORITIES):
+                    entry["priority"] = PRIORITIES[code]
+
+            yield entry
+
+        reader.check_crc()
+
+    def _read_mirrors(self, reader):
+        if self._body[4] < VERSION_MIRRORS:
+            return []
+        return [reader.string() for _ in range(reader.varint())]
+
+    def _open(self):
+        if len(self._body) < 6 or self._body[:4] != MAGIC:
+            raise ValueError("manifesto binário inválido")
+        if self._body[4] not in (VERSION, VERSION_MIRRORS, VERSION_PRIORITY):
+            raise ValueError(f"versão de manifesto binário não suportada: {self._body[4]}")
+
+        payload = memoryview(self._body)[6:]
+        if self._body[5] & FLAG_ZLIB:
+            return _Reader(_inflate_chunks(payload))
+        return _Reader(_plain_chunks(payload))
+
+
+def _plain_chunks(payload, chunk_size=256 * 1024):
+    for start in range(0, len(payload), chunk_size):
+        yield bytes(payload[start:start + chunk_size])
+
+
+def _inflate_chunks(payload, chunk_size=64 * 1024):
+    """Descompressão zlib incremental: nunca mantém o corpo inteiro descomprimido."""
+    obj = zlib.decompressobj()
+    for start in range(0, len(payload), chunk_size):
+        data = obj.decompress(payload[start:start + chunk_size])
+        if data:
+            yield data
+    tail = obj.flush()
+    if tail:
+        yield tail
+    if not obj.eof:
+        raise ValueError("manifesto binário truncado")
+
+
+class _Reader:
+    """
+    Leitura sequencial sobre os pedaços descomprimidos. Os varints são decodificados
+    direto no buffer (sem uma chamada de read por byte) e o crc32 é acumulado sobre
+    os bytes já consumidos.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buf = b""
+        self._pos = 0
+        self._crc = 0
+
+    def _fill(self, n):
+        if self._pos:
+            self._crc = zlib.crc32(memoryview(self._buf)[:self._pos], self._crc)
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+
+        while len(self._buf) < n:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                raise ValueError("manifesto binário truncado")
+            self._buf += chunk
+
+    def read(self, n):
+        end = self._pos + n
+        if end > len(self._buf):
+            self._fill(n)
+            end = n
+        data = self._buf[self._pos:end]
+        self._pos = end
+        return data
+
+    def varint(self):
+        # caminho rápido: a maioria dos valores cabe em um byte
+        pos = self._pos
+        if pos < len(self._buf):
+            byte = self._buf[pos]
+            if byte < 0x80:
+                self._pos = pos + 1
+                return byte
+        return self._varint_slow()
+
+    def _varint_slow(self):
+        buf = self._buf
+        pos = self._pos
+        result = 0
+        shift = 0
+        while True:
+            if pos >= len(buf):
+                self._pos = pos
+                self._fill(1)
+                buf = self._buf
+                pos = self._pos
+            byte = buf[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self._pos = pos
+                return result
+            shift += 7
+
+    def raw_string(self):
+        return self.read(self.varint())
+
+    def string(self):
+        return self.raw_string().decode("utf-8")
+
+    def check_crc(self):
+        # crc de tudo que foi consumido até aqui; os 4 bytes seguintes são o crc gravado
+        self._fill(0)
+        expected = self._crc
+        if struct.unpack("<I", self.read(4))[0] != expected:
+            raise ValueError("crc do manifesto binário não confere")
+
+
+def load_manifest(body):
+    """
+    Detecta o formato pelo conteúdo (magic do .l2m ou JSON). O .l2m é percorrido
+    uma vez inteiro (crc incluso): corrompido, o ValueError sai aqui, e não no meio
+    da verificação dos arquivos.
+    """
+    if body[:4] == MAGIC:
+        manifest = BinaryManifest(body)
+        manifest.validate()
+        return manifest
+    return JsonManifest(json.loads(body.decode("utf-8")))
+
+
+# -------------------- Gravação (ferramentas / benchmarks) --------------------
+
+
+def _varint(n):
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _string(value):
+    data = value.encode("utf-8")
+    return _varint(len(data)) + data
+
+
+def write_binary_manifest(data, sig_prefix="", compressed_prefix="", compress=True):
+    """
+    Converte um manifesto no formato JSON (dict com base_url/files) para .l2m.
+    Mesmo algoritmo do generate_manifests.php.
+    """
+    base_url = data.get("base_url", "")
+    mirrors = data.get("mirrors", []) or []
+    files = sorted(data.get("files", []), key=lambda e: e["path"].encode("utf-8"))
+    with_priority = any(entry_priority(e) != DEFAULT_PRIORITY for e in files)
+
+    body = bytearray()
+    body += _varint(len(files))
+    body += _string(base_url)
+    body += _string(sig_prefix.rstrip("/"))
+    body += _string(compressed_prefix.rstrip("/"))
+    if mirrors or with_priority:
+        body += _varint(len(mirrors))
+        for mirror in mirrors:
+            body += _string(mirror)
+
+    prev = b""
+    for entry in files:
+        path = entry["path"].encode("utf-8")
+        sha1 = entry.get("sha1", "")
+        url = entry.get("url")
+
+        eflags = 0
+        if sha1:
+            eflags |= ENTRY_SHA1
+        if url and url != derive_url(base_url, entry["path"]):
+            eflags |= ENTRY_URL
+        # sig_url e variante comprimida só entram se seguirem o padrão derivável do SHA1
+        sha1_upper = sha1.upper()
+        if entry.get("sig_url") == f"{sig_prefix.rstrip('/')}/{sha1_upper}.json":
+            eflags |= ENTRY_SIG
+        variant = entry.get("compressed")
+        code = _COMPRESSION_BY_NAME.get((variant or {}).get("encoding"))
+        if code and variant.get("url") == (
+            f"{compressed_prefix.rstrip('/')}/{sha1_upper}{COMPRESSION_CODES[code][1]}"
+        ):
+            eflags |= ENTRY_COMPRESSED
+        priority = entry_priority(entry)
+        if priority != DEFAULT_PRIORITY:
+            eflags |= ENTRY_PRIORITY
+
+        shared = 0
+        limit = min(len(prev), len(path))
+        while shared < limit and prev[shared] == path[shared]:
+            shared += 1
+
+        body += _varint(eflags)
+        body += _varint(shared)
+        body += _varint(len(path) - shared) + path[shared:]
+        if eflags & ENTRY_SHA1:
+            body += bytes.fromhex(sha1)
+        body += _varint(int(entry.get("size", 0) or 0))
+        if eflags & ENTRY_URL:
+            body += _string(url)
+        if eflags & ENTRY_COMPRESSED:
+            body += _varint(code)
+            body += _varint(int(variant.get("size", 0)))
+        if eflags & ENTRY_PRIORITY:
+            body += _varint(PRIORITIES.index(priority))
+
+        prev = path
+
+    body += struct.pack("<I", zlib.crc32(body))
+
+    flags = FLAG_ZLIB if compress else 0
+    payload = zlib.compress(bytes(body), 9) if compress else bytes(body)
+    if with_priority:
+        version = VERSION_PRIORITY
+    else:
+        version = VERSION_MIRRORS if mirrors else VERSION
+    return MAGIC + bytes([version, flags]) + payload
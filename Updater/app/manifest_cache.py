@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+import logging
+
+# Cache local dos manifestos (update_json / fullcheck_json):
+#   <cache_dir>/<chave>.body  -> conteúdo exatamente como veio do servidor
+#   <cache_dir>/<chave>.meta  -> url, ETag, Last-Modified e SHA1 do body
+# A chave é derivada da URL, então cada manifesto tem sua própria entrada.
+
+
+class ManifestCache:
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        base = os.path.join(self.cache_dir, key)
+        return base + ".body", base + ".meta"
+
+    def conditional_headers(self, url):
+        """Cabeçalhos If-None-Match / If-Modified-Since para um GET condicional."""
+        meta = self._load_meta(url)
+        if meta is None or self.load(url) is None:
+            return {}
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load(self, url):
+        """Retorna o body em cache (bytes) ou None se ausente/inconsistente."""
+        body_path, _ = self._paths(url)
+        meta = self._load_meta(url)
+        if meta is None:
+            return None
+
+        try:
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+
+        if hashlib.sha1(body).hexdigest() != meta.get("sha1"):
+            return None
+        return body
+
+    def store(self, url, body, etag=None, last_modified=None):
+        body_path, meta_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "sha1": hashlib.sha1(body).hexdigest(),
+        }
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # body primeiro, meta depois: se cair no meio, o SHA1 da meta não confere
+            self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError as e:
+            logging.warning(f"Falha ao gravar manifesto em cache: {e}")
+
+    def discard(self, url):
+        """Apaga a entrada (body inválido: o próximo GET vem sem condicional)."""
+        for path in self._paths(url):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _load_meta(self, url):
+        _, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(meta, dict) or meta.get("url") != url:
+            return None
+        return meta
+
+    def _write_atomic(self, path, data):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,249 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.http_client import HttpError
+
+# Espelhos (mirrors) do servidor de atualização.
+#
+# Cada espelho é informado pelo base_url da sua pasta client/ (igual ao base_url do
+# manifesto) e deve ter a mesma árvore do servidor principal: client/, signatures/,
+# compressed/... As URLs do manifesto são reescritas trocando a "raiz" do principal
+# (pasta acima de client/) pela raiz do espelho.
+#
+# Lista vem de paths.mirrors (config.json) e do campo "mirrors" do manifesto.
+
+# amostra baixada de cada espelho na sondagem (latência + vazão)
+PROBE_BYTES = 256 * 1024
+_PROBE_CHUNK = 8 * 1024
+# espelho que falhou fica fora da escolha por FAILURE_BACKOFF * falhas seguidas (s)
+FAILURE_BACKOFF = 30.0
+MAX_BACKOFF = 300.0
+# peso da medição nova na média da vazão de cada espelho
+_THROUGHPUT_SMOOTHING = 0.3
+
+
+class MirrorTooSlow(OSError):
+    """O stream atual ficou abaixo da velocidade mínima: trocar de espelho."""
+
+
+def _site_root(base_url):
+    return base_url.rstrip("/").rsplit("/", 1)[0]
+
+
+class Mirror:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.root = _site_root(base_url)
+        self.latency = None      # segundos até a resposta (sondagem)
+        self.throughput = None   # bytes/s (sondagem + downloads reais)
+        self.active = 0          # downloads em andamento
+        self.failures = 0        # falhas seguidas
+        self.disabled_until = 0.0
+
+    def __repr__(self):
+        return f"Mirror({self.base_url})"
+
+
+class MirrorSet:
+    """
+    Escolha de espelho por arquivo, thread-safe.
+    acquire() devolve o espelho com melhor vazão estimada dividida pela carga atual,
+    o que espalha os downloads simultâneos entre os espelhos saudáveis;
+    release() atualiza as estatísticas e aplica o afastamento temporário em falhas.
+    """
+
+    def __init__(self, primary_base_url, mirror_base_urls=(), clock=time.monotonic):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self.primary = Mirror(primary_base_url)
+        self.mirrors = [self.primary]
+        # probe() já rodou (uma sondagem por execução, não por grupo de arquivos)
+        self.probed = False
+
+        seen = {self.primary.base_url}
+        for base_url in mirror_base_urls:
+            base_url = str(base_url or "").strip().rstrip("/")
+            if base_url and base_url not in seen:
+                seen.add(base_url)
+                self.mirrors.append(Mirror(base_url))
+
+    def __len__(self):
+        return len(self.mirrors)
+
+    # -------------------- URLs --------------------
+
+    def rewrite(self, url, mirror):
+        """URL do arquivo no espelho; URLs fora da árvore do principal não mudam."""
+        if not url or mirror is self.primary:
+            return url
+        prefix = self.primary.root + "/"
+        if url.startswith(prefix):
+            return mirror.root + url[len(self.primary.root):]
+        return url
+
+    def task_for(self, task, mirror):
+        """Cópia da tarefa de download com as URLs apontando para o espelho."""
+        if mirror is self.primary:
+            return task
+        task = dict(task)
+        task["url"] = self.rewrite(task["url"], mirror)
+        task["sig_url"] = self.rewrite(task.get("sig_url", ""), mirror)
+        if task.get("compressed"):
+            compressed = dict(task["compressed"])
+            compressed["url"] = self.rewrite(compressed["url"], mirror)
+            task["compressed"] = compressed
+        return task
+
+    # -------------------- Sondagem --------------------
+
+    def probe(self, http, sample_url, timeout):
+        """
+        Baixa o início de sample_url de todos os espelhos ao mesmo tempo, medindo
+        latência (até a resposta) e vazão. Espelho que falha fica afastado.
+        Retorna [(espelho, erro ou None)] na ordem da lista.
+        """
+        def run(mirror):
+            url = self.rewrite(sample_url, mirror)
+            start = self._clock()
+            try:
+                resp = http.get(
+                    url, headers={"Range": f"bytes=0-{PROBE_BYTES - 1}"}, timeout=timeout
+                )
+                with resp:
+                    latency = self._clock() - start
+                    # lê até PROBE_BYTES ou até o tempo limite: espelho lento
+                    # também precisa responder rápido à sondagem
+                    deadline = start + timeout
+                    received = 0
+                    while received < PROBE_BYTES and self._clock() < deadline:
+                        chunk = resp.read(min(_PROBE_CHUNK, PROBE_BYTES - received))
+                        if not chunk:
+                            break
+                        received += len(chunk)
+                    elapsed = self._clock() - start - latency
+            except (HttpError, OSError) as e:
+                return mirror, e
+
+            with self._lock:
+                mirror.latency = latency
+                if received and elapsed > 0:
+                    mirror.throughput = received / elapsed
+                mirror.failures = 0
+                mirror.disabled_until = 0.0
+            return mirror, None
+
+        with ThreadPoolExecutor(max_workers=len(self.mirrors)) as executor:
+            results = list(executor.map(run, self.mirrors))
+
+        with self._lock:
+            self.probed = True
+            for mirror, error in results:
+                if error is not None:
+                    self._penalize(mirror)
+        return results
+
+    # -------------------- Escolha / resultado --------------------
+
+    def acquire(self, exclude=()):
+        """
+        Escolhe o espelho para um arquivo, ignorando os de exclude (já tentados).
+        Se todos estiverem afastados, usa o que voltaria primeiro.
+        Retorna None se todos já foram tentados.
+        """
+        with self._lock:
+            candidates = [m for m in self.mirrors if m not in exclude]
+            if not candidates:
+                return None
+
+            now = self._clock()
+            healthy = [m for m in candidates if m.disabled_until <= now]
+            if healthy:
+                mirror = max(healthy, key=self._score)
+            else:
+                mirror = min(candidates, key=lambda m: m.disabled_until)
+            mirror.active += 1
+            return mirror
+
+    def release(self, mirror, ok, nbytes=0, seconds=0.0):
+        with self._lock:
+            mirror.active = max(0, mirror.active - 1)
+            if not ok:
+                self._penalize(mirror)
+                return
+
+            mirror.failures = 0
+            mirror.disabled_until = 0.0
+            # arquivos muito pequenos medem latência, não vazão
+            if nbytes >= PROBE_BYTES and seconds > 0:
+                measured = nbytes / seconds
+                if mirror.throughput is None:
+                    mirror.throughput = measured
+                else:
+                    mirror.throughput += _THROUGHPUT_SMOOTHING * (measured - mirror.throughput)
+
+    def has_alternative(self, exclude):
+        return any(m not in exclude for m in self.mirrors)
+
+    def describe(self):
+        """Resumo para o log: latência e vazão de cada espelho."""
+        parts = []
+        with self._lock:
+            now = self._clock()
+            for mirror in self.mirrors:
+                if mirror.disabled_until > now:
+                    parts.append(f"{mirror.root} (indisponível)")
+                    continue
+                latency = f"{mirror.latency * 1000:.0f} ms" if mirror.latency is not None else "?"
+                speed = (
+                    f"{mirror.throughput / (1024 * 1024):.2f} MB/s"
+                    if mirror.throughput else "?"
+                )
+                parts.append(f"{mirror.root} ({latency}, {speed})")
+        return "; ".join(parts)
+
+    def _score(self, mirror):
+        # sem medição ainda: estima pela latência (ou trata como médio)
+        throughput = mirror.throughput
+        if throughput is None:
+            known = [m.throughput for m in self.mirrors if m.throughput]
+            throughput = sorted(known)[len(known) // 2] if known else 1.0
+        if mirror.latency:
+            # desempate a favor do mais próximo
+            throughput /= 1.0 + mirror.latency
+        return throughput / (mirror.active + 1)
+
+    def _penalize(self, mirror):
+        mirror.failures += 1
+        mirror.disabled_until = self._clock() + min(
+            MAX_BACKOFF, FAILURE_BACKOFF * mirror.failures
+        )
+
+
+class StreamWatch:
+    """
+    Vigia a velocidade de um stream: a cada janela de `window` segundos, se a média
+    ficou abaixo de min_rate (bytes/s), levanta MirrorTooSlow.
+    """
+
+    def __init__(self, min_rate, window, clock=time.monotonic):
+        self.min_rate = min_rate
+        self.window = window
+        self._clock = clock
+        self._start = clock()
+        self._bytes = 0
+
+    def add(self, nbytes):
+        self._bytes += nbytes
+        now = self._clock()
+        elapsed = now - self._start
+        if elapsed < self.window:
+            return
+        rate = self._bytes / elapsed
+        self._start = now
+        self._bytes = 0
+        if rate < self.min_rate:
+            raise MirrorTooSlow(
+                f"velocidade {rate / 1024:.1f} KB/s abaixo do mínimo "
+                f"{self.min_rate / 1024:.0f} KB/s"
+            )
@@ -0,0 +1,88 @@
+import time
+import logging
+import threading
+
+from PyQt5 import QtCore
+
+from app.http_client import get_http_client
+from app.manifest_cache import ManifestCache
+
+# Notícias do launcher (paths.news_url) sem travar a abertura da janela:
+# a cópia em disco (cache/news) aparece na hora e uma thread revalida com GET
+# condicional (ETag / Last-Modified). Chegou conteúdo novo: grava e exibe; 304
+# ou servidor fora do ar: fica o que já está na tela.
+
+DEFAULT_NEWS_CACHE = "cache/news"
+NEWS_TIMEOUT = 5
+
+
+def fetch_news(config, url, cache):
+    """
+    Revalida as notícias. Retorna o conteúdo novo (bytes) ou None se não mudou (304).
+    Erros de rede sobem (HttpError / OSError).
+    """
+    http = get_http_client(config)
+    with http.get(url, headers=cache.conditional_headers(url), timeout=NEWS_TIMEOUT) as resp:
+        body = resp.read()
+        status = resp.status
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+
+    if status == 304:
+        if cache.load(url) is not None:
+            return None
+        # cache sumiu entre o pedido e a resposta: baixa de novo sem condicional
+        body = http.get_bytes(url, timeout=NEWS_TIMEOUT)
+        etag = last_modified = None
+
+    cache.store(url, body, etag, last_modified)
+    return body
+
+
+class NewsLoader(QtCore.QObject):
+    """
+    Busca as notícias numa thread (daemon: não segura o fechamento do launcher)
+    e entrega o resultado pelos sinais, já na thread da interface.
+    """
+
+    # conteúdo decodificado (cache ou novo)
+    loaded = QtCore.pyqtSignal(str)
+    # sem conteúdo nenhum para mostrar (sem cache e servidor indisponível)
+    failed = QtCore.pyqtSignal()
+
+    def __init__(self, config, url, cache_dir, parent=None):
+        super().__init__(parent)
+        self.config = config
+        self.url = url
+        self.cache = ManifestCache(cache_dir)
+
+    def cached(self):
+        """Cópia em disco (leitura local rápida) ou None."""
+        body = self.cache.load(self.url)
+        return _decode(body) if body is not None else None
+
+    def start(self, have_cached):
+        threading.Thread(
+            target=self._run, args=(have_cached,), name="news", daemon=True
+        ).start()
+
+    def _run(self, have_cached):
+        start = time.perf_counter()
+        try:
+            body = fetch_news(self.config, self.url, self.cache)
+        except Exception as e:
+            logging.warning(f"Falha ao carregar notícias: {e}")
+            if not have_cached:
+                self.failed.emit()
+            return
+
+        elapsed = time.perf_counter() - start
+        if body is None:
+            logging.info(f"Notícias sem alterações (304) em {elapsed:.2f}s.")
+            return
+        logging.info(f"Notícias atualizadas em {elapsed:.2f}s ({len(body)} bytes).")
+        self.loaded.emit(_decode(body))
+
+
+def _decode(body):
+    return body.decode("utf-8", errors="ignore").strip()
@@ -0,0 +1,131 @@
+import time
+import threading
+from collections import deque, namedtuple
+
+# Progresso por bytes (hash e download), com vazão em média móvel e ETA.
+# Os tamanhos vêm do campo "size" do manifesto (download) ou do stat (hash),
+# então um pacote de 2 GB pesa o que deve pesar na barra.
+
+ProgressSnapshot = namedtuple(
+    "ProgressSnapshot",
+    "done_bytes total_bytes done_files total_files percent rate eta elapsed",
+)
+
+# janela da média móvel e intervalo mínimo entre avisos para a UI (segundos)
+RATE_WINDOW = 5.0
+EMIT_INTERVAL = 0.25
+_SAMPLE_INTERVAL = 0.1
+
+
+class ProgressTracker:
+    """
+    Contador de uma fase (hash ou download), seguro para várias threads.
+    add() devolve um ProgressSnapshot quando vale a pena avisar a UI
+    (percentual mudou, arquivo terminou ou passou EMIT_INTERVAL), senão None.
+    A vazão conta só bytes realmente transferidos: retomada de .part e
+    estornos (download descartado) mexem no progresso, não na velocidade.
+    """
+
+    def __init__(self, total_bytes, total_files, window=RATE_WINDOW,
+                 emit_interval=EMIT_INTERVAL, clock=time.monotonic):
+        self.total_bytes = max(0, int(total_bytes))
+        self.total_files = max(0, int(total_files))
+        self.done_bytes = 0
+        self.done_files = 0
+        self._transferred = 0
+
+        self._window = window
+        self._emit_interval = emit_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._start = clock()
+        self._samples = deque([(self._start, 0)])
+        self._last_emit = None
+        self._last_percent = -1
+
+    def add(self, nbytes=0, file_done=False, transferred=True):
+        with self._lock:
+            self.done_bytes += nbytes
+            if transferred and nbytes > 0:
+                self._transferred += nbytes
+            if file_done:
+                self.done_files += 1
+
+            now = self._clock()
+            self._sample(now)
+            percent = self._percent()
+
+            if (
+                not file_done
+                and self._last_emit is not None
+                and percent == self._last_percent
+                and now - self._last_emit < self._emit_interval
+            ):
+                return None
+
+            self._last_emit = now
+            self._last_percent = percent
+            return self._snapshot(now, percent)
+
+    def snapshot(self):
+        with self._lock:
+            now = self._clock()
+            return self._snapshot(now, self._percent())
+
+    def _sample(self, now):
+        if now - self._samples[-1][0] >= _SAMPLE_INTERVAL:
+            self._samples.append((now, self._transferred))
+        # mantém pelo menos uma amostra antiga como referência da janela
+        while len(self._samples) > 1 and now - self._samples[1][0] >= self._window:
+            self._samples.popleft()
+
+    def _percent(self):
+        if self.total_bytes:
+            return int(min(self.done_bytes, self.total_bytes) * 100 / self.total_bytes)
+        if self.total_files:
+            return int(self.done_files * 100 / self.total_files)
+        return 100
+
+    def _rate(self, now):
+        first_time, first_bytes = self._samples[0]
+        elapsed = now - first_time
+        if elapsed <= 0:
+            return 0.0
+        return (self._transferred - first_bytes) / elapsed
+
+    def _snapshot(self, now, percent):
+        rate = self._rate(now)
+        eta = None
+        if self.total_bytes and rate > 0:
+            eta = max(0, self.total_bytes - self.done_bytes) / rate
+        return ProgressSnapshot(
+            self.done_bytes, self.total_bytes, self.done_files, self.total_files,
+            percent, rate, eta, now - self._start,
+        )
+
+
+# -------------------- Formatação --------------------
+
+
+def format_bytes(value):
+    value = float(value)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.2f} {unit}"
+        value /= 1024
+
+
+def format_rate(rate):
+    return f"{format_bytes(rate)}/s"
+
+
+def format_eta(seconds):
+    """ETA como MM:SS (ou H:MM:SS); "--:--" quando ainda não dá pra estimar."""
+    if seconds is None or seconds < 0:
+        return "--:--"
+    seconds = int(seconds + 0.5)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
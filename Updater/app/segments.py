@@ -0,0 +1,56 @@
+# Download segmentado: um arquivo grande é dividido em faixas baixadas em paralelo
+# (várias conexões com Range), gravadas direto na posição certa de um .part
+# pré-alocado. O progresso de cada faixa fica no "<destino>.part.json":
+#   {"sha1": ..., "size": ..., "segments": [[inicio, fim, bytes_feitos], ...]}
+# e permite retomar cada faixa de onde parou.
+
+# faixas menores que isso não compensam outra conexão
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+
+
+class SegmentedUnavailable(Exception):
+    """Download segmentado não serve para este arquivo; baixar em um único stream."""
+
+
+def plan_segments(start, end, count, min_segment_size=MIN_SEGMENT_SIZE):
+    """
+    Divide os bytes [start, end] (inclusive) em até `count` faixas de tamanho
+    parecido, cada uma com pelo menos min_segment_size (exceto se só couber uma).
+    Retorna [[inicio, fim, 0], ...].
+    """
+    total = end - start + 1
+    if total <= 0:
+        return []
+
+    count = max(1, min(count, total // max(1, min_segment_size)))
+    step = -(-total // count)  # divisão arredondada para cima
+
+    segments = []
+    pos = start
+    while pos <= end:
+        seg_end = min(end, pos + step - 1)
+        segments.append([pos, seg_end, 0])
+        pos = seg_end + 1
+    return segments
+
+
+def parse_segments(saved, size):
+    """Valida as faixas salvas no .part.json; None se não forem utilizáveis."""
+    try:
+        segments = [[int(a), int(b), int(done)] for a, b, done in saved]
+    except (TypeError, ValueError):
+        return None
+
+    expected = 0
+    for start, end, done in segments:
+        if start != expected or end < start or not 0 <= done <= end - start + 1:
+            return None
+        expected = end + 1
+    if expected != size:
+        return None
+    return segments
+
+
+def remaining_bytes(segment):
+    start, end, done = segment
+    return end - start + 1 - done
@@ -0,0 +1,46 @@
+import time
+import logging
+
+# Tempo de abertura do launcher, do início do main() até a primeira pintura da
+# janela. Cada etapa marcada vira um trecho da linha de log, por exemplo:
+#   Inicialização: 0.62s até a primeira pintura (meta 1.00s) | logging 0.01s | qt 0.25s | ...
+# Passou da meta: a linha sai como WARNING, fácil de achar no launcher.log.
+
+STARTUP_TARGET = 1.0  # segundos
+
+_trace = None
+
+
+class StartupTrace:
+    def __init__(self, start=None, clock=time.perf_counter):
+        self._clock = clock
+        self._start = clock() if start is None else start
+        self._last = self._start
+        self._steps = []  # (nome, segundos desde a marca anterior)
+        self.done = False
+
+    def mark(self, name):
+        now = self._clock()
+        self._steps.append((name, now - self._last))
+        self._last = now
+
+    def finish(self, name="primeira pintura"):
+        """Fecha a medição (só a primeira chamada conta) e grava a linha no log."""
+        if self.done:
+            return
+        self.mark(name)
+        self.done = True
+
+        total = self._last - self._start
+        parts = [f"Inicialização: {total:.2f}s até a {name} (meta {STARTUP_TARGET:.2f}s)"]
+        parts += [f"{step} {seconds:.2f}s" for step, seconds in self._steps]
+        level = logging.WARNING if total > STARTUP_TARGET else logging.INFO
+        logging.log(level, " | ".join(parts))
+
+
+def get_startup_trace(start=None):
+    """Medição única do processo; start = time.perf_counter() do começo do main.py."""
+    global _trace
+    if _trace is None:
+        _trace = StartupTrace(start)
+    return _trace
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import heapq
+import threading
+from contextlib import contextmanager
+
+from app.progress import format_bytes, format_rate
+
+# Medição de tempo de cada execução do updater, para achar o gargalo na máquina
+# do jogador. Ao final o motor grava um relatório JSON (updater.timing_report) e
+# uma linha de resumo no log.
+#
+# Dois tipos de tempo:
+#   etapas   -> relógio de parede de cada etapa do fluxo (index, version, deltas,
+#               manifest, stat, hash, download); somam o tempo que o jogador esperou
+#   trabalho -> soma do tempo de todas as threads em cada operação: manifest_download,
+#               manifest_parse, network (leitura da rede), decompress, write (gravação
+#               no .part), verify (SHA1 final do download segmentado), commit (rename);
+#               com downloads paralelos pode passar do tempo de parede
+
+# quantos arquivos mais lentos entram no relatório
+SLOWEST_FILES = 10
+
+
+class RunTimings:
+    """Acumula tempos por etapa, por tipo de trabalho e por arquivo. Thread-safe."""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._start = clock()
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.stages = {}   # nome -> segundos (parede)
+        self.work = {}     # nome -> [segundos, vezes]
+        self._files = {}   # tipo ("download"/"hash") -> [qtd, bytes, segundos, heap dos mais lentos]
+
+    @contextmanager
+    def stage(self, name):
+        start = self._clock()
+        try:
+            yield
+        finally:
+            elapsed = self._clock() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def measure(self, name):
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.add(name, self._clock() - start)
+
+    def add(self, name, seconds, count=1):
+        with self._lock:
+            entry = self.work.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += count
+
+    def timed(self, func, name):
+        """Envolve func (ex.: resp.read, f.write) somando o tempo de cada chamada em `name`."""
+        clock = self._clock
+
+        def wrapper(*args):
+            start = clock()
+            try:
+                return func(*args)
+            finally:
+                self.add(name, clock() - start)
+
+        return wrapper
+
+    def file_done(self, kind, path, nbytes, seconds):
+        with self._lock:
+            entry = self._files.setdefault(kind, [0, 0, 0.0, []])
+            entry[0] += 1
+            entry[1] += nbytes
+            entry[2] += seconds
+            item = (seconds, path, nbytes)
+            if len(entry[3]) < SLOWEST_FILES:
+                heapq.heappush(entry[3], item)
+            else:
+                heapq.heappushpop(entry[3], item)
+
+    def elapsed(self):
+        return self._clock() - self._start
+
+    def report(self, **extra):
+        """Relatório completo (dict pronto para JSON), etapas e arquivos do mais lento ao mais rápido."""
+        with self._lock:
+            total = self.elapsed()
+            report = {
+                "started_at": self.started_at,
+                "total_seconds": round(total, 3),
+            }
+            report.update(extra)
+            report["stages"] = [
+                {
+                    "stage": name,
+                    "seconds": round(seconds, 3),
+                    "percent": round(seconds * 100 / total, 1) if total > 0 else 0.0,
+                }
+                for name, seconds in sorted(self.stages.items(), key=lambda kv: -kv[1])
+            ]
+            report["work"] = [
+                {"name": name, "seconds": round(seconds, 3), "count": count}
+                for name, (seconds, count) in sorted(self.work.items(), key=lambda kv: -kv[1][0])
+            ]
+            report["files"] = {}
+            for kind, (count, nbytes, seconds, slowest) in self._files.items():
+                report["files"][kind] = {
+                    "count": count,
+                    "bytes": nbytes,
+                    "seconds": round(seconds, 3),
+                    "slowest": [
+                        {
+                            "path": path,
+                            "bytes": size,
+                            "seconds": round(secs, 3),
+                            "bytes_per_second": round(size / secs, 1) if secs > 0 else None,
+                        }
+                        for secs, path, size in sorted(slowest, reverse=True)
+                    ],
+                }
+            return report
+
+    def summary_line(self):
+        """Linha compacta para o log: total, etapas e o arquivo mais lento."""
+        report = self.report()
+        parts = [f"total {report['total_seconds']:.2f}s"]
+        parts += [f"{s['stage']} {s['seconds']:.2f}s" for s in report["stages"]]
+
+        slowest = [
+            (item, kind)
+            for kind, info in report["files"].items()
+            for item in info["slowest"][:1]
+        ]
+        if slowest:
+            item, kind = max(slowest, key=lambda pair: pair[0]["seconds"])
+            speed = item["bytes_per_second"]
+            parts.append(
+                f"mais lento ({kind}): {item['path']} {item['seconds']:.2f}s"
+                + (f", {format_bytes(item['bytes'])} a {format_rate(speed)}" if speed else "")
+            )
+        return "Tempos: " + " | ".join(parts)
+
+
+def write_report(path, report):
+    """Grava o relatório (tmp + rename). Erros de disco sobem como OSError."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
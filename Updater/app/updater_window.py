@@ -1,174 +1,138 @@
-import os
-import json
-import hashlib
-import urllib.request
 import logging
+import threading
 
 from PyQt5 import QtCore, QtWidgets, QtGui
 
+from app.engine import UpdateEngine, UpdateEvents
+from app.progress import format_bytes, format_eta, format_rate
+
+# entregas por segundo para a interface (progresso, status e lote de log)
+UI_FPS = 20
+# linhas mantidas no log da janela de atualização (as mais antigas saem)
+MAX_LOG_LINES = 5000
+
+
+class _SignalEvents(UpdateEvents):
+    """
+    Junta os eventos do motor e entrega aos sinais do UpdateWorker em lotes,
+    UI_FPS vezes por segundo, a partir de uma thread própria.
+    Progresso, status e vazão: só o valor mais recente; log: todas as linhas,
+    num único sinal por lote (também gravadas no logging por essa thread).
+    As threads do motor só guardam o evento, sem esperar a interface.
+    """
+
+    def __init__(self, worker, fps=UI_FPS):
+        self._worker = worker
+        self._interval = 1.0 / max(1, fps)
+        self._lock = threading.Lock()
+        self._latest = {}   # sinal -> argumentos do último evento
+        self._logs = []
+        self._ready = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="ui-events", daemon=True)
+        self._thread.start()
+
+    def progress(self, percent):
+        self._set("progress_changed", percent)
+
+    def status(self, text):
+        self._set("status_changed", text)
+
+    def log(self, text):
+        with self._lock:
+            self._logs.append(text)
+
+    def bytes_progress(self, done, total):
+        self._set("bytes_progress", done, total)
+
+    def throughput(self, rate, eta):
+        self._set("throughput_changed", rate, eta)
+
+    def ready(self):
+        with self._lock:
+            self._ready = True
+
+    def finished(self, ok):
+        # o que ficou pendente chega antes do finished
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._flush()
+        self._worker.finished.emit(ok)
+
+    def _set(self, signal, *args):
+        with self._lock:
+            self._latest[signal] = args
+
+    def _loop(self):
+        while not self._stop.wait(self._interval):
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            latest, self._latest = self._latest, {}
+            logs, self._logs = self._logs, []
+            ready, self._ready = self._ready, False
+
+        if logs:
+            for line in logs:
+                logging.info(line)
+            self._worker.log_batch.emit(logs)
+        # percentual por último: quem usa bytes/vazão já recebeu os valores do mesmo lote
+        for signal in ("bytes_progress", "throughput_changed", "status_changed", "progress_changed"):
+            if signal in latest:
+                getattr(self._worker, signal).emit(*latest[signal])
+        if ready:
+            self._worker.play_ready.emit()
+
 
 class UpdateWorker(QtCore.QObject):
+    """
+    Adaptador Qt do UpdateEngine: roda o motor dentro de uma QThread e expõe
+    o progresso pelos sinais que a interface já usa, no máximo UI_FPS vezes
+    por segundo (a velocidade da atualização não depende da interface).
+    As linhas de log já vão para o logging; log_batch serve só para exibir.
+    """
+
     progress_changed = QtCore.pyqtSignal(int)      # 0–100
     status_changed = QtCore.pyqtSignal(str)
-    log_message = QtCore.pyqtSignal(str)
+    # linhas de log acumuladas desde a última entrega
+    log_batch = QtCore.pyqtSignal(list)
     finished = QtCore.pyqtSignal(bool)
+    # bytes processados / total da fase atual (object: passa de 2 GB)
+    bytes_progress = QtCore.pyqtSignal(object, object)
+    # vazão em bytes/s (média móvel) e ETA em segundos (-1 = desconhecido)
+    throughput_changed = QtCore.pyqtSignal(float, float)
+    # arquivos críticos prontos: o jogo já pode abrir (o restante continua)
+    play_ready = QtCore.pyqtSignal()
 
     def __init__(self, mode, config, parent=None,base_dir=None):
         super().__init__(parent)
         self.mode = mode  # "update" ou "fullcheck"
         self.config = config
-        self._cancelled = False
-        self.base_dir = base_dir or os.getcwd()
+        self._events = _SignalEvents(self)
+        self.engine = UpdateEngine(mode, config, base_dir=base_dir, events=self._events)
 
     @QtCore.pyqtSlot()
-    def _get_game_root(self):
-        """
-        Pasta raiz onde os arquivos do jogo/patch devem ir.
-        - Se game_folder for absoluto, usa direto
-        - Se for relativo (incluindo "."), é relativo à pasta do launcher (base_dir)
-        """
-        paths = self.config.get("paths", {})
-        game_folder = paths.get("game_folder", ".").strip()
-
-        if os.path.isabs(game_folder):
-            return os.path.normpath(game_folder)
-
-        # relativo -> dentro da pasta do launcher
-        return os.path.normpath(os.path.join(self.base_dir, game_folder))
-
     def run(self):
-        try:
-            self._run_internal()
-            if not self._cancelled:
-                self.finished.emit(True)
-        except Exception as e:
-            self.log_message.emit(f"Erro: {e}")
-            self.finished.emit(False)
+        # o motor sempre avisa o fim (finished), inclusive em erro ou cancelamento
+        self._events.start()
+        self.engine.run()
 
     def cancel(self):
-        self._cancelled = True
-
-    # -------------------- Lógica interna --------------------
-
-    def _run_internal(self):
-        paths = self.config.get("paths", {})
-
-        if self.mode == "update":
-            url = paths.get("update_json")
-        else:
-            url = paths.get("fullcheck_json")
-
-        if not url:
-            raise RuntimeError("URL de JSON de atualização não configurada.")
-
-        self.status_changed.emit(f"Baixando lista de arquivos ({self.mode})...")
-        self.log_message.emit(f"Baixando JSON: {url}")
-
-        data = self._download_json(url)
-
-        files = data.get("files", [])
-        base_url = data.get("base_url", "")
-
-        if not files:
-            self.log_message.emit("Nenhum arquivo para processar.")
-            self.progress_changed.emit(100)
-            return
-
-        total = len(files)
-        game_root = self._get_game_root()  # <- usa base_dir + game_folder
-
-        for idx, info in enumerate(files, start=1):
-            if self._cancelled:
-                self.log_message.emit("Atualização cancelada.")
-                return
-            # caminho relativo vindo do JSON
-            rel_path = info["path"].replace("/", os.sep)
-            # remove barras iniciais pra não “escapar” da pasta do launcher
-            rel_path = rel_path.lstrip("\\/")
-
-            expected_sha1 = info.get("sha1", "").lower().strip()
-            file_url = info.get("url")
-
-            if not file_url:
-                # monta URL com base_url
-                file_url = base_url.rstrip("/") + "/" + info["path"].lstrip("/")
-
-            # SEMPRE dentro de game_root
-            local_path = os.path.normpath(os.path.join(game_root, rel_path))
-
-            msg_prefix = f"[{idx}/{total}] {rel_path}"
-            self.status_changed.emit(f"Verificando {msg_prefix}...")
-            self.log_message.emit(f"Verificando arquivo: {rel_path}")
-
-            need_download = False
-
-            if not os.path.isfile(local_path):
-                self.log_message.emit(" - Arquivo não existe, será baixado.")
-                need_download = True
-            elif expected_sha1:
-                local_sha1 = self._calc_sha1(local_path)
-                if local_sha1.lower() != expected_sha1:
-                    self.log_message.emit(" - Hash diferente, será baixado novamente.")
-                    need_download = True
-                else:
-                    self.log_message.emit(" - OK (hash confere).")
-
-            if need_download:
-                size_bytes = info.get("size", 0)
-                if size_bytes:
-                    size_mb = size_bytes / (1024 * 1024)
-                    size_text = f" ({size_mb:.2f} MB)"
-                else:
-                    size_text = ""
-
-                self.status_changed.emit(f"Baixando: {rel_path}{size_text}...")
-                self._ensure_dir(local_path)
-                self._download_file(file_url, local_path)
-
-            progress = int(idx * 100 / total)
-            self.progress_changed.emit(progress)
-
-        self.status_changed.emit(f"Verificando: {rel_path} ({idx}/{total})...")
-        self.log_message.emit("Processo concluído com sucesso.")
-        self.progress_changed.emit(100)
-
-    # -------------------- Helpers de rede / arquivos --------------------
-
-    def _download_json(self, url):
-        with urllib.request.urlopen(url) as resp:
-            content = resp.read().decode("utf-8")
-        return json.loads(content)
-
-    def _download_file(self, url, dest_path, chunk_size=1024 * 128):
-        self.log_message.emit(f"   -> Baixando de {url}")
-        with urllib.request.urlopen(url) as resp, open(dest_path, "wb") as f:
-            while True:
-                if self._cancelled:
-                    self.log_message.emit("Download cancelado.")
-                    return
-                chunk = resp.read(chunk_size)
-                if not chunk:
-                    break
-                f.write(chunk)
-
-    def _ensure_dir(self, file_path):
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-    def _calc_sha1(self, file_path, chunk_size=1024 * 1024):
-        h = hashlib.sha1()
-        with open(file_path, "rb") as f:
-            while True:
-                chunk = f.read(chunk_size)
-                if not chunk:
-                    break
-                h.update(chunk)
-        return h.hexdigest()
+        self.engine.cancel()
 
 
 class UpdaterWindow(QtWidgets.QDialog):
     # SINAIS EXTERNOS PARA O MAINWINDOW
     progress_changed = QtCore.pyqtSignal(int)
     status_changed = QtCore.pyqtSignal(str)
+    throughput_changed = QtCore.pyqtSignal(float, float)
 
     def __init__(self, mode, config, parent=None):
         super().__init__(parent)
@@ -178,6 +142,7 @@ class UpdaterWindow(QtWidgets.QDialog):
         self.thread = None
         self.worker = None
         self.result_ok = None  # para o caller saber o resultado
+        self._phase_bytes = (None, None)  # bytes feitos / total da fase atual
 
         self._setup_ui()
         self._start_worker()
@@ -200,8 +165,13 @@ class UpdaterWindow(QtWidgets.QDialog):
         self.progress.setValue(0)
         layout.addWidget(self.progress)
 
-        self.txt_log = QtWidgets.QTextEdit()
+        self.lbl_speed = QtWidgets.QLabel("")
+        layout.addWidget(self.lbl_speed)
+
+        self.txt_log = QtWidgets.QPlainTextEdit()
         self.txt_log.setReadOnly(True)
+        self.txt_log.setUndoRedoEnabled(False)
+        self.txt_log.setMaximumBlockCount(MAX_LOG_LINES)
         layout.addWidget(self.txt_log)
 
         button_layout = QtWidgets.QHBoxLayout()
@@ -226,7 +196,9 @@ class UpdaterWindow(QtWidgets.QDialog):
         # em vez de ligar direto, usamos handlers que repassam o sinal
         self.worker.progress_changed.connect(self._on_worker_progress)
         self.worker.status_changed.connect(self._on_worker_status)
-        self.worker.log_message.connect(self._append_log)
+        self.worker.bytes_progress.connect(self._on_worker_bytes)
+        self.worker.throughput_changed.connect(self._on_worker_throughput)
+        self.worker.log_batch.connect(self._append_log_batch)
         self.worker.finished.connect(self._on_finished)
 
         self.worker.finished.connect(self.thread.quit)
@@ -245,14 +217,35 @@ class UpdaterWindow(QtWidgets.QDialog):
         self.lbl_status.setText(text)
         self.status_changed.emit(text)
 
+    def _on_worker_bytes(self, done, total):
+        # chega antes da vazão do mesmo lote; o texto é montado em _on_worker_throughput
+        self._phase_bytes = (done, total)
+
+    def _on_worker_throughput(self, rate: float, eta: float):
+        text = (
+            f"Velocidade: {format_rate(rate)} - "
+            f"restante: {format_eta(eta if eta >= 0 else None)}"
+        )
+        done, total = self._phase_bytes
+        if total:
+            text = f"{format_bytes(done)} / {format_bytes(total)} - {text}"
+        self.lbl_speed.setText(text)
+        self.throughput_changed.emit(rate, eta)
+
     # ---------------------------------------------------------------
 
     def _append_log(self, text):
-        self.txt_log.append(text)
+        self._append_log_batch([text])
         logging.info(text)
 
+    def _append_log_batch(self, lines):
+        # um append por lote; o logging já foi feito pela thread de eventos
+        self.txt_log.appendPlainText("\n".join(lines))
+
     def _on_finished(self, ok):
         self.result_ok = ok
+        self.lbl_speed.clear()
+        self._phase_bytes = (None, None)
 
         if ok:
             self.lbl_status.setText("Concluído.")
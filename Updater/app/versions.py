@@ -0,0 +1,83 @@
+import os
+import json
+import logging
+
+# Atualização incremental entre versões publicadas do cliente.
+#
+# O generate_manifests.php publica:
+#   version.json                 -> {"version": N, "base_url": ..., "deltas_url": ..., "oldest_delta": K,
+#                                    "mirrors": [...]}
+#   deltas/<N-1>-<N>.json        -> {"from": N-1, "to": N, "added": [...], "changed": [...], "removed": [...]}
+# "added"/"changed" têm entradas no mesmo formato do manifesto; "removed" é lista de caminhos.
+# O launcher guarda a versão instalada e aplica a cadeia de deltas até a atual.
+
+# cadeias maiores que isso saem mais caras que o manifesto completo
+MAX_DELTA_CHAIN = 50
+
+
+class InstalledVersion:
+    """Versão do cliente instalada na pasta do jogo (cache/installed_version.json)."""
+
+    def __init__(self, path, game_root):
+        self.path = path
+        self.game_root = os.path.normcase(os.path.normpath(game_root))
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(data, dict) or data.get("game_root") != self.game_root:
+            return None
+        try:
+            return int(data["version"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def save(self, version):
+        data = {"version": int(version), "game_root": self.game_root}
+        tmp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Falha ao gravar versão instalada: {e}")
+
+
+def parse_version_info(data):
+    """Valida o version.json; ValueError se estiver incompleto."""
+    try:
+        version = int(data["version"])
+        oldest = int(data.get("oldest_delta", version))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"version.json inválido: {e}")
+
+    mirrors = data.get("mirrors") or []
+    if not isinstance(mirrors, list):
+        raise ValueError("version.json inválido: mirrors")
+
+    return version, oldest, data.get("base_url", ""), data.get("deltas_url", ""), mirrors
+
+
+def merge_deltas(deltas):
+    """
+    Junta a cadeia de deltas (em ordem) em um único conjunto de mudanças:
+    retorna (entradas a verificar/baixar, caminhos removidos).
+    Um arquivo alterado em várias versões aparece uma vez, com a entrada mais nova.
+    """
+    changed = {}
+    removed = set()
+
+    for delta in deltas:
+        for entry in list(delta.get("added", [])) + list(delta.get("changed", [])):
+            changed[entry["path"]] = entry
+            removed.discard(entry["path"])
+        for path in delta.get("removed", []):
+            changed.pop(path, None)
+            removed.add(path)
+
+    return list(changed.values()), sorted(removed)
@@ -0,0 +1,277 @@
+"""
+Benchmark do updater: mede o UpdateEngine contra um servidor HTTP local com
+latência e banda configuráveis, em árvores sintéticas reproduzíveis.
+
+Uso (a partir da pasta Updater/):
+    python -m benchmarks.bench_updater
+    python -m benchmarks.bench_updater --profiles mixed --latency-ms 40 --bandwidth-kbps 20480
+    python -m benchmarks.bench_updater --scale 0.1 --repeat 3 --compare latest
+
+Cenários, em ordem, para cada perfil (small, large, mixed):
+    cold_install  pasta do jogo vazia, update completo
+    noop_update   update logo em seguida (nada mudou)
+    small_patch   ~1% dos arquivos alterados + 1 novo, nova versão publicada, update
+    fullcheck     fullcheck de tudo (relê todos os hashes)
+
+Resultados vão para benchmarks/results/<data>-<commit>.json; --compare mostra a
+diferença para um resultado anterior ("latest" = o mais recente).
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from app.engine import UpdateEngine, UpdateEvents
+from benchmarks.server import BenchServer
+from benchmarks.synthetic import PROFILES, build_tree, patch_tree, publish
+
+SCENARIOS = ("cold_install", "noop_update", "small_patch", "fullcheck")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class _Collector(UpdateEvents):
+    """Guarda só o que o relatório usa: a última linha de erro."""
+
+    def __init__(self):
+        self.error = None
+
+    def log(self, text):
+        if text.startswith("Erro:"):
+            self.error = text
+
+
+def _config(base_url, game_dir, args):
+    return {
+        "paths": {
+            "update_json": f"{base_url}/fullcheck.json",
+            "fullcheck_json": f"{base_url}/fullcheck.json",
+            "game_folder": game_dir,
+        },
+        "updater": {
+            "max_concurrent_downloads": args.downloads,
+        },
+    }
+
+
+def _run_scenario(name, mode, config, launcher_dir, server):
+    events = _Collector()
+    engine = UpdateEngine(mode, config, base_dir=launcher_dir, events=events)
+    server.reset_counters()
+    start = time.perf_counter()
+    ok = engine.run()
+    seconds = time.perf_counter() - start
+    result = {
+        "scenario": name,
+        "seconds": round(seconds, 4),
+        "ok": ok,
+        "requests": server.requests,
+        "bytes_sent": server.bytes_sent,
+        # tempo de parede de cada etapa, medido pelo próprio motor
+        "stages": {s["stage"]: s["seconds"] for s in engine.timings.report()["stages"]},
+        # até liberar o JOGAR (sem arquivos críticos = fim da execução)
+        "time_to_play": round(
+            engine.time_to_play if engine.time_to_play is not None else seconds, 4
+        ),
+    }
+    if events.error:
+        result["error"] = events.error
+    return result
+
+
+def run_profile(profile, args, workdir):
+    """Monta servidor + árvore do perfil e roda os cenários. Retorna a lista de resultados."""
+    root = os.path.join(workdir, profile, "www")
+    game_dir = os.path.join(workdir, profile, "game")
+    launcher_dir = os.path.join(workdir, profile, "launcher")
+    for path in (root, game_dir, launcher_dir):
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+    paths = build_tree(os.path.join(root, "client"), profile, args.scale)
+    priorities = _priorities(args)
+    server = BenchServer(root, args.latency_ms, args.bandwidth_kbps).start()
+    try:
+        publish(root, server.base_url, php=args.php, priorities=priorities)
+        config = _config(server.base_url, game_dir, args)
+
+        results = [
+            _run_scenario("cold_install", "update", config, launcher_dir, server),
+            _run_scenario("noop_update", "update", config, launcher_dir, server),
+        ]
+
+        patch_tree(os.path.join(root, "client"), paths)
+        publish(root, server.base_url, php=args.php, priorities=priorities)
+        results.append(_run_scenario("small_patch", "update", config, launcher_dir, server))
+        results.append(_run_scenario("fullcheck", "fullcheck", config, launcher_dir, server))
+    finally:
+        server.stop()
+
+    files = len(paths)
+    total_bytes = sum(
+        os.path.getsize(os.path.join(root, "client", p)) for p in paths
+    )
+    for result in results:
+        result.update(profile=profile, files=files, tree_bytes=total_bytes)
+    return results
+
+
+def _patterns(value):
+    return [p.strip() for p in (value or "").split(",") if p.strip()]
+
+
+def _priorities(args):
+    return {"critical": _patterns(args.critical), "optional": _patterns(args.optional)}
+
+
+def _git_commit():
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=here,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=here,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def summarize(runs):
+    """Mediana dos segundos de cada (perfil, cenário) entre as repetições."""
+    grouped = {}
+    for result in runs:
+        grouped.setdefault((result["profile"], result["scenario"]), []).append(result)
+
+    summary = []
+    for (profile, scenario), samples in grouped.items():
+        item = dict(samples[0])
+        item["seconds"] = round(statistics.median(r["seconds"] for r in samples), 4)
+        item["samples"] = [r["seconds"] for r in samples]
+        item["ok"] = all(r["ok"] for r in samples)
+        summary.append(item)
+    return summary
+
+
+def _load_baseline(spec):
+    if spec != "latest":
+        with open(spec, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    try:
+        names = sorted(n for n in os.listdir(RESULTS_DIR) if n.endswith(".json"))
+    except OSError:
+        names = []
+    if not names:
+        return None
+    with open(os.path.join(RESULTS_DIR, names[-1]), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_table(summary, baseline=None):
+    before = {}
+    if baseline:
+        before = {(r["profile"], r["scenario"]): r for r in baseline["summary"]}
+        print(f"Comparando com {baseline['commit']} ({baseline['timestamp']})")
+
+    print(f"{'perfil':<8} {'cenário':<13} {'tempo (s)':>10} {'reqs':>6} {'MB enviados':>12}  {'antes':>9} {'dif.':>8}")
+    for r in summary:
+        line = (
+            f"{r['profile']:<8} {r['scenario']:<13} {r['seconds']:>10.3f} "
+            f"{r['requests']:>6} {r['bytes_sent'] / (1024 * 1024):>12.2f}"
+        )
+        old = before.get((r["profile"], r["scenario"]))
+        if old:
+            change = (r["seconds"] - old["seconds"]) / old["seconds"] * 100 if old["seconds"] else 0.0
+            line += f"  {old['seconds']:>9.3f} {change:>+7.1f}%"
+        if not r["ok"]:
+            line += f"  FALHOU {r.get('error', '')}"
+        print(line)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do updater (servidor local + árvores sintéticas).")
+    parser.add_argument("--profiles", default=",".join(PROFILES),
+                        help=f"perfis separados por vírgula ({', '.join(PROFILES)})")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiplica a quantidade (arquivos pequenos) ou o tamanho (enormes)")
+    parser.add_argument("--latency-ms", type=int, default=0, help="latência por requisição")
+    parser.add_argument("--bandwidth-kbps", type=int, default=0,
+                        help="banda total do servidor em KB/s (0 = sem limite)")
+    parser.add_argument("--downloads", type=int, default=4, help="max_concurrent_downloads")
+    parser.add_argument("--repeat", type=int, default=1, help="repetições (relatório usa a mediana)")
+    parser.add_argument("--php", help="publica com o generate_manifests.php (ex.: --php php)")
+    parser.add_argument("--critical", help='padrões dos arquivos críticos (ex.: "system_en/*")')
+    parser.add_argument("--optional", help="padrões dos arquivos opcionais")
+    parser.add_argument("--workdir", help="pasta de trabalho (padrão: temporária, apagada no fim)")
+    parser.add_argument("--compare", help='resultado anterior (.json) ou "latest"')
+    parser.add_argument("--no-save", action="store_true", help="não grava em benchmarks/results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    unknown = [p for p in profiles if p not in PROFILES]
+    if unknown:
+        print(f"Perfil desconhecido: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    baseline = _load_baseline(args.compare) if args.compare else None
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="l2bench-")
+    runs = []
+    try:
+        for repeat in range(1, args.repeat + 1):
+            for profile in profiles:
+                print(f"[{repeat}/{args.repeat}] perfil {profile}...", file=sys.stderr)
+                runs.extend(run_profile(profile, args, workdir))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    commit, dirty = _git_commit()
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit + ("-dirty" if dirty else ""),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "profiles": profiles,
+            "scale": args.scale,
+            "latency_ms": args.latency_ms,
+            "bandwidth_kbps": args.bandwidth_kbps,
+            "downloads": args.downloads,
+            "repeat": args.repeat,
+            "publisher": "php" if args.php else "python",
+            "critical": args.critical or "",
+            "optional": args.optional or "",
+        },
+        "summary": summarize(runs),
+        "runs": runs,
+    }
+
+    print_table(report["summary"], baseline)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = time.strftime("%Y%m%d-%H%M%S") + f"-{report['commit']}.json"
+        path = os.path.join(RESULTS_DIR, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultado gravado em {path}", file=sys.stderr)
+
+    return 0 if all(r["ok"] for r in report["summary"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
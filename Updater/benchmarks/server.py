@@ -0,0 +1,151 @@
+import os
+import time
+import threading
+import functools
+import http.server
+
+from app.bandwidth import TokenBucket
+
+# Servidor HTTP local para os benchmarks: serve a pasta publicada (client/,
+# manifestos, versions/, deltas/...) com keep-alive e Range, simulando a rede
+# do jogador com latência por requisição e banda total limitada.
+
+_COPY_CHUNK = 64 * 1024
+
+
+class _RangeFile:
+    """Arquivo limitado a `length` bytes a partir da posição atual (resposta 206)."""
+
+    def __init__(self, f, length):
+        self._f = f
+        self._remaining = length
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._f.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._f.close()
+
+
+class _Handler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        server = self.server
+        server.count_request()
+        if server.latency:
+            time.sleep(server.latency)
+
+        path = self.translate_path(self.path)
+        self._etag = None
+        if os.path.isfile(path):
+            # ETag pelo mtime em ns: o Last-Modified (1 s) não distingue manifestos
+            # republicados no mesmo segundo, o que acontece o tempo todo aqui
+            st = os.stat(path)
+            self._etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+            if "If-None-Match" in self.headers:
+                del self.headers["If-Modified-Since"]
+                if self.headers["If-None-Match"] == self._etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return None
+
+        range_header = self.headers.get("Range")
+        if not range_header or self._etag is None:
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        try:
+            unit, spec = range_header.split("=", 1)
+            first, last = spec.split(",", 1)[0].split("-", 1)
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        except ValueError:
+            return super().send_head()
+        if unit.strip() != "bytes" or start >= size or end < start:
+            self.send_error(416)
+            return None
+
+        f = open(path, "rb")
+        f.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        return _RangeFile(f, end - start + 1)
+
+    def end_headers(self):
+        if getattr(self, "_etag", None):
+            self.send_header("ETag", self._etag)
+        super().end_headers()
+
+    def copyfile(self, source, outputfile):
+        server = self.server
+        while True:
+            chunk = source.read(_COPY_CHUNK)
+            if not chunk:
+                break
+            if server.bucket is not None:
+                server.bucket.consume(len(chunk))
+            outputfile.write(chunk)
+            server.count_bytes(len(chunk))
+
+
+class BenchServer(http.server.ThreadingHTTPServer):
+    """
+    Servidor em thread própria (porta livre escolhida pelo sistema).
+    latency_ms: espera antes de cada resposta; bandwidth_kbps: banda total
+    compartilhada por todas as conexões (0 = sem limite).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, root, latency_ms=0, bandwidth_kbps=0, host="127.0.0.1"):
+        super().__init__((host, 0), functools.partial(_Handler, directory=root))
+        self.root = root
+        self.latency = max(0, latency_ms) / 1000.0
+        self.bucket = TokenBucket(bandwidth_kbps * 1024) if bandwidth_kbps > 0 else None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_bytes(self, nbytes):
+        with self._lock:
+            self.bytes_sent += nbytes
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,226 @@
+import os
+import json
+import random
+import shutil
+import fnmatch
+import hashlib
+import subprocess
+
+from app.manifest import BINARY_MANIFEST_EXT, derive_url, write_binary_manifest
+
+# Árvores sintéticas do cliente e publicação dos manifestos para os benchmarks.
+#
+# O conteúdo é gerado por um random com semente fixa: o mesmo perfil e a mesma
+# escala geram sempre os mesmos arquivos, em qualquer máquina.
+#
+# A publicação segue o generate_manifests.php (mesmos campos e arquivos:
+# fullcheck.json, update_json_url.json, .l2m, version.json, versions/, deltas/).
+# Com o PHP instalado, publish(..., php="php") roda o próprio script do servidor.
+
+# grupo: (pasta, quantidade, tamanho mínimo, tamanho máximo, o que a escala multiplica)
+PROFILES = {
+    # muitos arquivos pequenos (system, textures de interface)
+    "small": [
+        ("system_en", 3000, 1 * 1024, 64 * 1024, "count"),
+    ],
+    # poucos arquivos enormes (mapas / pacotes)
+    "large": [
+        ("maps", 3, 48 * 1024 * 1024, 64 * 1024 * 1024, "size"),
+    ],
+    # mistura parecida com um cliente real
+    "mixed": [
+        ("system_en", 1000, 1 * 1024, 64 * 1024, "count"),
+        ("textures", 40, 512 * 1024, 4 * 1024 * 1024, "count"),
+        ("maps", 2, 32 * 1024 * 1024, 48 * 1024 * 1024, "size"),
+    ],
+}
+
+SEED = 2024
+_WRITE_CHUNK = 1024 * 1024
+_PHP_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "..", "www", "l2updater", "generate_manifests.php",
+)
+
+
+def _scaled(profile, scale):
+    groups = []
+    for folder, count, min_size, max_size, scaled in PROFILES[profile]:
+        if scaled == "count":
+            count = max(1, int(round(count * scale)))
+        else:
+            min_size = max(1, int(min_size * scale))
+            max_size = max(min_size, int(max_size * scale))
+        groups.append((folder, count, min_size, max_size))
+    return groups
+
+
+def _write_random(path, size, rnd):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            n = min(_WRITE_CHUNK, remaining)
+            f.write(rnd.randbytes(n))
+            remaining -= n
+
+
+def build_tree(client_dir, profile, scale=1.0):
+    """Gera a pasta client/ do perfil. Retorna a lista de caminhos relativos (com "/")."""
+    rnd = random.Random(f"{SEED}:{profile}:{scale}")
+    paths = []
+    for folder, count, min_size, max_size in _scaled(profile, scale):
+        for i in range(count):
+            rel_path = f"{folder}/file{i:05d}.dat"
+            _write_random(os.path.join(client_dir, rel_path), rnd.randint(min_size, max_size), rnd)
+            paths.append(rel_path)
+    return paths
+
+
+def patch_tree(client_dir, paths, fraction=0.01, seed=1):
+    """
+    Simula um patch pequeno: reescreve um bloco no meio de `fraction` dos arquivos
+    (pelo menos um) e acrescenta um arquivo novo. Retorna os caminhos alterados.
+    """
+    rnd = random.Random(f"{SEED}:patch:{seed}")
+    changed = rnd.sample(paths, max(1, int(len(paths) * fraction)))
+    for rel_path in changed:
+        path = os.path.join(client_dir, rel_path)
+        size = os.path.getsize(path)
+        block = min(size, 64 * 1024)
+        with open(path, "r+b") as f:
+            f.seek(rnd.randint(0, size - block))
+            f.write(rnd.randbytes(block))
+
+    new_path = f"system_en/patch{seed:03d}.dat"
+    _write_random(os.path.join(client_dir, new_path), 16 * 1024, rnd)
+    return changed + [new_path]
+
+
+def _sha1_file(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_WRITE_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest().upper()
+
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def _priority(rel_path, priorities):
+    """Mesma regra do filePriority() do PHP: critical ganha de optional; None = required."""
+    path = rel_path.lstrip("/")
+    for priority in ("critical", "optional"):
+        if any(fnmatch.fnmatchcase(path, pattern) for pattern in priorities.get(priority, ())):
+            return priority
+    return None
+
+
+def publish(root, base_url, php=None, priorities=None):
+    """
+    Publica os manifestos da pasta root/client como o generate_manifests.php.
+    base_url = URL de root no servidor; priorities = {"critical": [padrões],
+    "optional": [padrões]} (--critical / --optional do PHP). Retorna a versão publicada.
+    """
+    priorities = priorities or {}
+    client_url = base_url.rstrip("/") + "/client"
+    if php:
+        shutil.copy(_PHP_SCRIPT, os.path.join(root, "generate_manifests.php"))
+        command = [php, os.path.join(root, "generate_manifests.php"), f"--base-url={client_url}"]
+        for priority in ("critical", "optional"):
+            if priorities.get(priority):
+                command.append(f"--{priority}={','.join(priorities[priority])}")
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        with open(os.path.join(root, "version.json"), "r", encoding="utf-8") as f:
+            return json.load(f)["version"]
+
+    client_dir = os.path.join(root, "client")
+    files = []
+    for dirpath, _, filenames in os.walk(client_dir):
+        for name in filenames:
+            abs_path = os.path.join(dirpath, name)
+            rel_path = "/" + os.path.relpath(abs_path, client_dir).replace(os.sep, "/")
+            entry = {
+                "path": rel_path,
+                "url": derive_url(client_url, rel_path),
+                "sha1": _sha1_file(abs_path),
+                "size": os.path.getsize(abs_path),
+            }
+            priority = _priority(rel_path, priorities)
+            if priority:
+                entry["priority"] = priority
+            files.append(entry)
+    files.sort(key=lambda e: e["path"])
+
+    manifests = {
+        "fullcheck": {"base_url": client_url, "mirrors": [], "files": files},
+        "update_json_url": {
+            "base_url": client_url, "mirrors": [],
+            "files": [e for e in files if e["path"].startswith("/system_en/")],
+        },
+    }
+    for name, data in manifests.items():
+        _write_json(os.path.join(root, name + ".json"), data)
+        with open(os.path.join(root, name + BINARY_MANIFEST_EXT), "wb") as f:
+            f.write(write_binary_manifest(data))
+
+    return _publish_version(root, client_url, base_url.rstrip("/") + "/deltas", files)
+
+
+def _publish_version(root, client_url, deltas_url, files):
+    """Mesma lógica do publishVersion() do PHP: nova versão só quando algo mudou."""
+    versions_dir = os.path.join(root, "versions")
+    deltas_dir = os.path.join(root, "deltas")
+    os.makedirs(versions_dir, exist_ok=True)
+    os.makedirs(deltas_dir, exist_ok=True)
+
+    version_path = os.path.join(root, "version.json")
+    current, oldest, previous = 0, 1, None
+    if os.path.isfile(version_path):
+        with open(version_path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        current, oldest = info["version"], info.get("oldest_delta", info["version"])
+        with open(os.path.join(versions_dir, f"{current}.json"), "r", encoding="utf-8") as f:
+            previous = json.load(f)["files"]
+
+    delta = None
+    if previous is not None:
+        old = {e["path"]: e for e in previous}
+        new = {e["path"]: e for e in files}
+        delta = {
+            "added": [e for p, e in new.items() if p not in old],
+            "changed": [
+                e for p, e in new.items()
+                if p in old and (old[p]["sha1"] != e["sha1"] or old[p]["size"] != e["size"])
+            ],
+            "removed": sorted(p for p in old if p not in new),
+        }
+        if not any(delta.values()):
+            return current
+
+    version = current + 1
+    _write_json(
+        os.path.join(versions_dir, f"{version}.json"),
+        {"version": version, "base_url": client_url, "files": files},
+    )
+    if delta is not None:
+        _write_json(
+            os.path.join(deltas_dir, f"{current}-{version}.json"),
+            dict({"from": current, "to": version, "base_url": client_url}, **delta),
+        )
+    else:
+        oldest = version
+
+    _write_json(version_path, {
+        "version": version,
+        "base_url": client_url,
+        "deltas_url": deltas_url,
+        "oldest_delta": oldest,
+        "mirrors": [],
+    })
+    return version
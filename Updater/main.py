@@ -2,12 +2,17 @@ import os
 import sys
 import json
 import logging
+import argparse
+import time
 
-from PyQt5.QtWidgets import QApplication, QMessageBox
-
-from app.main_window import MainWindow
+from app.http_client import close_http_client
+from app.log_setup import start_logging
+from app.startup import get_startup_trace
 from app.windows_privileges import ensure_admin_privileges
 
+# início do processo: base do tempo de abertura (app/startup.py)
+STARTUP_T0 = time.perf_counter()
+
 LOGGING_ENABLED = True
 
 # ----------------- CONFIG PADRÃO GERADA AUTOMATICAMENTE -----------------
@@ -20,7 +25,63 @@ DEFAULT_CONFIG = {
         "game_folder": ".",
         "exe": "system-e/l2.exe",
         "news_url": "http://192.168.15.57:8080/news/launcher_news.html",
-    }
+        # espelhos extras: base_url da pasta client/ em cada servidor (mesma árvore)
+        "mirrors": [],
+    },
+    "updater": {
+        # índice local de hashes (relativo à pasta do launcher)
+        "hash_index": "cache/hash_index.bin",
+        # cópia local dos manifestos (GET condicional e verificação offline)
+        "manifest_cache": "cache/manifests",
+        # tenta primeiro o manifesto binário (.l2m) publicado ao lado do .json
+        "binary_manifest": True,
+        # downloads simultâneos (conexões paralelas)
+        "max_concurrent_downloads": 4,
+        # threads de hash (0 = automático) e leituras simultâneas (0 = sem limite, 1 = HD)
+        "hash_workers": 0,
+        "hash_io_concurrency": 0,
+        # novas tentativas quando o arquivo baixado não confere com o manifesto
+        "download_retries": 2,
+        # baixa só os blocos alterados de arquivos grandes (precisa de sig_url no manifesto)
+        "delta_enabled": True,
+        # usa as variantes pré-comprimidas do manifesto (descomprime durante o download)
+        "compressed_downloads": True,
+        # aplica só os deltas entre a versão instalada e a publicada (version.json)
+        "incremental_updates": True,
+        "installed_version": "cache/installed_version.json",
+        # apaga da pasta do jogo os arquivos que saíram do cliente (senão só registra no log)
+        "delete_removed_files": False,
+        # limite de download em KB/s (0 = sem limite); também ajustável na barra do launcher
+        "max_download_kbps": 0,
+        # limite enquanto o jogo aberto pelo launcher estiver rodando (0 = usa o limite acima)
+        "game_running_kbps": 512,
+        # espelhos: tempo limite da sondagem (s) e velocidade mínima antes de trocar (KB/s)
+        "mirror_probe_timeout": 3,
+        "mirror_min_speed_kbps": 16,
+        # arquivos a partir deste tamanho (bytes) são baixados em faixas paralelas
+        "segmented_min_size": 33554432,
+        "download_segments": 4,
+        # relatório de tempos (etapas, arquivos mais lentos) de cada execução ("" desliga)
+        "timing_report": "logs/update_report.json",
+    },
+    "http": {
+        # conexões keep-alive ociosas mantidas por host
+        "pool_size": 8,
+        "connect_timeout": 10,
+        "read_timeout": 30,
+    },
+    "logging": {
+        "level": "INFO",
+        # logs/launcher.log troca de arquivo ao passar deste tamanho (bytes) e na virada do dia
+        "max_bytes": 5242880,
+        "rotate_daily": True,
+        # cópias antigas mantidas (launcher.log.1, .2...) e idade máxima delas (0 = sem limite)
+        "backup_count": 5,
+        "retention_days": 14,
+        # linhas por arquivo conferido: "all", "sample" (1 a cada file_lines_sample) ou "summary"
+        "file_lines": "summary",
+        "file_lines_sample": 1000,
+    },
 }
 
 
@@ -28,40 +89,43 @@ def ensure_default_config(config_path: str):
     """
     Se o config.json não existir, cria com DEFAULT_CONFIG.
     Se existir, não altera nada.
+    Retorna False se não foi possível criar o arquivo.
     """
     if os.path.isfile(config_path):
-        return
+        return True
 
     try:
         os.makedirs(os.path.dirname(config_path), exist_ok=True)
         with open(config_path, "w", encoding="utf-8") as f:
             json.dump(DEFAULT_CONFIG, f, indent=2, ensure_ascii=False)
         logging.info(f"config.json não encontrado. Arquivo padrão gerado em: {config_path}")
+        return True
     except Exception:
         logging.exception("Falha ao gerar config.json padrão")
-        QMessageBox.critical(
-            None,
-            "Erro",
-            f"Não foi possível criar o arquivo de configuração:\n{config_path}",
-        )
-        sys.exit(1)
+        return False
 
 # ------------------------------------------------------------------------
 
 
-def setup_logging():
-    logs_dir = os.path.join(os.getcwd(), "logs")
-    os.makedirs(logs_dir, exist_ok=True)
-    log_file_path = os.path.join(logs_dir, "launcher.log")
+def _read_logging_settings(config_path):
+    """Seção "logging" do config.json, lida antes do resto (o log começa antes da janela)."""
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            settings = json.load(f).get("logging", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+    return settings if isinstance(settings, dict) else {}
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-        handlers=[
-            logging.FileHandler(log_file_path, encoding="utf-8"),
-            logging.StreamHandler(sys.stdout),
-        ],
-    )
+
+def setup_logging(console=True, config_path=None):
+    """
+    Log em logs/launcher.log gravado por uma thread própria, com rotação
+    (seção "logging" do config.json).
+    console=False no modo sem interface: stdout fica só com as JSON lines.
+    """
+    log_file_path = os.path.join(os.getcwd(), "logs", "launcher.log")
+    settings = _read_logging_settings(config_path) if config_path else {}
+    start_logging(log_file_path, settings, console=console)
 
     logging.info("Logging iniciado.")
 
@@ -79,20 +143,99 @@ def get_base_path():
     return os.path.dirname(os.path.abspath(__file__))
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Launcher / atualizador do cliente Lineage 2. "
+        "Sem opções abre a janela do launcher."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--update", action="store_const", const="update", dest="headless",
+        help="atualiza o cliente sem interface (JSON lines em stdout)",
+    )
+    mode.add_argument(
+        "--fullcheck", action="store_const", const="fullcheck", dest="headless",
+        help="verifica todos os arquivos e baixa os diferentes, sem interface",
+    )
+    mode.add_argument(
+        "--verify-only", action="store_const", const="verify", dest="headless",
+        help="só confere os arquivos com o manifesto completo, sem baixar nada "
+        "(código de saída 3 se houver diferenças)",
+    )
+    parser.add_argument(
+        "--config", help="caminho do config.json (padrão: ao lado do launcher)",
+    )
+    return parser.parse_args(argv)
+
+
+def run_headless_cli(args):
+    """
+    Modo sem interface: sem QApplication e sem pedir elevação (o processo precisa
+    já ter permissão de escrita na pasta do jogo). Retorna o código de saída.
+    """
+    from app.headless import EXIT_ERROR, run_headless
+
+    base_path = get_base_path()
+    config_path = args.config or os.path.join(base_path, "config.json")
+
+    if LOGGING_ENABLED:
+        setup_logging(console=False, config_path=config_path)
+
+    if args.config:
+        # caminhos relativos do config (cache, pasta do jogo) seguem o arquivo informado
+        base_path = os.path.dirname(os.path.abspath(config_path))
+
+    if not ensure_default_config(config_path):
+        print(json.dumps({"event": "error", "text": f"Não foi possível criar {config_path}"}))
+        return EXIT_ERROR
+
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        print(json.dumps({"event": "error", "text": f"Configuração inválida: {e}"}))
+        return EXIT_ERROR
+
+    verify_only = args.headless == "verify"
+    mode = "fullcheck" if verify_only else args.headless
+    return run_headless(mode, config, base_path, verify_only=verify_only)
+
+
 def main():
+    args = parse_args()
+    if args.headless:
+        code = run_headless_cli(args)
+        close_http_client()
+        sys.exit(code)
+
+    trace = get_startup_trace(STARTUP_T0)
+
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+
+    from app.main_window import MainWindow
+    trace.mark("imports")
+
     # Garante privilégios administrativos no Windows (se possível)
     ensure_admin_privileges()
 
+    base_path = get_base_path()
+    config_path = os.path.join(base_path, "config.json")
+
     if LOGGING_ENABLED:
-        setup_logging()
+        setup_logging(config_path=config_path)
+    trace.mark("logging")
 
     app = QApplication(sys.argv)
-
-    base_path = get_base_path()
-    config_path = os.path.join(base_path, "config.json")
+    trace.mark("qt")
 
     # 🔹 GARANTE QUE O config.json EXISTA (CRIA SE PRECISAR)
-    ensure_default_config(config_path)
+    if not ensure_default_config(config_path):
+        QMessageBox.critical(
+            None,
+            "Erro",
+            f"Não foi possível criar o arquivo de configuração:\n{config_path}",
+        )
+        sys.exit(1)
 
     if not os.path.isfile(config_path):
         QMessageBox.critical(
@@ -102,6 +245,8 @@ def main():
         )
         sys.exit(1)
 
+    trace.mark("config")
+
     try:
         window = MainWindow(config_path=config_path, base_dir=base_path)
     except Exception:
@@ -113,8 +258,12 @@ def main():
         )
         sys.exit(1)
 
+    trace.mark("janela")
+
     window.show()
-    sys.exit(app.exec_())
+    code = app.exec_()
+    close_http_client()
+    sys.exit(code)
 
 
 if __name__ == "__main__":
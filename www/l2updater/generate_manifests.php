@@ -5,6 +5,35 @@
  *
  * Uso (linha de comando):
  *   php generate_manifests.php --base-url="http://192.168.15.57:8080/l2updater/client"
+ *
+ * Opções de delta (assinaturas de blocos para arquivos grandes):
+ *   --sig-url="http://192.168.15.57:8080/l2updater/signatures"
+ *   --delta-min-size=8388608     (bytes; 0 desativa as assinaturas)
+ *   --delta-block-size=1048576   (bytes)
+ *
+ * Opções de pré-compressão (variantes gzip/xz publicadas só quando economizam bytes):
+ *   --compressed-url="http://192.168.15.57:8080/l2updater/compressed"
+ *   --compress-min-size=1024     (bytes; 0 desativa a pré-compressão)
+ *   --xz-min-size=16777216       (arquivos a partir desse tamanho tentam xz/lzma;
+ *                                 precisa da extensão php-xz ou do comando "xz")
+ *
+ * Também gera fullcheck.l2m e update_json_url.l2m (manifesto binário compacto,
+ * lido primeiro pelo updater). Use --no-binary para gerar só os JSONs.
+ *
+ * Versões: cada execução que encontra mudanças publica uma nova versão do cliente
+ * (version.json + versions/<N>.json) e o delta da versão anterior para a nova
+ * (deltas/<N-1>-<N>.json, só com arquivos adicionados, alterados e removidos).
+ *   --deltas-url="http://192.168.15.57:8080/l2updater/deltas"
+ *   --keep-versions=30           (quantos deltas antigos manter publicados)
+ *
+ * Espelhos (mesma árvore client/, signatures/, compressed/ em outros servidores):
+ *   --mirrors="http://espelho1/l2updater/client,http://espelho2/l2updater/client"
+ *
+ * Prioridade (campo "priority"; o launcher libera o JOGAR assim que os críticos
+ * conferem e baixa o resto depois). Padrões fnmatch sobre o caminho sem a "/" inicial;
+ * arquivos sem padrão ficam "required":
+ *   --critical="system/l2.exe,system/*.dll,system/*.ini"
+ *   --optional="music/*,voice/*"
  */
 
 ini_set('display_errors', 1);
@@ -15,20 +44,98 @@ error_reporting(E_ALL);
 // base_url padrão (pode sobrescrever via --base-url=)
 $baseUrl = "http://192.168.15.57:8080/l2updater/client";
 
+// delta: arquivos a partir deste tamanho ganham assinatura de blocos
+$deltaMinSize   = 8 * 1024 * 1024;
+$deltaBlockSize = 1024 * 1024;
+$sigUrl         = null; // padrão: pasta "signatures" ao lado de client/
+
+// pré-compressão: gzip para arquivos a partir de $compressMinSize, xz para os grandes
+$compressMinSize = 1024;
+$xzMinSize       = 16 * 1024 * 1024;
+$compressedUrl   = null; // padrão: pasta "compressed" ao lado de client/
+
+// só publica a variante comprimida se ela for pelo menos 5% menor
+$compressMaxRatio = 0.95;
+
+// manifesto binário (.l2m) ao lado de cada JSON
+$writeBinary = true;
+
+// versões: deltas entre versões publicadas
+$deltasUrl    = null; // padrão: pasta "deltas" ao lado de client/
+$keepVersions = 30;
+
+// espelhos: base_url da pasta client/ em cada servidor extra
+$mirrors = [];
+
+// prioridade => padrões fnmatch (vazio: nenhum arquivo classificado)
+$priorityPatterns = [
+    'critical' => [],
+    'optional' => [],
+];
+
 // lê argumentos da linha de comando
 foreach ($argv as $arg) {
     if (strpos($arg, '--base-url=') === 0) {
         $baseUrl = substr($arg, strlen('--base-url='));
+    } elseif (strpos($arg, '--sig-url=') === 0) {
+        $sigUrl = substr($arg, strlen('--sig-url='));
+    } elseif (strpos($arg, '--delta-min-size=') === 0) {
+        $deltaMinSize = (int) substr($arg, strlen('--delta-min-size='));
+    } elseif (strpos($arg, '--delta-block-size=') === 0) {
+        $deltaBlockSize = max(4096, (int) substr($arg, strlen('--delta-block-size=')));
+    } elseif (strpos($arg, '--compressed-url=') === 0) {
+        $compressedUrl = substr($arg, strlen('--compressed-url='));
+    } elseif (strpos($arg, '--compress-min-size=') === 0) {
+        $compressMinSize = (int) substr($arg, strlen('--compress-min-size='));
+    } elseif (strpos($arg, '--xz-min-size=') === 0) {
+        $xzMinSize = (int) substr($arg, strlen('--xz-min-size='));
+    } elseif ($arg === '--no-binary') {
+        $writeBinary = false;
+    } elseif (strpos($arg, '--deltas-url=') === 0) {
+        $deltasUrl = substr($arg, strlen('--deltas-url='));
+    } elseif (strpos($arg, '--keep-versions=') === 0) {
+        $keepVersions = max(1, (int) substr($arg, strlen('--keep-versions=')));
+    } elseif (strpos($arg, '--mirrors=') === 0) {
+        $mirrors = array_values(array_filter(array_map(function ($url) {
+            return rtrim(trim($url), '/');
+        }, explode(',', substr($arg, strlen('--mirrors='))))));
+    } elseif (strpos($arg, '--critical=') === 0) {
+        $priorityPatterns['critical'] = splitPatterns(substr($arg, strlen('--critical=')));
+    } elseif (strpos($arg, '--optional=') === 0) {
+        $priorityPatterns['optional'] = splitPatterns(substr($arg, strlen('--optional=')));
     }
 }
 
+if ($sigUrl === null) {
+    $sigUrl = dirname(rtrim($baseUrl, '/')) . '/signatures';
+}
+$sigUrl = rtrim($sigUrl, '/');
+
+if ($compressedUrl === null) {
+    $compressedUrl = dirname(rtrim($baseUrl, '/')) . '/compressed';
+}
+$compressedUrl = rtrim($compressedUrl, '/');
+
+if ($deltasUrl === null) {
+    $deltasUrl = dirname(rtrim($baseUrl, '/')) . '/deltas';
+}
+$deltasUrl = rtrim($deltasUrl, '/');
+
 // diretórios base
 $rootDir   = __DIR__;                  // www/l2updater
 $clientDir = $rootDir . DIRECTORY_SEPARATOR . 'client';
 
+$sigDir    = $rootDir . DIRECTORY_SEPARATOR . 'signatures';
+$compressedDir = $rootDir . DIRECTORY_SEPARATOR . 'compressed';
+$versionsDir   = $rootDir . DIRECTORY_SEPARATOR . 'versions';
+$deltasDir     = $rootDir . DIRECTORY_SEPARATOR . 'deltas';
+
 // arquivos de saída
 $fullcheckFile      = $rootDir . DIRECTORY_SEPARATOR . 'fullcheck.json';
 $updateJsonUrlFile  = $rootDir . DIRECTORY_SEPARATOR . 'update_json_url.json';
+$fullcheckBinFile     = $rootDir . DIRECTORY_SEPARATOR . 'fullcheck.l2m';
+$updateJsonUrlBinFile = $rootDir . DIRECTORY_SEPARATOR . 'update_json_url.l2m';
+$versionFile          = $rootDir . DIRECTORY_SEPARATOR . 'version.json';
 
 // valida pasta client
 if (!is_dir($clientDir)) {
@@ -71,6 +178,33 @@ function makeRelativePath($absolutePath, $clientDir)
     return str_replace(DIRECTORY_SEPARATOR, '/', $relative);
 }
 
+/**
+ * Lista de padrões separados por vírgula (--critical= / --optional=).
+ */
+function splitPatterns($value)
+{
+    return array_values(array_filter(array_map(function ($pattern) {
+        return ltrim(trim($pattern), '/');
+    }, explode(',', $value)), 'strlen'));
+}
+
+/**
+ * Prioridade do arquivo pelos padrões; null = "required" (campo omitido no JSON).
+ * Crítico ganha de opcional quando os dois casam.
+ */
+function filePriority($relativePath, $priorityPatterns)
+{
+    $path = ltrim($relativePath, '/');
+    foreach (['critical', 'optional'] as $priority) {
+        foreach ($priorityPatterns[$priority] as $pattern) {
+            if (fnmatch($pattern, $path)) {
+                return $priority;
+            }
+        }
+    }
+    return null;
+}
+
 /**
  * Retorna true se o arquivo deve ser ignorado no JSON.
  * (ex.: este script, .git, .DS_Store, etc)
@@ -108,6 +242,415 @@ function shouldIgnore($relativePath)
     return false;
 }
 
+/**
+ * Gera signatures/<SHA1>.json com o SHA1 de cada bloco do arquivo,
+ * usado pelo updater para baixar só os blocos alterados (delta).
+ * Como o nome é o SHA1 do conteúdo, arquivos que não mudaram não são reprocessados.
+ */
+function writeSignature($absolutePath, $sha1, $sizeBytes, $blockSize, $sigDir)
+{
+    $sigFile = $sigDir . DIRECTORY_SEPARATOR . $sha1 . '.json';
+    if (is_file($sigFile)) {
+        return true;
+    }
+
+    if (!is_dir($sigDir) && !mkdir($sigDir, 0755, true)) {
+        return false;
+    }
+
+    $fh = fopen($absolutePath, 'rb');
+    if ($fh === false) {
+        return false;
+    }
+
+    $blocks = [];
+    while (!feof($fh)) {
+        $block = stream_get_contents($fh, $blockSize);
+        if ($block === false) {
+            fclose($fh);
+            return false;
+        }
+        if ($block === '') {
+            break;
+        }
+        $blocks[] = sha1($block);
+    }
+    fclose($fh);
+
+    $signature = [
+        'sha1'       => $sha1,
+        'size'       => $sizeBytes,
+        'block_size' => $blockSize,
+        'blocks'     => $blocks,
+    ];
+
+    // grava em arquivo temporário e renomeia, para nunca publicar assinatura pela metade
+    $tmpFile = $sigFile . '.tmp';
+    if (file_put_contents($tmpFile, json_encode($signature, JSON_UNESCAPED_SLASHES)) === false) {
+        return false;
+    }
+    return rename($tmpFile, $sigFile);
+}
+
+/**
+ * Comprime em gzip lendo o arquivo em pedaços (não carrega arquivos grandes na memória).
+ */
+function compressGzip($source, $target)
+{
+    $in  = fopen($source, 'rb');
+    $out = fopen($target, 'wb');
+    if ($in === false || $out === false) {
+        return false;
+    }
+
+    $ctx = deflate_init(ZLIB_ENCODING_GZIP, ['level' => 9]);
+    while (!feof($in)) {
+        $data = fread($in, 1024 * 1024);
+        if ($data === false) {
+            break;
+        }
+        fwrite($out, deflate_add($ctx, $data, ZLIB_NO_FLUSH));
+    }
+    fwrite($out, deflate_add($ctx, '', ZLIB_FINISH));
+
+    fclose($in);
+    fclose($out);
+    return true;
+}
+
+/**
+ * Comprime em xz (lzma). Usa a extensão php-xz se existir, senão o comando "xz".
+ */
+function compressXz($source, $target)
+{
+    if (function_exists('xzencode')) {
+        $data = file_get_contents($source);
+        return $data !== false && file_put_contents($target, xzencode($data)) !== false;
+    }
+
+    $cmd = 'xz -6 -c ' . escapeshellarg($source) . ' > ' . escapeshellarg($target);
+    exec($cmd, $output, $status);
+    return $status === 0;
+}
+
+/**
+ * Gera (ou reaproveita) compressed/<SHA1>.gz|.xz e retorna a entrada "compressed"
+ * do manifesto, ou null quando a compressão não economiza bytes.
+ * Arquivos que não comprimem ganham um marcador <SHA1>.nogain para não serem
+ * testados de novo a cada execução.
+ */
+function writeCompressed($absolutePath, $sha1, $sizeBytes, $useXz, $maxRatio, $compressedDir, $compressedUrl)
+{
+    $encoding  = $useXz ? 'xz' : 'gzip';
+    $extension = $useXz ? '.xz' : '.gz';
+    $target    = $compressedDir . DIRECTORY_SEPARATOR . $sha1 . $extension;
+    $noGain    = $compressedDir . DIRECTORY_SEPARATOR . $sha1 . '.nogain';
+
+    if (is_file($noGain)) {
+        return null;
+    }
+
+    if (!is_file($target)) {
+        if (!is_dir($compressedDir) && !mkdir($compressedDir, 0755, true)) {
+            return null;
+        }
+
+        $tmpFile = $target . '.tmp';
+        $ok = $useXz ? compressXz($absolutePath, $tmpFile) : compressGzip($absolutePath, $tmpFile);
+        if (!$ok) {
+            @unlink($tmpFile);
+            if ($useXz) {
+                // sem xz disponível: tenta gzip
+                return writeCompressed($absolutePath, $sha1, $sizeBytes, false, $maxRatio, $compressedDir, $compressedUrl);
+            }
+            return null;
+        }
+
+        clearstatcache(true, $tmpFile);
+        if (filesize($tmpFile) >= $sizeBytes * $maxRatio) {
+            @unlink($tmpFile);
+            touch($noGain);
+            return null;
+        }
+
+        rename($tmpFile, $target);
+    }
+
+    clearstatcache(true, $target);
+
+    return [
+        'encoding' => $encoding,
+        'url'      => $compressedUrl . '/' . $sha1 . $extension,
+        'size'     => filesize($target),
+    ];
+}
+
+/**
+ * Inteiro sem sinal em varint (LEB128), usado no manifesto binário.
+ */
+function varint($n)
+{
+    $out = '';
+    while ($n >= 0x80) {
+        $out .= chr(($n & 0x7F) | 0x80);
+        $n >>= 7;
+    }
+    return $out . chr($n);
+}
+
+function binString($value)
+{
+    return varint(strlen($value)) . $value;
+}
+
+/**
+ * Monta o manifesto binário (.l2m). O formato está documentado em
+ * Updater/app/manifest.py: caminhos ordenados e com prefixo compartilhado,
+ * SHA1 em 20 bytes, tamanhos em varint e URLs derivadas sempre que possível;
+ * o corpo é comprimido com zlib e termina com crc32.
+ */
+function buildBinaryManifest($baseUrl, $files, $sigUrl, $compressedUrl, $mirrors = [])
+{
+    usort($files, function ($a, $b) {
+        return strcmp($a['path'], $b['path']);
+    });
+
+    // encoding => [código, extensão]
+    $codes = [
+        'gzip' => [1, '.gz'],
+        'zlib' => [2, '.zz'],
+        'xz'   => [3, '.xz'],
+    ];
+    // prioridade => código (required é o padrão e não é gravado)
+    $priorityCodes = ['critical' => 0, 'optional' => 2];
+
+    $withPriority = false;
+    foreach ($files as $entry) {
+        if (isset($entry['priority'], $priorityCodes[$entry['priority']])) {
+            $withPriority = true;
+            break;
+        }
+    }
+
+    $body  = varint(count($files));
+    $body .= binString($baseUrl);
+    $body .= binString($sigUrl);
+    $body .= binString($compressedUrl);
+
+    // versão 2 (e 3): lista de espelhos logo após o cabeçalho
+    if ($mirrors || $withPriority) {
+        $body .= varint(count($mirrors));
+        foreach ($mirrors as $mirror) {
+            $body .= binString($mirror);
+        }
+    }
+
+    $prev = '';
+    foreach ($files as $entry) {
+        $path = $entry['path'];
+        $sha1 = strtoupper($entry['sha1']);
+
+        $flags = 0x01; // SHA1 sempre presente
+        if (isset($entry['url']) && $entry['url'] !== rtrim($baseUrl, '/') . encodeUrlPath($path)) {
+            $flags |= 0x02;
+        }
+        if (isset($entry['sig_url']) && $entry['sig_url'] === $sigUrl . '/' . $sha1 . '.json') {
+            $flags |= 0x04;
+        }
+        $code = 0;
+        if (isset($entry['compressed'])) {
+            $encoding = $entry['compressed']['encoding'];
+            if (isset($codes[$encoding])
+                && $entry['compressed']['url'] === $compressedUrl . '/' . $sha1 . $codes[$encoding][1]) {
+                $flags |= 0x08;
+                $code = $codes[$encoding][0];
+            }
+        }
+        if (isset($entry['priority'], $priorityCodes[$entry['priority']])) {
+            $flags |= 0x10;
+        }
+
+        // prefixo em comum com o caminho anterior
+        $shared = 0;
+        $limit = min(strlen($prev), strlen($path));
+        while ($shared < $limit && $prev[$shared] === $path[$shared]) {
+            $shared++;
+        }
+
+        $body .= varint($flags);
+        $body .= varint($shared);
+        $body .= binString((string) substr($path, $shared));
+        $body .= hex2bin($sha1);
+        $body .= varint($entry['size']);
+        if ($flags & 0x02) {
+            $body .= binString($entry['url']);
+        }
+        if ($flags & 0x08) {
+            $body .= varint($code);
+            $body .= varint($entry['compressed']['size']);
+        }
+        if ($flags & 0x10) {
+            $body .= varint($priorityCodes[$entry['priority']]);
+        }
+
+        $prev = $path;
+    }
+
+    $body .= pack('V', crc32($body));
+
+    // MAGIC | versão (1; 2 com espelhos; 3 com prioridades) | flags (bit0 = zlib)
+    $version = $withPriority ? 3 : ($mirrors ? 2 : 1);
+    return 'L2MF' . chr($version) . chr(1) . gzcompress($body, 9);
+}
+
+/**
+ * Grava um arquivo de forma atômica (tmp + rename), para o updater nunca ler
+ * um version.json ou delta pela metade.
+ */
+function writeAtomic($target, $data)
+{
+    $dir = dirname($target);
+    if (!is_dir($dir) && !mkdir($dir, 0755, true)) {
+        return false;
+    }
+    $tmp = $target . '.tmp';
+    if (file_put_contents($tmp, $data) === false) {
+        return false;
+    }
+    return rename($tmp, $target);
+}
+
+/**
+ * Compara dois snapshots (listas de entradas) pelo caminho.
+ * Retorna [adicionados, alterados, removidos (só caminhos)].
+ */
+function diffSnapshots($oldFiles, $newFiles)
+{
+    $old = [];
+    foreach ($oldFiles as $entry) {
+        $old[$entry['path']] = $entry;
+    }
+
+    $added   = [];
+    $changed = [];
+    $seen    = [];
+    foreach ($newFiles as $entry) {
+        $path = $entry['path'];
+        $seen[$path] = true;
+        if (!isset($old[$path])) {
+            $added[] = $entry;
+        } elseif (strtoupper($old[$path]['sha1']) !== strtoupper($entry['sha1'])
+            || (int) $old[$path]['size'] !== (int) $entry['size']) {
+            $changed[] = $entry;
+        }
+    }
+
+    $removed = [];
+    foreach ($old as $path => $entry) {
+        if (!isset($seen[$path])) {
+            $removed[] = $path;
+        }
+    }
+
+    return [$added, $changed, $removed];
+}
+
+/**
+ * Publica uma nova versão se o conteúdo mudou desde a última:
+ *   versions/<N>.json, deltas/<N-1>-<N>.json e version.json.
+ * Remove snapshots e deltas além de $keepVersions.
+ * Retorna o número da versão atual.
+ */
+function publishVersion($baseUrl, $files, $versionFile, $versionsDir, $deltasDir, $deltasUrl, $keepVersions, $mirrors)
+{
+    $current  = 0;
+    $previous = null;
+
+    if (is_file($versionFile)) {
+        $info = json_decode(file_get_contents($versionFile), true);
+        if (is_array($info) && isset($info['version'])) {
+            $current = (int) $info['version'];
+        }
+    }
+
+    $snapshotFile = $versionsDir . DIRECTORY_SEPARATOR . $current . '.json';
+    if ($current > 0 && is_file($snapshotFile)) {
+        $snapshot = json_decode(file_get_contents($snapshotFile), true);
+        if (is_array($snapshot) && isset($snapshot['files'])) {
+            $previous = $snapshot['files'];
+        }
+    }
+
+    $delta = null;
+    if ($previous !== null) {
+        list($added, $changed, $removed) = diffSnapshots($previous, $files);
+        if (!$added && !$changed && !$removed) {
+            return $current; // nada mudou: mantém a versão publicada
+        }
+        $delta = [$added, $changed, $removed];
+    }
+
+    $next  = $current + 1;
+    $flags = JSON_PRETTY_PRINT | JSON_UNESCAPED_SLASHES;
+
+    writeAtomic(
+        $versionsDir . DIRECTORY_SEPARATOR . $next . '.json',
+        json_encode(['version' => $next, 'base_url' => $baseUrl, 'files' => $files], $flags)
+    );
+
+    if ($delta !== null) {
+        list($added, $changed, $removed) = $delta;
+        writeAtomic(
+            $deltasDir . DIRECTORY_SEPARATOR . $current . '-' . $next . '.json',
+            json_encode([
+                'from'     => $current,
+                'to'       => $next,
+                'base_url' => $baseUrl,
+                'added'    => $added,
+                'changed'  => $changed,
+                'removed'  => $removed,
+            ], $flags)
+        );
+        echo "Versão {$next}: " . count($added) . " adicionado(s), " . count($changed)
+            . " alterado(s), " . count($removed) . " removido(s)" . PHP_EOL;
+    } else {
+        // sem snapshot anterior não há delta: clientes antigos usam o manifesto completo
+        echo "Versão {$next}: primeira versão publicada (sem delta)" . PHP_EOL;
+    }
+
+    // versão mais antiga a partir da qual ainda existe cadeia completa de deltas
+    $oldest = ($delta !== null) ? max(1, $next - $keepVersions) : $next;
+    if (is_file($versionFile) && $delta !== null) {
+        $info = json_decode(file_get_contents($versionFile), true);
+        if (is_array($info) && isset($info['oldest_delta'])) {
+            $oldest = max($oldest, (int) $info['oldest_delta']);
+        }
+    }
+
+    // retenção: snapshots anteriores a $oldest e deltas que partem deles não servem mais
+    foreach (glob($versionsDir . DIRECTORY_SEPARATOR . '*.json') ?: [] as $file) {
+        if ((int) basename($file, '.json') < $oldest) {
+            @unlink($file);
+        }
+    }
+    foreach (glob($deltasDir . DIRECTORY_SEPARATOR . '*-*.json') ?: [] as $file) {
+        if ((int) basename($file, '.json') < $oldest) {
+            @unlink($file);
+        }
+    }
+
+    // version.json por último: só aponta para a nova versão depois do delta gravado
+    writeAtomic($versionFile, json_encode([
+        'version'      => $next,
+        'base_url'     => $baseUrl,
+        'deltas_url'   => $deltasUrl,
+        'oldest_delta' => $oldest,
+        'mirrors'      => $mirrors,
+    ], $flags));
+
+    return $next;
+}
+
 // -------------------- VARREDURA DA PASTA CLIENT --------------------
 
 $allFiles      = []; // para fullcheck.json
@@ -160,6 +703,32 @@ foreach ($iterator as $fileInfo) {
         'size' => $sizeBytes,
     ];
 
+    $priority = filePriority($relativePath, $priorityPatterns);
+    if ($priority !== null) {
+        $entry['priority'] = $priority;
+    }
+
+    // arquivos grandes: publica assinatura de blocos para o delta
+    if ($deltaMinSize > 0 && $sizeBytes >= $deltaMinSize) {
+        if (writeSignature($absolutePath, strtoupper($sha1), $sizeBytes, $deltaBlockSize, $sigDir)) {
+            $entry['sig_url'] = $sigUrl . '/' . strtoupper($sha1) . '.json';
+        } else {
+            fwrite(STDERR, "Aviso: não foi possível gerar assinatura de {$absolutePath}" . PHP_EOL);
+        }
+    }
+
+    // variante pré-comprimida, só quando economiza bytes
+    if ($compressMinSize > 0 && $sizeBytes >= $compressMinSize) {
+        $useXz = $xzMinSize > 0 && $sizeBytes >= $xzMinSize;
+        $compressed = writeCompressed(
+            $absolutePath, strtoupper($sha1), $sizeBytes, $useXz,
+            $compressMaxRatio, $compressedDir, $compressedUrl
+        );
+        if ($compressed !== null) {
+            $entry['compressed'] = $compressed;
+        }
+    }
+
     // adiciona em fullcheck (todos os arquivos)
     $allFiles[] = $entry;
 
@@ -173,11 +742,13 @@ foreach ($iterator as $fileInfo) {
 
 $fullcheckData = [
     'base_url' => $baseUrl,
+    'mirrors'  => $mirrors,
     'files'    => $allFiles,
 ];
 
 $updateJsonUrlData = [
     'base_url' => $baseUrl,
+    'mirrors'  => $mirrors,
     'files'    => $systemEnFiles,
 ];
 
@@ -193,6 +764,29 @@ file_put_contents(
     json_encode($updateJsonUrlData, JSON_PRETTY_PRINT | JSON_UNESCAPED_SLASHES)
 );
 
+if ($writeBinary) {
+    file_put_contents(
+        $fullcheckBinFile,
+        buildBinaryManifest($baseUrl, $allFiles, $sigUrl, $compressedUrl, $mirrors)
+    );
+
+    file_put_contents(
+        $updateJsonUrlBinFile,
+        buildBinaryManifest($baseUrl, $systemEnFiles, $sigUrl, $compressedUrl, $mirrors)
+    );
+}
+
+// -------------------- VERSÃO E DELTA --------------------
+
+$version = publishVersion(
+    $baseUrl, $allFiles, $versionFile, $versionsDir, $deltasDir, $deltasUrl, $keepVersions, $mirrors
+);
+
 echo "Arquivos gerados com sucesso:" . PHP_EOL;
 echo " - {$fullcheckFile}" . PHP_EOL;
 echo " - {$updateJsonUrlFile}" . PHP_EOL;
+if ($writeBinary) {
+    echo " - {$fullcheckBinFile}" . PHP_EOL;
+    echo " - {$updateJsonUrlBinFile}" . PHP_EOL;
+}
+echo " - {$versionFile} (versão {$version})" . PHP_EOL;